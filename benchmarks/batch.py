@@ -0,0 +1,74 @@
+# License: GNU GPL Version 3
+
+"""Benchmark of processing a batch of stored pages in worker processes.
+
+Synthetic A4 scans at 300 dpi are saved to a temporary directory.  Then
+they are cropped, straightened and encoded to the page store by
+`batch.BatchProcessor` with different numbers of workers, so the scaling
+with the number of cores can be seen.
+
+    Usage:
+
+    python3 -m benchmarks.batch [pages]
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from benchmarks import deskew
+from smth import batch, models
+
+RESOLUTION = 300
+
+
+def main() -> None:
+    """Prints pages per second for each number of workers."""
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+
+    with tempfile.TemporaryDirectory() as directory_name:
+        directory = pathlib.Path(directory_name)
+
+        type_ = models.NotebookType('A4', 200, 287)
+        type_.deskew = True
+        notebook = models.Notebook('benchmark', type_, directory / 'nb.pdf')
+
+        sources = []
+
+        for page in range(1, pages + 1):
+            source = directory / f'{page}.jpg'
+            deskew.make_page(RESOLUTION, page % 5 - 2).save(str(source))
+            sources.append(source)
+
+        print(f'{pages} A4 pages at {RESOLUTION} dpi, '
+              f'{os.cpu_count()} cores')
+        print(f"{'workers':<10}{'seconds':>8}{'pages/s':>10}")
+
+        workers = 1
+
+        while workers <= max(4, os.cpu_count() or 1):
+            with mock.patch.multiple(
+                    'smth.const',
+                    BLOBS_ROOT_PATH=directory / f'blobs-{workers}',
+                    PREVIEWS_ROOT_PATH=directory / f'previews-{workers}'):
+                tasks = [
+                    batch.Task(notebook, page, source, RESOLUTION)
+                    for page, source in enumerate(sources, start=1)]
+
+                start = time.perf_counter()
+
+                with batch.BatchProcessor(workers) as processor:
+                    for _ in processor.run(tasks):
+                        pass
+
+                seconds = time.perf_counter() - start
+
+            print(f'{workers:<10}{seconds:>8.2f}{pages / seconds:>10.1f}')
+            workers *= 2
+
+
+if __name__ == '__main__':
+    main()
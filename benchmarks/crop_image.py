@@ -0,0 +1,112 @@
+# License: GNU GPL Version 3
+
+"""Micro-benchmark of cropping scanned images.
+
+Compares `Notebook.crop_image()` with the implementation which rotated the
+whole image (sometimes twice) before cropping.
+
+    Usage:
+
+    python3 -m benchmarks.crop_image
+"""
+
+import math
+import timeit
+
+from PIL import Image as pillow
+
+from smth import models
+
+GLASS_SIZE_MM = (216, 297)
+
+RESOLUTIONS = (150, 300, 600)
+
+TYPES = (
+    ('A4', 210, 297, False),
+    ('A5 landscape', 210, 148, False),
+    ('A6 paired', 105, 148, True),
+)
+
+
+def legacy_crop_image(  # pylint: disable=too-many-branches
+        notebook: models.Notebook, page: int, image: pillow.Image,
+        resolution: int) -> pillow.Image:
+    """Crop image the way smth did before crop plans."""
+    img = image.copy()
+
+    orig_width, orig_height = img.size
+
+    if orig_width > orig_height:
+        img = img.rotate(90, expand=True)
+        orig_width, orig_height = img.size
+
+    page_width_pt = math.ceil(notebook.type.page_width * resolution / 25.4)
+    page_height_pt = math.ceil(notebook.type.page_height * resolution / 25.4)
+
+    if notebook.type.pages_paired:
+        if page_height_pt < orig_width:
+            img = img.rotate(-90, expand=True)
+            orig_width, orig_height = img.size
+
+        if notebook.first_page_number % 2 == page % 2:
+            if page_width_pt < orig_width:
+                img = img.crop((0, 0, page_width_pt, orig_height))
+        else:
+            if page_width_pt < orig_width:
+                if page_width_pt * 2 < orig_width:
+                    offset_x = page_width_pt
+                else:
+                    offset_x = orig_width - page_width_pt
+
+                box = (offset_x, 0, page_width_pt + offset_x, orig_height)
+                img = img.crop(box)
+
+        if page_height_pt < orig_height:
+            img = img.crop((0, 0, img.size[0], page_height_pt))
+    else:
+        if page_width_pt > page_height_pt:
+            img = img.rotate(-90, expand=True)
+            orig_width, orig_height = img.size
+
+        if page_width_pt < orig_width:
+            img = img.crop((0, 0, page_width_pt, orig_height))
+
+        if page_height_pt < orig_height:
+            img = img.crop((0, 0, img.size[0], page_height_pt))
+
+    return img
+
+
+def main() -> None:
+    """Prints time per page for each type and resolution."""
+    print(f"{'type':<14}{'dpi':>5}{'legacy, ms':>12}{'plan, ms':>10}"
+          f"{'speedup':>9}")
+
+    for title, width, height, pages_paired in TYPES:
+        type_ = models.NotebookType(title, width, height)
+        type_.pages_paired = pages_paired
+        notebook = models.Notebook('benchmark', type_, '')
+
+        for resolution in RESOLUTIONS:
+            size = tuple(
+                math.floor(size_mm * resolution / 25.4)
+                for size_mm in GLASS_SIZE_MM)
+            image = pillow.new('L', size, 255)
+
+            number = max(1, 600 // resolution)
+
+            legacy = min(timeit.repeat(
+                lambda: legacy_crop_image(  # pylint: disable=cell-var-from-loop  # noqa: E501
+                    notebook, 2, image, resolution),
+                number=number, repeat=3)) / number
+            plan = min(timeit.repeat(
+                lambda: notebook.crop_image(  # pylint: disable=cell-var-from-loop  # noqa: E501
+                    2, image, resolution),
+                number=number, repeat=3)) / number
+
+            print(f'{title:<14}{resolution:>5}{legacy * 1000:>12.1f}'
+                  f'{plan * 1000:>10.1f}{legacy / plan:>8.1f}x')
+
+
+if __name__ == '__main__':
+    main()
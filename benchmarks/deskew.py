@@ -0,0 +1,82 @@
+# License: GNU GPL Version 3
+
+"""Benchmark of straightening and trimming scanned pages.
+
+Synthetic A4 pages with lines of "handwriting" are rotated by known angles
+and framed with a dark scanner border.  Then `imaging.deskew()` is timed
+and the angle it finds is compared with the expected one.
+
+    Usage:
+
+    python3 -m benchmarks.deskew [resolution]
+"""
+
+import random
+import sys
+import timeit
+
+from PIL import Image as pillow
+from PIL import ImageDraw
+
+from smth import imaging
+
+PAGE_SIZE_MM = (210, 297)
+
+ANGLES = (-3.0, -1.2, -0.4, 0.0, 0.7, 2.5)
+
+BORDER_MM = 3
+
+
+def make_page(resolution: int, angle: float) -> pillow.Image:
+    """Returns a skewed page with lines of text and a dark border."""
+    random_ = random.Random(0)
+    width, height = (int(size * resolution / 25.4) for size in PAGE_SIZE_MM)
+    line_height = int(8 * resolution / 25.4)
+
+    page = pillow.new('L', (width, height), 235)
+    draw = ImageDraw.Draw(page)
+
+    for y in range(line_height * 2, height - line_height * 2, line_height):
+        x = width // 10
+
+        while x < width * 9 // 10:
+            word = random_.randint(width // 60, width // 12)
+            draw.line((x, y, x + word, y), fill=40, width=resolution // 75)
+            x += word + width // 80
+
+    page = page.rotate(angle, pillow.BILINEAR, fillcolor=235)
+
+    border = int(BORDER_MM * resolution / 25.4)
+    draw = ImageDraw.Draw(page)
+    draw.rectangle((0, 0, width - 1, border), fill=20)
+    draw.rectangle((0, 0, border, height - 1), fill=20)
+
+    return page
+
+
+def main() -> None:
+    """Prints time per page and the found angle for each skew."""
+    resolution = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+
+    print(f'A4 at {resolution} dpi')
+    print(f"{'skew':>6}{'found':>8}{'ms':>8}{'size':>12}")
+
+    for angle in ANGLES:
+        page = make_page(resolution, angle)
+
+        number = 5
+        seconds = min(timeit.repeat(
+            lambda: imaging.deskew(page),  # pylint: disable=cell-var-from-loop  # noqa: E501
+            number=number, repeat=3)) / number
+
+        small = page.reduce(max(1, min(page.size) // imaging.DESKEW_SIZE))
+        found = -imaging.get_skew_angle(
+            small.crop(imaging.get_trim_box(small))) + 0.0
+        size = imaging.deskew(page).size
+
+        print(f'{angle:>6.1f}{found:>8.2f}{seconds * 1000:>8.1f}'
+              f"{f'{size[0]}x{size[1]}':>12}")
+
+
+if __name__ == '__main__':
+    main()
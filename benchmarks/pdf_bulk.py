@@ -0,0 +1,96 @@
+# License: GNU GPL Version 3
+
+"""Benchmark of making PDF files of many notebooks with different workers.
+
+Notebooks of synthetic A5 pages scanned at 300 dpi are saved to a temporary
+page store.  Then PDF files of all of them are made from scratch by
+different numbers of worker processes, and once more with nothing changed,
+when every notebook is skipped as up to date.
+
+    Usage:
+
+    python3 -m benchmarks.pdf_bulk [notebooks] [pages]
+"""
+
+import os
+import pathlib
+import shutil
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from PIL import ImageDraw
+
+from benchmarks import deskew
+from smth import jobs, models, page_codecs, page_store
+
+RESOLUTION = 300
+
+
+def main() -> None:
+    """Prints pages per second for each number of workers."""
+    notebooks_count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    pages = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    with tempfile.TemporaryDirectory() as directory_name:
+        directory = pathlib.Path(directory_name)
+
+        with mock.patch.multiple(
+                'smth.const',
+                BLOBS_ROOT_PATH=directory / 'blobs',
+                LAYOUTS_ROOT_PATH=directory / 'layouts',
+                LOCKS_ROOT_PATH=directory / 'locks'):
+            type_ = models.NotebookType('A5', 148, 210)
+            page = deskew.make_page(RESOLUTION, 0).resize(
+                (148 * RESOLUTION * 10 // 254, 210 * RESOLUTION * 10 // 254))
+            codec = page_codecs.get('jpg')
+            notebooks = []
+
+            for notebook_id in range(1, notebooks_count + 1):
+                notebook = models.Notebook(
+                    str(notebook_id), type_, directory / f'{notebook_id}.pdf')
+                notebook.id = notebook_id
+                notebook.total_pages = pages
+
+                for number in range(1, pages + 1):
+                    image = page.copy()
+                    # make each page unique, so they are not deduplicated
+                    ImageDraw.Draw(image).line(
+                        (0, number, 100, notebook_id), fill=0)
+                    notebook.pages[number] = page_store.save(image, codec)
+
+                notebooks.append(notebook)
+
+            print(f'{notebooks_count} notebooks of {pages} A5 pages at '
+                  f'{RESOLUTION} dpi, {os.cpu_count()} cores')
+            print(f"{'workers':<10}{'seconds':>8}{'pages/s':>10}")
+
+            workers = 1
+
+            while workers <= max(4, os.cpu_count() or 1):
+                # make every file from scratch
+                shutil.rmtree(str(directory / 'layouts'), ignore_errors=True)
+
+                for notebook in notebooks:
+                    notebook.path.unlink(missing_ok=True)
+
+                start = time.perf_counter()
+                list(jobs.make_pdfs(notebooks, workers=workers))
+                seconds = time.perf_counter() - start
+
+                print(f'{workers:<10}{seconds:>8.2f}'
+                      f'{notebooks_count * pages / seconds:>10.1f}')
+                workers *= 2
+
+            start = time.perf_counter()
+            outdated = [notebook for notebook in notebooks
+                        if not jobs.is_pdf_up_to_date(notebook)]
+            seconds = time.perf_counter() - start
+
+            print(f'\nunchanged: {len(outdated)} of {notebooks_count} '
+                  f'notebooks to make, checked in {seconds * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+# License: GNU GPL Version 3
+
+"""Benchmark of memory used to write PDF of notebooks of different sizes.
+
+Notebooks with 50 and 500 A6 JPEG pages are put to PDF the way
+`smth scan --pdf-only` does it.  Each notebook is written in a separate
+process and the increase of the process's peak resident set size is
+printed.
+
+Images are never held for more than a few pages, so the peak must stay
+about the same for any number of pages.  The benchmark fails if the peaks
+of the notebooks differ by more than MAX_PEAK_DIFFERENCE_MB, e.g. when an
+image is kept for each page.
+
+    Usage:
+
+    python3 -m benchmarks.pdf_memory [pages ...]
+"""
+
+import hashlib
+import multiprocessing
+import os
+import pathlib
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from PIL import Image as pillow
+
+from benchmarks import scan_memory
+from smth import commands, models, page_store
+
+PAGES = (50, 500)
+
+RESOLUTION = 75
+
+MAX_PEAK_DIFFERENCE_MB = 1
+
+
+def run(pages: int):
+    """Writes PDF of a notebook and returns peak RSS increase and time."""
+    with tempfile.TemporaryDirectory() as directory_name:
+        directory = pathlib.Path(directory_name)
+
+        with mock.patch.multiple(
+                'smth.const',
+                BLOBS_ROOT_PATH=directory / 'blobs',
+                LAYOUTS_ROOT_PATH=directory / 'layouts',
+                LOCKS_ROOT_PATH=directory / 'locks'):
+            type_ = models.NotebookType('A6', 105, 148)
+            type_.pdf_resolution = RESOLUTION
+            notebook = models.Notebook(
+                'benchmark', type_, directory / 'notebook.pdf')
+            notebook.total_pages = pages
+
+            source = directory / 'page.jpg'
+            pillow.effect_noise((310, 437), 64).save(str(source))
+
+            # pages are links to the same file, but they have different
+            # blobs, so each of them is put to PDF
+            for page in range(1, pages + 1):
+                blob = f'{hashlib.sha256(str(page).encode()).hexdigest()}.jpg'
+                path = page_store.get_path(blob)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.link(str(source), str(path))
+                notebook.pages[page] = blob
+
+            callback = commands.ScanCommand.ScannerCallback(
+                mock.MagicMock(), mock.MagicMock(), mock.MagicMock(),
+                mock.MagicMock())
+
+            baseline = scan_memory.get_peak_rss_mb()
+            start = time.perf_counter()
+
+            with mock.patch('importlib.util.find_spec', return_value=None):
+                callback.on_finish(notebook)
+
+            seconds = time.perf_counter() - start
+            size = notebook.path.stat().st_size / 2 ** 20
+
+    return scan_memory.get_peak_rss_mb() - baseline, seconds, size
+
+
+def main() -> None:
+    """Prints peak memory used for each number of pages."""
+    pages = sorted(int(arg) for arg in sys.argv[1:]) or PAGES
+
+    print(f"{'pages':>8}{'peak RSS, MB':>14}{'seconds':>10}{'PDF, MB':>10}")
+
+    context = multiprocessing.get_context('spawn')
+    peaks = []
+
+    for pages_ in pages:
+        with context.Pool(1) as pool:
+            peak, seconds, size = pool.apply(run, (pages_,))
+
+        peaks.append(peak)
+        print(f'{pages_:>8}{peak:>14.1f}{seconds:>10.2f}{size:>10.1f}')
+
+    difference = max(peaks) - min(peaks)
+    print(f'\nPeaks differ by {difference:.1f} MB')
+
+    if difference > MAX_PEAK_DIFFERENCE_MB:
+        sys.exit('Peak RSS differs by more than '
+                 f'{MAX_PEAK_DIFFERENCE_MB} MB between notebooks')
+
+
+if __name__ == '__main__':
+    main()
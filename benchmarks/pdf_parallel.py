@@ -0,0 +1,82 @@
+# License: GNU GPL Version 3
+
+"""Benchmark of writing a notebook's PDF in full with different threads.
+
+Synthetic A4 pages scanned at 300 dpi are saved to a temporary page store
+as PNG and JPEG files.  Then the notebook's PDF is written in full with
+images reduced to 150 dpi by different numbers of threads, so the scaling
+of the prepare phase with the number of cores can be seen.
+
+    Usage:
+
+    python3 -m benchmarks.pdf_parallel [pages]
+"""
+
+import os
+import pathlib
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from PIL import ImageDraw
+
+from benchmarks import deskew
+from smth import page_codecs, page_store, pdf
+
+RESOLUTION = 300
+
+PDF_RESOLUTION = 150
+
+# Size of A4 in points
+PAGE_SIZE = (595, 842)
+
+
+def main() -> None:
+    """Prints pages per second for each number of threads."""
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+
+    with tempfile.TemporaryDirectory() as directory_name:
+        directory = pathlib.Path(directory_name)
+
+        with mock.patch('smth.const.BLOBS_ROOT_PATH', directory / 'blobs'):
+            page = deskew.make_page(RESOLUTION, 0)
+            max_image_size = (
+                page.width * PDF_RESOLUTION // RESOLUTION,
+                page.height * PDF_RESOLUTION // RESOLUTION)
+            print(f'{pages} A4 pages at {RESOLUTION} dpi reduced to '
+                  f'{PDF_RESOLUTION} dpi, {os.cpu_count()} cores')
+
+            for codec_name in ('png', 'jpg'):
+                codec = page_codecs.get(codec_name)
+                sheets = []
+
+                for number in range(1, pages + 1):
+                    image = page.copy()
+                    # make each page unique, so they are not deduplicated
+                    ImageDraw.Draw(image).line(
+                        (0, number, 100, number), fill=0)
+                    blob = page_store.save(image, codec)
+                    sheets.append([pdf.Slot(blob, page_store.get_path(blob))])
+
+                print(f'\n{codec_name.upper()} pages')
+                print(f"{'threads':<10}{'seconds':>8}{'pages/s':>10}")
+
+                workers = 1
+
+                while workers <= max(4, os.cpu_count() or 1):
+                    path = directory / f'{codec_name}-{workers}.pdf'
+
+                    start = time.perf_counter()
+                    pdf.update(
+                        path, directory / f'{codec_name}-{workers}.json',
+                        PAGE_SIZE, sheets, max_image_size, workers)
+                    seconds = time.perf_counter() - start
+
+                    print(f'{workers:<10}{seconds:>8.2f}'
+                          f'{pages / seconds:>10.1f}')
+                    workers *= 2
+
+
+if __name__ == '__main__':
+    main()
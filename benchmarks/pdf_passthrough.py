@@ -0,0 +1,91 @@
+# License: GNU GPL Version 3
+
+"""Benchmark of writing PDF from JPEG pages which fit the PDF resolution.
+
+Synthetic A4 JPEG pages at 150 dpi are put to PDF with fpdf, which reads
+each page to memory until the document is written, and with `smth.pdf`,
+which copies pages from disk to the PDF file.  Time and peak memory
+allocated by Python are printed.
+
+    Usage:
+
+    python3 -m benchmarks.pdf_passthrough [pages]
+"""
+
+import pathlib
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, List
+
+import fpdf
+from PIL import ImageDraw
+
+from benchmarks import deskew
+from smth import pdf
+
+RESOLUTION = 150
+
+PAGE_SIZE = (1240, 1754)
+
+
+def write_with_fpdf(paths: List[pathlib.Path], path: pathlib.Path) -> None:
+    """Writes pages to PDF with fpdf."""
+    document = fpdf.FPDF(unit='pt', format=PAGE_SIZE)
+
+    for page_path in paths:
+        document.add_page()
+        document.image(str(page_path), 0, 0, *PAGE_SIZE)
+
+    document.output(str(path))
+
+
+def write_with_smth(paths: List[pathlib.Path], path: pathlib.Path) -> None:
+    """Writes pages to PDF with `smth.pdf`."""
+    sheets = [[pdf.Slot(page_path.name, page_path)] for page_path in paths]
+    pdf.update(path, path.with_suffix('.json'), PAGE_SIZE, sheets, PAGE_SIZE)
+
+
+def measure(write: Callable, paths: List[pathlib.Path],
+            path: pathlib.Path) -> None:
+    """Prints time and peak memory of writing the pages to PDF."""
+    start = time.perf_counter()
+    write(paths, path)
+    seconds = time.perf_counter() - start
+    path.unlink()
+    path.with_suffix('.json').unlink(missing_ok=True)
+
+    tracemalloc.start()
+    write(paths, path)
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+
+    size = path.stat().st_size / 2 ** 20
+    print(f'{write.__name__:<16}{seconds:>8.2f}{peak:>10.1f}{size:>8.1f}')
+
+
+def main() -> None:
+    """Prints time and memory to write PDF with fpdf and `smth.pdf`."""
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    with tempfile.TemporaryDirectory() as directory_name:
+        directory = pathlib.Path(directory_name)
+        page = deskew.make_page(RESOLUTION, 0)
+        paths = []
+
+        for number in range(pages):
+            image = page.copy()
+            ImageDraw.Draw(image).line((0, number, 100, number), fill=0)
+            paths.append(directory / f'{number}.jpg')
+            image.save(str(paths[-1]), quality=90)
+
+        print(f'{pages} A4 JPEG pages at {RESOLUTION} dpi')
+        print(f"{'':<16}{'seconds':>8}{'peak MB':>10}{'MB':>8}")
+
+        measure(write_with_fpdf, paths, directory / 'fpdf.pdf')
+        measure(write_with_smth, paths, directory / 'smth.pdf')
+
+
+if __name__ == '__main__':
+    main()
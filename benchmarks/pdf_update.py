@@ -0,0 +1,91 @@
+# License: GNU GPL Version 3
+
+"""Benchmark of updating a notebook's PDF after scanning a few pages.
+
+Synthetic A4 pages scanned at 300 dpi are saved to a temporary page store.
+Then the time to write the notebook's PDF in full is compared with the time
+to update it after one page is appended, after one page is replaced and
+when nothing has changed.
+
+    Usage:
+
+    python3 -m benchmarks.pdf_update [pages]
+"""
+
+import pathlib
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from PIL import ImageDraw
+
+from benchmarks import deskew
+from smth import commands, models, page_codecs, page_store
+
+RESOLUTION = 300
+
+
+def main() -> None:
+    """Prints time to write and update the notebook's PDF."""
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    with tempfile.TemporaryDirectory() as directory_name:
+        directory = pathlib.Path(directory_name)
+
+        with mock.patch.multiple(
+                'smth.const',
+                BLOBS_ROOT_PATH=directory / 'blobs',
+                LAYOUTS_ROOT_PATH=directory / 'layouts',
+                LOCKS_ROOT_PATH=directory / 'locks'):
+            type_ = models.NotebookType('A4', 210, 297)
+            notebook = models.Notebook(
+                'benchmark', type_, directory / 'notebook.pdf')
+            notebook.id = 1
+            codec = page_codecs.get(type_.codec)
+            page = deskew.make_page(RESOLUTION, 0)
+
+            def scan(number: int, mark: int = 0) -> None:
+                image = page.copy()
+                # make each page unique, so they are not deduplicated
+                mark = mark or number
+                ImageDraw.Draw(image).line((0, mark, 100, mark), fill=0)
+                notebook.pages[number] = page_store.save(image, codec)
+
+            for number in range(1, pages + 1):
+                scan(number)
+
+            notebook.total_pages = pages
+
+            callback = commands.ScanCommand.ScannerCallback(
+                mock.MagicMock(), mock.MagicMock(), mock.MagicMock(),
+                mock.MagicMock())
+
+            def make_pdf() -> float:
+                start = time.perf_counter()
+
+                with mock.patch(
+                        'importlib.util.find_spec', return_value=None):
+                    callback.on_finish(notebook)
+
+                return time.perf_counter() - start
+
+            print(f'{pages} A4 pages at {RESOLUTION} dpi')
+            print(f"{'':<20}{'seconds':>8}{'MB':>8}")
+
+            for name, change in (
+                    ('full PDF', None),
+                    ('1 page appended', lambda: scan(pages + 1)),
+                    ('1 page replaced', lambda: scan(pages // 2, pages + 2)),
+                    ('nothing changed', lambda: None)):
+                if change:
+                    change()
+
+                notebook.total_pages = len(notebook.pages)
+                seconds = make_pdf()
+                size = notebook.path.stat().st_size / 2 ** 20
+                print(f'{name:<20}{seconds:>8.2f}{size:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
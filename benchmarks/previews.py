@@ -0,0 +1,99 @@
+# License: GNU GPL Version 3
+
+"""Benchmark of glancing at a notebook with previews instead of its PDF.
+
+Synthetic A4 pages scanned at 300 dpi are saved to a temporary page store
+with their previews, as `smth scan` does.  Then the time to make a contact
+sheet and a preview PDF is compared with the time to make the full PDF with
+`smth scan --pdf-only` (pages are reduced to the type's PDF resolution).
+
+    Usage:
+
+    python3 -m benchmarks.previews [pages]
+"""
+
+import pathlib
+import sys
+import tempfile
+import time
+from unittest import mock
+
+from PIL import ImageDraw
+
+from benchmarks import deskew
+from smth import commands, models, page_codecs, page_store, previews
+
+RESOLUTION = 300
+
+
+def main() -> None:
+    """Prints time to make the full PDF and previews of the notebook."""
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    with tempfile.TemporaryDirectory() as directory_name:
+        directory = pathlib.Path(directory_name)
+
+        with mock.patch.multiple(
+                'smth.const',
+                BLOBS_ROOT_PATH=directory / 'blobs',
+                PREVIEWS_ROOT_PATH=directory / 'previews',
+                LAYOUTS_ROOT_PATH=directory / 'layouts',
+                LOCKS_ROOT_PATH=directory / 'locks'):
+            type_ = models.NotebookType('A4', 210, 297)
+            notebook = models.Notebook(
+                'benchmark', type_, directory / 'full.pdf')
+            notebook.total_pages = pages
+            codec = page_codecs.get(type_.codec)
+
+            start = time.perf_counter()
+            save_seconds = 0.0
+
+            for page in range(1, pages + 1):
+                image = deskew.make_page(RESOLUTION, page % 5 - 2)
+                # make each page unique, so they are not deduplicated
+                ImageDraw.Draw(image).line((0, page, 100, page), fill=0)
+                blob = page_store.save(image, codec)
+                notebook.pages[page] = blob
+
+                save_start = time.perf_counter()
+                previews.save(image, blob)
+                save_seconds += time.perf_counter() - save_start
+
+            print(f'{pages} A4 pages at {RESOLUTION} dpi, '
+                  f'scanned in {time.perf_counter() - start:.1f} s')
+            print(f'previews while scanning: '
+                  f'{save_seconds / pages * 1000:.1f} ms per page')
+
+            callback = commands.ScanCommand.ScannerCallback(
+                mock.MagicMock(), mock.MagicMock(), mock.MagicMock(),
+                mock.MagicMock())
+
+            start = time.perf_counter()
+
+            with mock.patch('importlib.util.find_spec', return_value=None):
+                callback.on_finish(notebook)
+
+            full_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            commands.preview.make_contact_sheet(
+                notebook, directory / 'sheet.jpg')
+            sheet_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            commands.preview.make_preview_pdf(
+                notebook, directory / 'preview.pdf')
+            preview_seconds = time.perf_counter() - start
+
+            print(f"{'':<16}{'seconds':>8}{'MB':>8}")
+
+            for name, seconds, file_name in (
+                    ('full PDF', full_seconds, 'full.pdf'),
+                    ('contact sheet', sheet_seconds, 'sheet.jpg'),
+                    ('preview PDF', preview_seconds, 'preview.pdf')):
+                size = (directory / file_name).stat().st_size / 2 ** 20
+                print(f'{name:<16}{seconds:>8.2f}{size:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+# License: GNU GPL Version 3
+
+"""Benchmark of memory used while scanning at high resolution.
+
+A fake SANE device emits synthetic frames of A3 glass, A5 pages are cropped
+from them.  Each configuration is run in a separate process and the peak
+resident set size of the process is compared with the size of a frame and
+of a cropped page.
+
+    Usage:
+
+    python3 -m benchmarks.scan_memory [resolution] [mode]
+"""
+
+import collections
+import math
+import multiprocessing
+import resource
+import sys
+import types
+
+from PIL import Image as pillow
+
+from smth import models, scanner
+
+GLASS_SIZE_MM = (297, 420)
+
+PAGE_SIZE_MM = (148, 210)
+
+PAGES = 6
+
+SCAN_AREA_OPTIONS = [
+    (index, name, None, None, None, scanner.UNIT_MM, None, None,
+     (0, size_mm))
+    for index, (name, size_mm) in enumerate(zip(
+        scanner.SCAN_AREA_OPTIONS, GLASS_SIZE_MM * 2), start=1)
+]
+
+
+class FakeBackend:  # pylint: disable=too-few-public-methods
+    """Emulates `_sane.SaneDev` which returns frames as `bytearray`."""
+
+    def __init__(self, device: 'FakeDevice'):
+        self._device = device
+
+    def snap(self, no_cancel: bool = False):  # pylint: disable=unused-argument  # noqa: E501
+        """Returns a frame filled with white, like `_sane.SaneDev.snap()`."""
+        width, height = self._device.frame_size
+        samples = 3 if self._device.mode == 'Color' else 1
+        data = bytearray(b'\xff') * (width * height * samples)
+        return data, width, height, samples, 1
+
+
+class FakeDevice:  # pylint: disable=too-many-instance-attributes
+    """Emulates `sane.SaneDev`."""
+
+    def __init__(self, resolution: int, mode: str, scan_area: bool):
+        self.devname = 'fake'
+        self.resolution = resolution
+        self.mode = mode
+        self.tl_x, self.tl_y = 0, 0
+        self.br_x, self.br_y = GLASS_SIZE_MM
+        self.dev = FakeBackend(self)
+        self._options = SCAN_AREA_OPTIONS if scan_area else []
+
+    @property
+    def frame_size(self):
+        """Size in pixels of the area to scan."""
+        return (math.floor((self.br_x - self.tl_x) * self.resolution / 25.4),
+                math.floor((self.br_y - self.tl_y) * self.resolution / 25.4))
+
+    def get_options(self):
+        """Returns scan area options in millimeters if enabled."""
+        return self._options
+
+    def start(self):
+        """Does nothing."""
+
+    def scan(self):
+        """Returns a frame the same way `sane.SaneDev.scan()` does."""
+        data, width, height, samples, _ = self.dev.snap()
+        mode = 'RGB' if samples == 3 else 'L'
+        return pillow.frombuffer(
+            mode, (width, height), bytes(data), 'raw', mode, 0, 1)
+
+
+class Callback(scanner.Callback):
+    """Encodes pages to JPEG like `smth scan` does and forgets them."""
+
+    def on_searching_for_devices(self):
+        pass
+
+    def on_set_device(self, devices):
+        pass
+
+    def on_start(self, device_name, pages_queue):
+        pass
+
+    def on_start_scan_page(self, page):
+        pass
+
+    def on_finish_scan_page(self, notebook, page, image):
+        image.save(_NullFile(), format='JPEG')
+
+    def on_feeder_empty(self, pages_queue):
+        pass
+
+    def on_finish(self, notebook):
+        pass
+
+    def on_error(self, message):
+        raise RuntimeError(message)
+
+
+class _NullFile:
+    """A file which discards written data."""
+
+    def write(self, data):  # pylint: disable=no-self-use
+        """Discards data."""
+        return len(data)
+
+    def flush(self):
+        """Does nothing."""
+
+
+def get_peak_rss_mb() -> float:
+    """Returns the peak resident set size of the process in megabytes."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(resolution: int, mode: str, scan_area: bool, low_memory: bool):
+    """Scans pages with the fake device and returns peak RSS increase."""
+    conf = types.SimpleNamespace(
+        scanner_delay=0, scanner_feeder=False, scanner_preview=False,
+        scanner_low_memory=low_memory)
+
+    type_ = models.NotebookType('A5', *PAGE_SIZE_MM)
+    notebook = models.Notebook('benchmark', type_, '')
+
+    scanner_ = scanner.Scanner(conf, Callback())
+    device = FakeDevice(resolution, mode, scan_area)
+
+    baseline = get_peak_rss_mb()
+
+    scanner_._set_scan_area(device, notebook)  # pylint: disable=protected-access  # noqa: E501
+    scanner_._scan(  # pylint: disable=protected-access
+        device, notebook, collections.deque(range(1, PAGES + 1)))
+
+    return get_peak_rss_mb() - baseline
+
+
+def main() -> None:
+    """Prints peak memory used for each configuration."""
+    resolution = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    mode = sys.argv[2] if len(sys.argv) > 2 else 'Gray'
+
+    samples = 3 if mode == 'Color' else 1
+    frame_mb = (math.prod(
+        math.floor(size_mm * resolution / 25.4) for size_mm in GLASS_SIZE_MM)
+        * samples / 2 ** 20)
+    page_mb = (math.prod(
+        math.ceil(size_mm * resolution / 25.4) for size_mm in PAGE_SIZE_MM)
+        * samples / 2 ** 20)
+
+    print(f'{PAGES} A5 pages on A3 glass at {resolution} dpi ({mode}): '
+          f'frame {frame_mb:.0f} MB, page {page_mb:.0f} MB')
+    print(f"{'scan area':<11}{'low_memory':<12}{'peak RSS, MB':>14}"
+          f"{'pages':>8}")
+
+    context = multiprocessing.get_context('spawn')
+
+    for scan_area in (False, True):
+        for low_memory in (False, True):
+            with context.Pool(1) as pool:
+                peak = pool.apply(
+                    run, (resolution, mode, scan_area, low_memory))
+
+            print(f'{str(scan_area):<11}{str(low_memory):<12}{peak:>14.0f}'
+                  f'{peak / page_mb:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
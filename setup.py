@@ -28,6 +28,7 @@ setuptools.setup(
     python_requires='>=3.8',
     install_requires=[
         'fpdf>=1.7',
+        'numpy>=1.19',
         'PyInquirer>=1.0',
         'Pillow>=7.2',
         'python-sane>=2.8',
@@ -0,0 +1,326 @@
+# License: GNU GPL Version 3
+
+"""The module provides processing of batches of stored pages in parallel.
+
+Cropping, cleaning and encoding a page are CPU-bound and hold the GIL, so
+a batch of pages (e.g. the whole notebook after its type has been changed)
+is processed by a pool of worker processes.  Workers get only paths to the
+pages' files and save the results to `page_store` themselves, so pixels are
+never passed between processes.
+
+If only the page size has changed since a JPEG page was cleaned and encoded,
+the page is cropped losslessly (see `Task.crop_only`), so it does not lose
+quality with another generation of JPEG encoding.
+
+    Typical usage example:
+
+    tasks = [batch.Task(notebook, page, notebook.get_page_path(page), 300)
+             for page in notebook.pages]
+
+    with batch.BatchProcessor() as processor:
+        for task, blob in processor.run(tasks):
+            notebook.pages[task.page] = blob
+"""
+
+import collections
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import tempfile
+from concurrent import futures
+from typing import Any, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+import PIL.Image as pillow
+
+from smth import const, imaging, page_codecs, page_store
+
+log = logging.getLogger(__name__)
+
+# Number of worker processes
+WORKERS = os.cpu_count() or 1
+
+# Tasks waiting in the pool per worker, so a batch is not loaded at once
+TASKS_IN_FLIGHT_PER_WORKER = 2
+
+Task = collections.namedtuple(
+    'Task', 'notebook page source resolution crop_only', defaults=(False,))
+Task.__doc__ = """A page to process.
+
+Attributes:
+    notebook:
+        `models.Notebook` of the page.  Its type defines how the page is
+        cropped, cleaned and encoded.
+    page:
+        Number of the page.
+    source:
+        Path to the page's image file.
+    resolution:
+        Resolution the image was scanned with.  If 0, the image is not
+        cropped (e.g. it has been cropped when scanned).
+    crop_only:
+        Whether the page has been cleaned and encoded with the type's
+        settings already (see `get_encoding()`), so it only needs cropping.
+"""
+
+
+class Error(Exception):
+    """An error which occurs when processing a batch of pages."""
+
+
+def process_page(task: Task) -> str:
+    """Crops, cleans and saves the page, returns the name of its blob.
+
+    The page is saved with its previews.  Blank pages are saved as
+    placeholders if the notebook's type does not keep them.
+
+    Runs in a worker process.
+
+    Raises:
+        OSError:
+            Failed to read the source or save the page.
+    """
+    if task.crop_only and task.resolution:
+        blob = _crop_losslessly(task)
+
+        if blob:
+            return blob
+
+    notebook = task.notebook
+
+    with pillow.open(str(task.source)) as image:
+        image.load()
+
+        if task.resolution:
+            image = notebook.crop_image(task.page, image, task.resolution)
+
+        image = imaging.clean_page(image, notebook.type)
+
+    return page_store.save_page(image, page_codecs.get(notebook.type.codec))
+
+
+def get_settings(task: Task) -> str:
+    """Returns a short digest of everything that defines the page's output.
+
+    Pages processed with the same settings from the same source are the same,
+    so they do not need to be processed again.
+    """
+    notebook, type_ = task.notebook, task.notebook.type
+    settings = [
+        type_.page_width, type_.page_height, type_.pages_paired,
+        type_.codec, type_.binarization, type_.deskew, type_.blank_pages,
+        task.resolution,
+        # paired pages are cropped from different sides
+        type_.pages_paired and
+        notebook.first_page_number % 2 == task.page % 2,
+    ]
+    return hashlib.sha1(json.dumps(settings).encode()).hexdigest()[:16]
+
+
+def get_encoding(notebook_type: Any) -> str:
+    """Returns a short digest of the settings which define how pages of the
+    type are cleaned and encoded after they are cropped.
+    """
+    settings = [
+        notebook_type.codec, notebook_type.binarization, notebook_type.deskew,
+        notebook_type.blank_pages,
+    ]
+    return hashlib.sha1(json.dumps(settings).encode()).hexdigest()[:16]
+
+
+def _crop_losslessly(task: Task) -> Optional[str]:
+    """Crops the JPEG page without decoding it, returns the name of its blob.
+
+    Previews of the page are made when they are needed.  Returns None if the
+    page cannot be cropped losslessly.
+    """
+    const.BLOBS_ROOT_PATH.mkdir(parents=True, exist_ok=True)
+    descriptor, name = tempfile.mkstemp(
+        dir=str(const.BLOBS_ROOT_PATH), suffix=task.source.suffix)
+    os.close(descriptor)
+    path = pathlib.Path(name)
+
+    try:
+        if task.notebook.crop_jpeg_file(
+                task.page, task.source, path, task.resolution):
+            return page_store.put(path)
+
+        return None
+
+    finally:
+        if path.exists():
+            path.unlink()
+
+
+class Journal:
+    """Progress journal of processed pages.
+
+    Each processed page is appended to the journal as soon as it is done,
+    so an interrupted batch is resumed without processing the pages again.
+    The journal also tells whether a page is up to date, i.e. it is the
+    result of processing with the given settings.
+
+    Entries are JSON objects, one per line, with the source blob, settings
+    (see `get_settings()`), the resulting blob and the encoding it was made
+    with (see `get_encoding()`).  Scanned pages are recorded as made from
+    themselves, so they are up to date until their type's settings change.
+    """
+
+    def __init__(self, path: pathlib.Path):
+        self._path = path
+        self._results: Dict[Tuple[str, str], str] = {}
+        self._outputs: Set[Tuple[str, str]] = set()
+        self._encodings: Dict[str, str] = {}
+
+        try:
+            with open(str(path), encoding='utf-8') as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                        self._add(
+                            entry['source'], entry['settings'], entry['blob'],
+                            entry.get('encoding'))
+
+                    except (ValueError, KeyError, TypeError):
+                        # the last line is partial if the batch was killed
+                        log.warning('Skipped journal entry: %r', line)
+
+        except FileNotFoundError:
+            pass
+
+        except OSError as exception:
+            log.exception(exception)
+
+    def get(self, source: str, settings: str) -> Optional[str]:
+        """Returns the blob made from the source with settings if any."""
+        return self._results.get((source, settings))
+
+    def is_up_to_date(self, blob: str, settings: str) -> bool:
+        """Returns True if the blob was made with the settings."""
+        return (blob, settings) in self._outputs
+
+    def get_encoding(self, blob: str) -> Optional[str]:
+        """Returns the encoding the blob was made with if it is known."""
+        return self._encodings.get(blob)
+
+    def add(
+            self, source: str, settings: str, blob: str,
+            encoding: Optional[str] = None) -> None:
+        """Records that the blob was made from the source with settings.
+
+        Raises:
+            OSError:
+                Failed to write the journal.
+        """
+        self._add(source, settings, blob, encoding)
+        self.append(self._path, source, settings, blob, encoding)
+
+    @staticmethod
+    def append(
+            path: pathlib.Path, source: str, settings: str, blob: str,
+            encoding: Optional[str] = None) -> None:
+        """Adds an entry to the journal at the path without reading it.
+
+        Raises:
+            OSError:
+                Failed to write the journal.
+        """
+        entry = {'source': source, 'settings': settings, 'blob': blob}
+
+        if encoding:
+            entry['encoding'] = encoding
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(str(path), 'a', encoding='utf-8') as journal_file:
+            journal_file.write(f'{json.dumps(entry)}\n')
+
+    def _add(
+            self, source: str, settings: str, blob: str,
+            encoding: Optional[str]) -> None:
+        self._results[(source, settings)] = blob
+        self._outputs.add((blob, settings))
+
+        if encoding:
+            self._encodings[blob] = encoding
+
+
+class BatchProcessor:
+    """Processes pages in a pool of worker processes.
+
+    Should be used as a context manager, so worker processes are stopped
+    when the batch is done.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self._workers = max(1, workers or WORKERS)
+        self._executor: Optional[futures.ProcessPoolExecutor] = None
+
+    def __enter__(self) -> 'BatchProcessor':
+        self._executor = futures.ProcessPoolExecutor(
+            max_workers=self._workers)
+        return self
+
+    def __exit__(self, *args) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def run(self, tasks: Iterable[Task]) -> Iterator[Tuple[Task, str]]:
+        """Processes the pages and yields them as soon as they are done.
+
+        Pages are yielded in the order they are done, not in the order of
+        the tasks.  If the caller stops iterating, pages which are not
+        started yet are cancelled.
+
+        Yields:
+            A task and the name of the blob the page is saved to.
+
+        Raises:
+            batch.Error:
+                Failed to process one of the pages.
+        """
+        if not self._executor:
+            raise Error('Batch processor is not started')
+
+        tasks = iter(tasks)
+        max_in_flight = self._workers * TASKS_IN_FLIGHT_PER_WORKER
+        pending: Set[futures.Future] = set()
+        submitted: Dict[futures.Future, Task] = {}
+
+        try:
+            while True:
+                for task in tasks:
+                    future = self._executor.submit(process_page, task)
+                    submitted[future] = task
+                    pending.add(future)
+
+                    if len(pending) >= max_in_flight:
+                        break
+
+                if not pending:
+                    return
+
+                done, pending = futures.wait(
+                    pending, return_when=futures.FIRST_COMPLETED)
+
+                for future in done:
+                    task = submitted.pop(future)
+                    yield task, self._get_result(task, future)
+
+        finally:
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def _get_result(task: Task, future: futures.Future) -> str:
+        """Returns the blob of the processed page or raises batch.Error."""
+        try:
+            return future.result()
+
+        except (OSError, ValueError, futures.BrokenExecutor) as exception:
+            log.exception(exception)
+            raise Error(
+                f"Failed to process page {task.page} from '{task.source}': "
+                f"{exception}") from exception
@@ -16,8 +16,11 @@ can be executed with the execute() method like this:
 from .command import Command
 from .create import CreateCommand
 from .delete import DeleteCommand
+from .jobs import JobsCommand
 from .list import ListCommand
 from .open import OpenCommand
+from .preview import PreviewCommand
+from .reprocess import ReprocessCommand
 from .scan import ScanCommand
 from .share import ShareCommand
 from .types import TypesCommand
@@ -25,7 +28,7 @@ from .update import UpdateCommand
 from .upload import UploadCommand
 
 __all__ = [
-    'Command', 'CreateCommand', 'DeleteCommand', 'ListCommand', 'OpenCommand',
-    'ScanCommand', 'ShareCommand', 'TypesCommand', 'UpdateCommand',
-    'UploadCommand'
+    'Command', 'CreateCommand', 'DeleteCommand', 'JobsCommand', 'ListCommand',
+    'OpenCommand', 'PreviewCommand', 'ReprocessCommand', 'ScanCommand',
+    'ShareCommand', 'TypesCommand', 'UpdateCommand', 'UploadCommand'
 ]
@@ -96,10 +96,6 @@ class CreateCommand(command.Command):  # pylint: disable=too-few-public-methods
         except (OSError, db.Error) as exception:
             self.exit_with_error(exception)
 
-        pages_root = os.path.expanduser('~/.local/share/smth/pages')
-        pages_dir = os.path.join(pages_root, notebook.title)
-        pathlib.Path(pages_dir).mkdir(parents=True)
-
         message = (f"Create notebook '{notebook.title}' "
                    f"of type '{notebook.type.title}' at '{notebook.path}'")
         log.info(message)
@@ -4,10 +4,9 @@
 
 import argparse
 import logging
-import pathlib
 import shutil
 
-from smth import db
+from smth import db, page_store, pdf
 
 from . import command
 
@@ -34,10 +33,9 @@ class DeleteCommand(command.Command):  # pylint: disable=too-few-public-methods
 
             notebook = self._db.get_notebook_by_title(chosen_notebook)
 
-            pages_root = pathlib.Path('~/.local/share/smth/pages').expanduser()
-            pages_dir_path = pages_root / notebook.title
+            pages_dir_path = notebook.get_pages_dir()
 
-            message = (f"All scanned images in '{pages_dir_path}' will be "
+            message = (f"All scanned images of '{notebook.title}' will be "
                        f"removed.\n"
                        f"File'{notebook.path}' will not be deleted.")
             self._view.show_info(message)
@@ -45,9 +43,19 @@ class DeleteCommand(command.Command):  # pylint: disable=too-few-public-methods
             if self._view.confirm('Continue?'):
                 self._db.delete_notebook_by_id(notebook.id)
 
+                # identical pages may be shared with other notebooks
+                page_store.remove(
+                    set(notebook.pages.values()) - self._db.get_blobs())
+
                 if pages_dir_path.exists():
                     shutil.rmtree(str(pages_dir_path))
 
+                for profile in [None, *pdf.PROFILES]:
+                    layout_path = pdf.get_layout_path(notebook.id, profile)
+
+                    if layout_path.exists():
+                        layout_path.unlink()
+
                 message = (f"Notebook '{notebook.title}' deleted.")
                 log.info(message)
                 self._view.show_info(message)
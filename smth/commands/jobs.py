@@ -0,0 +1,31 @@
+# License: GNU GPL Version 3
+
+"""The module provides `jobs` command to see PDF files made in background."""
+
+import argparse
+import logging
+
+from smth import db, jobs
+
+from . import command
+
+log = logging.getLogger(__name__)
+
+
+class JobsCommand(command.Command):  # pylint: disable=too-few-public-methods
+    """Shows jobs of the background worker or runs the worker."""
+
+    def execute(self, args: argparse.Namespace) -> None:
+        """Shows the latest jobs with their progress.
+
+        With `--run`, runs queued jobs instead (see `jobs.run_worker()`),
+        which is what the background worker does.
+        """
+        try:
+            if args.run:
+                jobs.run_worker(self._db)
+            else:
+                self._view.show_pdf_jobs(self._db.get_pdf_jobs())
+
+        except (db.Error, OSError) as exception:
+            self.exit_with_error(exception)
@@ -0,0 +1,181 @@
+# License: GNU GPL Version 3
+
+"""The module provides `preview` command for glancing at notebook's pages."""
+
+import argparse
+import logging
+import math
+import pathlib
+import subprocess
+import tempfile
+from typing import List, Optional
+
+import fpdf
+import PIL.Image as pillow
+import PIL.ImageDraw as pillow_draw
+
+from smth import const, db, models, previews
+
+from . import command
+
+log = logging.getLogger(__name__)
+
+# Number of thumbnails in a row of the contact sheet
+SHEET_COLUMNS = 8
+
+# Space in pixels around thumbnails and for page numbers under them
+SHEET_PADDING = 10
+SHEET_CAPTION_HEIGHT = 16
+
+SHEET_BACKGROUND = (255, 255, 255)
+
+SHEET_QUALITY = 85
+
+
+class PreviewCommand(command.Command):  # pylint: disable=too-few-public-methods  # noqa: E501
+    """Shows reduced copies of notebook's pages."""
+
+    def execute(self, args: argparse.Namespace) -> None:
+        """Makes a contact sheet or a preview PDF and opens it.
+
+        Both are made from the cached previews of pages (see `previews`), so
+        this is much faster than opening the notebook's PDF.
+        """
+        notebook_titles = self.get_notebook_titles_from_db()
+
+        if not notebook_titles:
+            self._view.show_info('No notebooks found.')
+            return
+
+        title = self._view.ask_for_notebook(notebook_titles)
+
+        if not title:
+            return
+
+        try:
+            notebook = self._db.get_notebook_by_title(title)
+
+        except db.Error as exception:
+            self.exit_with_error(exception)
+
+        const.PREVIEWS_ROOT_PATH.mkdir(parents=True, exist_ok=True)
+
+        try:
+            if args.pdf:
+                path = const.PREVIEWS_ROOT_PATH / f'{notebook.title}.pdf'
+                make_preview_pdf(notebook, path)
+            else:
+                path = const.PREVIEWS_ROOT_PATH / f'{notebook.title}.jpg'
+                make_contact_sheet(notebook, path)
+
+        except OSError as exception:
+            self.exit_with_error(f'Failed to make preview: {exception}.')
+
+        self._view.show_info(f"Preview saved at '{path}'.")
+        subprocess.Popen(['xdg-open', str(path)])
+
+
+def make_contact_sheet(notebook: models.Notebook, path: pathlib.Path) -> None:
+    """Saves thumbnails of all notebook's pages in one JPEG image.
+
+    Thumbnails are laid out in rows of SHEET_COLUMNS with page numbers
+    under them.  Blank and missing pages are left empty.
+
+    Raises:
+        OSError:
+            Failed to write the image.
+    """
+    pages = _get_pages(notebook)
+    tile_size = previews.SIZES['thumbnail'] + SHEET_PADDING
+    tile_height = tile_size + SHEET_CAPTION_HEIGHT
+    columns = min(SHEET_COLUMNS, max(1, len(pages)))
+    rows = max(1, math.ceil(len(pages) / columns))
+
+    sheet = pillow.new(
+        'RGB', (columns * tile_size + SHEET_PADDING,
+                rows * tile_height + SHEET_PADDING), SHEET_BACKGROUND)
+    draw = pillow_draw.Draw(sheet)
+
+    for index, page in enumerate(pages):
+        x = SHEET_PADDING + index % columns * tile_size  # pylint: disable=invalid-name  # noqa: E501
+        y = SHEET_PADDING + index // columns * tile_height  # pylint: disable=invalid-name  # noqa: E501
+
+        thumbnail = _open_preview(notebook, page, 'thumbnail')
+
+        if thumbnail:
+            sheet.paste(thumbnail, (x, y))
+            thumbnail.close()
+
+        draw.text((x, y + tile_size - SHEET_PADDING // 2), str(page),
+                  fill=(0, 0, 0))
+
+    sheet.save(str(path), quality=SHEET_QUALITY)
+
+
+def make_preview_pdf(notebook: models.Notebook, path: pathlib.Path) -> None:
+    """Saves previews of all notebook's pages in a PDF file.
+
+    Each page is put on a separate PDF page of the type's page size, even
+    if pages are paired.  Blank and missing pages are left empty.
+
+    Raises:
+        OSError:
+            Failed to write the file.
+    """
+    pdf_page_size = (
+        int(notebook.type.page_width * const.PDF_PAGE_RESOLUTION / 25.4),
+        int(notebook.type.page_height * const.PDF_PAGE_RESOLUTION / 25.4))
+    pdf = fpdf.FPDF(unit='pt', format=pdf_page_size)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for page in _get_pages(notebook):
+            pdf.add_page()
+            preview_path = _get_preview_path(
+                notebook, page, pathlib.Path(directory))
+
+            if preview_path:
+                pdf.image(str(preview_path), 0, 0, *pdf_page_size)
+
+        pdf.output(str(path))
+
+
+def _get_pages(notebook: models.Notebook) -> List[int]:
+    """Returns numbers of all notebook's pages."""
+    return list(range(notebook.first_page_number,
+                      notebook.first_page_number + notebook.total_pages))
+
+
+def _open_preview(
+        notebook: models.Notebook, page: int,
+        size: str) -> Optional[pillow.Image]:
+    """Returns the page's reduced copy or None if it is blank or missing."""
+    try:
+        return previews.open_image(
+            notebook.get_page_path(page), size, notebook.pages.get(page))
+
+    except OSError as exception:
+        log.exception(exception)
+        return None
+
+
+def _get_preview_path(
+        notebook: models.Notebook, page: int,
+        directory: pathlib.Path) -> Optional[pathlib.Path]:
+    """Returns the path to the page's preview to put to PDF.
+
+    Previews of pages which are not in `page_store` are not cached, so they
+    are saved to the directory.
+    """
+    blob = notebook.pages.get(page)
+    image = _open_preview(notebook, page, 'preview')
+
+    if image is None:
+        return None
+
+    if blob:
+        image.close()
+        return previews.get_path(blob, 'preview')
+
+    path = directory / f'{page}.jpg'
+    image.save(str(path), quality=previews.QUALITY)
+    return path
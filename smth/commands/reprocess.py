@@ -0,0 +1,138 @@
+# License: GNU GPL Version 3
+
+"""The module provides `reprocess` command to process stored pages again."""
+
+import argparse
+import logging
+from typing import Dict, List, Set, Tuple
+
+from smth import batch, config, const, db, models, page_codecs, page_store
+
+from . import command
+
+log = logging.getLogger(__name__)
+
+
+class ReprocessCommand(command.Command):  # pylint: disable=too-few-public-methods  # noqa: E501
+    """Crops, cleans and encodes stored pages again."""
+
+    def execute(self, args: argparse.Namespace) -> None:
+        """Processes pages of one or all notebooks with their types' settings.
+
+        Pages are processed in worker processes (see `batch`).  Scanned and
+        processed pages are recorded in the journal, so pages which are up to
+        date are skipped and an interrupted command continues where it
+        stopped.
+        """
+        notebooks = self._get_notebooks(args)
+
+        if not notebooks:
+            return
+
+        resolution = args.resolution
+
+        if not resolution:
+            try:
+                resolution = config.Config().scanner_resolution
+
+            except config.Error as exception:
+                self.exit_with_error(exception)
+
+        journal = batch.Journal(const.REPROCESS_JOURNAL_PATH)
+
+        with batch.BatchProcessor(args.workers) as processor:
+            for notebook in notebooks:
+                self._reprocess(notebook, resolution, journal, processor)
+
+        self._view.show_info(
+            "Done. Run 'smth scan --pdf-only' to update PDF files.")
+
+    def _get_notebooks(
+            self, args: argparse.Namespace) -> List[models.Notebook]:
+        """Returns all notebooks or asks user for one."""
+        try:
+            if args.all:
+                return self._db.get_notebooks()
+
+            notebook_titles = self.get_notebook_titles_from_db()
+
+            if not notebook_titles:
+                self._view.show_info('No notebooks found.')
+                return []
+
+            title = self._view.ask_for_notebook(notebook_titles)
+
+            if not title:
+                return []
+
+            return [self._db.get_notebook_by_title(title)]
+
+        except db.Error as exception:
+            self.exit_with_error(exception)
+
+    def _reprocess(
+            self, notebook: models.Notebook, resolution: int,
+            journal: batch.Journal,
+            processor: batch.BatchProcessor) -> None:
+        """Processes the notebook's pages and saves its new manifest."""
+        try:
+            old_page_files = notebook.copy_pages_to_store()
+
+        except OSError as exception:
+            self.exit_with_error(exception)
+
+        # pages of the tasks are not passed to workers with the notebook
+        notebook_ = models.Notebook(notebook.title, notebook.type, '')
+        notebook_.first_page_number = notebook.first_page_number
+
+        tasks = []
+        sources: Dict[int, Tuple[str, str]] = {}
+        replaced_blobs: Set[str] = set()
+        up_to_date = 0
+        encoding = batch.get_encoding(notebook.type)
+
+        for page, blob in sorted(notebook.pages.items()):
+            path = page_store.get_path(blob)
+
+            if page_codecs.is_blank_page(path):
+                continue
+
+            task = batch.Task(notebook_, page, path, resolution)
+            settings = batch.get_settings(task)
+            done_blob = journal.get(blob, settings)
+
+            if journal.is_up_to_date(blob, settings):
+                up_to_date += 1
+            elif done_blob and page_store.get_path(done_blob).exists():
+                # processed before the command was interrupted
+                notebook.pages[page] = done_blob
+                replaced_blobs.add(blob)
+            else:
+                # if only the page size has changed, the page is just cropped
+                tasks.append(task._replace(
+                    crop_only=journal.get_encoding(blob) == encoding))
+                sources[page] = (blob, settings)
+
+        self._view.show_info(
+            f"Reprocessing {len(tasks)} pages of '{notebook.title}', "
+            f'{up_to_date} pages are up to date...')
+
+        try:
+            for task, blob in processor.run(tasks):
+                source, settings = sources[task.page]
+                journal.add(source, settings, blob, encoding)
+                notebook.pages[task.page] = blob
+                replaced_blobs.add(source)
+
+                log.info(
+                    "Reprocessed page %s of '%s'", task.page, notebook.title)
+
+            self._db.save_notebook(notebook)
+            notebook.remove_page_files(old_page_files)
+
+            page_store.remove(replaced_blobs - self._db.get_blobs())
+
+        except (batch.Error, db.Error, OSError) as exception:
+            self.exit_with_error(exception)
+
+        self._view.show_info(f"Notebook '{notebook.title}' saved.")
@@ -6,12 +6,13 @@ import argparse
 import collections
 import importlib.util
 import logging
-from typing import Deque, List
+import time
+from typing import Deque, List, Optional, Set
 
-import fpdf
 import PIL.Image as pillow
 
-from smth import config, db, models, scanner, validators, view
+from smth import (batch, config, const, db, jobs, models, page_codecs,
+                  page_store, scanner, validators, view)
 
 from . import command, create, upload
 
@@ -51,7 +52,8 @@ class ScanCommand(command.Command):  # pylint: disable=too-few-public-methods
                 self.exit_with_error(message)
 
         callback = ScanCommand.ScannerCallback(
-            self, self._db, self._view, self.conf)
+            self, self._db, self._view, self.conf, args.profile,
+            background=not args.pdf_only)
         callback.on_error = self.exit_with_error
 
         if args.set_device:
@@ -61,6 +63,13 @@ class ScanCommand(command.Command):  # pylint: disable=too-few-public-methods
             except config.Error as exception:
                 self.exit_with_error(exception)
 
+        if args.all and not args.pdf_only:
+            self.exit_with_error('--all can be used only with --pdf-only.')
+
+        if args.pdf_only and args.all:
+            self._make_all_pdfs(args)
+            return
+
         if args.pdf_only:
             self._view.show_info(
                 'Nothing will be scanned. '
@@ -88,11 +97,15 @@ class ScanCommand(command.Command):  # pylint: disable=too-few-public-methods
 
         def __init__(
                 self, command_: command.Command,
-                db_: db.DB, view_: view.View, conf: config.Config):
+                db_: db.DB, view_: view.View, conf: config.Config,
+                profile: Optional[str] = None, background: bool = False):
             self._command = command_
             self._db = db_
             self._view = view_
             self.conf = conf
+            self._profile = profile
+            self._background = background
+            self._replaced_blobs: Set[str] = set()
 
         def on_searching_for_devices(self):
             self._view.show_info('Searching for available devices...')
@@ -103,7 +116,9 @@ class ScanCommand(command.Command):  # pylint: disable=too-few-public-methods
             See the base class."""
             return self._view.ask_for_device(devices)
 
-        def on_start(self, device_name: str, pages_queue: List[int]) -> None:
+        def on_start(
+                self, device_name: str, pages_queue: List[int],
+                append_from_feeder: bool = False) -> None:
             """Shows the pages that will be scanned and asks for confirmation.
 
             See the base class.
@@ -113,9 +128,15 @@ class ScanCommand(command.Command):  # pylint: disable=too-few-public-methods
 
             self._view.show_separator()
 
-            pages_to_scan = ', '.join(list(map(str, pages_queue)))
-            self._view.show_info(
-                f"The following pages will be scanned: {pages_to_scan}.")
+            if pages_queue:
+                pages_to_scan = ', '.join(list(map(str, pages_queue)))
+                self._view.show_info(
+                    f"The following pages will be scanned: {pages_to_scan}.")
+
+            if append_from_feeder:
+                self._view.show_info(
+                    'Sheets left in the document feeder will be appended '
+                    'to the notebook.')
 
             if not self._view.confirm('Continue?', default_yes=True):
                 self.on_error('Scanning cancelled.')
@@ -126,113 +147,184 @@ class ScanCommand(command.Command):  # pylint: disable=too-few-public-methods
 
         def on_finish_scan_page(
                 self, notebook: models.Notebook, page: int,
-                image: pillow.Image) -> None:
-            """Saves scanned page to notebook's pages directory.
+                image: Optional[pillow.Image]) -> None:
+            """Saves scanned page to the page store and notebook's manifest.
+
+            Blank pages are saved as empty placeholder files.  The blob of a
+            replaced page is removed after PDF is created if no notebook
+            refers to it.  Previews of the page are made from the image, so
+            the page is not decoded again to show them.
+
+            The page is recorded in the journal of `reprocess` command as up
+            to date, so it is not processed again while its type's settings
+            are the same.
 
             See the base class."""
-            page_path = notebook.get_page_path(page)
-            image.save(str(page_path))
+            blob = page_store.save_page(
+                image, page_codecs.get(notebook.type.codec))
+
+            replaced_blob = notebook.pages.get(page)
+            notebook.pages[page] = blob
+
+            if replaced_blob and replaced_blob != blob:
+                self._replaced_blobs.add(replaced_blob)
+
+            if image is None:
+                self._view.show_info(f'Page {page} is blank')
+            else:
+                self._record_scanned_page(notebook, page, blob)
+                page_path = notebook.get_page_path(page)
+                self._view.show_info(f'Page {page} saved at {page_path}')
 
-            self._view.show_info(f'Page {page} saved at {page_path}')
             log.info("Scanned page %s of '%s'", page, notebook.title)
 
-        def on_finish(self, notebook: models.Notebook):  # pylint: disable=too-many-branches  # noqa: E501
-            """Saves the notebook in the databasee and creates PDF file.
+        def _record_scanned_page(
+                self, notebook: models.Notebook, page: int,
+                blob: str) -> None:
+            """Records the page in the journal as made from itself."""
+            try:
+                task = batch.Task(
+                    notebook, page, None, self.conf.scanner_resolution)
+                batch.Journal.append(
+                    const.REPROCESS_JOURNAL_PATH, blob,
+                    batch.get_settings(task), blob,
+                    batch.get_encoding(notebook.type))
+
+            except (config.Error, OSError) as exception:
+                # the page is just processed again by `reprocess`
+                log.exception(exception)
 
-            If PyDrive is installed and `ask_upload` config parameter is True,
-            asks whether the user wants to upload the notebook to Google Drive.
+        def on_feeder_empty(self, pages_queue: List[int]) -> None:
+            """Shows the pages which have not been scanned.
 
             See the base class.
             """
-            self._db.save_notebook(notebook)
+            pages_left = ', '.join(list(map(str, pages_queue)))
+            self._view.show_info(
+                f'Document feeder is empty. Not scanned: {pages_left}.')
 
-            self._view.show_separator()
-            self._view.show_info('Creating PDF...')
+        def on_finish(self, notebook: models.Notebook):
+            """Saves the notebook in the databasee and makes its PDF file.
 
-            pdf_page_size = [
-                int(notebook.type.page_width * 150 / 25.4),
-                int(notebook.type.page_height * 150 / 25.4),
-            ]
+            If the callback is made with `background`, the PDF file is made
+            by the background worker (see `jobs`) and the method returns at
+            once.  Only pages which have changed since the PDF file was made
+            are written to it (see `pdf`).  If a profile is given, the PDF
+            file made with it is saved next to the notebook's PDF file, which
+            is left as it is.
 
-            if notebook.type.pages_paired:
-                pdf_page_size[0] *= 2
+            If PyDrive is installed and `ask_upload` config parameter is True,
+            asks whether the user wants to upload the notebook to Google Drive.
+            PDF files to upload are made in foreground.
 
-            pdf = fpdf.FPDF(unit='pt', format=pdf_page_size)
+            See the base class.
+            """
+            self._db.save_notebook(notebook)
 
-            for i in range(0, notebook.total_pages):
-                page = notebook.first_page_number + i
-                page_path = notebook.get_page_path(page)
+            if self._replaced_blobs:
+                page_store.remove(self._replaced_blobs - self._db.get_blobs())
+                self._replaced_blobs.clear()
 
-                if notebook.type.pages_paired:
-                    if notebook.first_page_number % 2 == page % 2:
-                        # left page
-                        pdf.add_page()
-
-                        try:
-                            pdf.image(
-                                str(page_path),
-                                0, 0,
-                                int(pdf_page_size[0] / 2), pdf_page_size[1])
-
-                        except RuntimeError as exception:
-                            self._view.show_error(
-                                f"Page {page} missing or incorrect at "
-                                f"'{page_path}'")
-                            log.exception(exception)
-                    else:
-                        # right page
-                        try:
-                            pdf.image(
-                                str(page_path),
-                                int(pdf_page_size[0] / 2), 0,
-                                int(pdf_page_size[0] / 2), pdf_page_size[1])
-
-                        except RuntimeError as exception:
-                            self._view.show_error(
-                                f"Page {page} missing or incorrect at "
-                                f"'{page_path}'")
-                            log.exception(exception)
-                else:
-                    pdf.add_page()
+            self._view.show_separator()
+            upload_ = self._ask_upload()
+
+            if self._background and not upload_:
+                try:
+                    jobs.submit(self._db, notebook.id, self._profile)
+                    self._view.show_info(
+                        "PDF is being made in background. "
+                        "Run 'smth jobs' to see progress.")
+                    self._view.show_info('Done.')
+                    return
 
-                    try:
-                        pdf.image(
-                            str(page_path),
-                            0, 0,
-                            pdf_page_size[0], pdf_page_size[1])
+                except (db.Error, OSError) as exception:
+                    self._view.show_error(
+                        f'Failed to make PDF in background: {exception}.')
 
-                    except RuntimeError as exception:
-                        self._view.show_error(
-                            f"Page {page} missing or incorrect at "
-                            f"'{page_path}'")
-                        log.exception(exception)
+            self._view.show_info('Creating PDF...')
 
             try:
-                if not notebook.path.parent.exists():
-                    notebook.path.parent.mkdir(parents=True, exist_ok=True)
+                path, failed = jobs.make_pdf(notebook, self._profile)
+
+                for slot in failed:
+                    self._view.show_error(
+                        f"Page missing or incorrect at '{slot.path}'")
 
-                pdf.output(notebook.path)
-                self._view.show_info(f"PDF saved at '{notebook.path}'.")
+                self._view.show_info(f"PDF saved at '{path}'.")
                 self._view.show_separator()
 
             except OSError as exception:
                 self.on_error(f'Failed to save PDF: {exception}.')
 
+            if upload_:
+                command_ = upload.UploadCommand(self._db, self._view)
+                args = [notebook.title]
+                command_.execute(args)
+
+            self._view.show_info('Done.')
+
+        def on_error(self, message):
+            """See the base class."""
+
+        def _ask_upload(self) -> bool:
+            """Asks whether to upload the notebook if uploading is set up."""
             try:
-                if (importlib.util.find_spec('pydrive') and
-                        self.conf.scanner_ask_upload):
-                    if self._view.confirm('Upload notebook to Google Drive?'):
-                        command_ = upload.UploadCommand(self._db, self._view)
-                        args = [notebook.title]
-                        command_.execute(args)
+                return bool(
+                    importlib.util.find_spec('pydrive') and
+                    self.conf.scanner_ask_upload and
+                    self._view.confirm('Upload notebook to Google Drive?'))
 
             except config.Error as exception:
                 self._view.show_error(f'Config file error: {str(exception)}')
+                return False
 
-            self._view.show_info('Done.')
+    def _make_all_pdfs(self, args: argparse.Namespace) -> None:
+        """Makes PDF files of all notebooks or notebooks of the type.
 
-        def on_error(self, message):
-            """See the base class."""
+        PDF files are made in worker processes (see `jobs.make_pdfs()`).
+        Notebooks whose PDF files are up to date are skipped.
+        """
+        try:
+            notebooks = self._db.get_notebooks()
+
+        except db.Error as exception:
+            self.exit_with_error(exception)
+
+        if args.type:
+            notebooks = [notebook for notebook in notebooks
+                         if notebook.type.title == args.type]
+
+        outdated = [notebook for notebook in notebooks
+                    if not jobs.is_pdf_up_to_date(notebook, args.profile)]
+
+        self._view.show_info(
+            f'Making PDF files of {len(outdated)} notebooks, '
+            f'{len(notebooks) - len(outdated)} are up to date...')
+
+        if not outdated:
+            return
+
+        pages = 0
+        start = time.perf_counter()
+
+        for result in jobs.make_pdfs(outdated, args.profile, args.workers):
+            if result.error:
+                self._view.show_error(
+                    f"Failed to save PDF of '{result.notebook.title}': "
+                    f'{result.error}.')
+                continue
+
+            for slot in result.failed:
+                self._view.show_error(
+                    f"Page missing or incorrect at '{slot.path}'")
+
+            pages += result.notebook.total_pages
+            self._view.show_info(f"PDF saved at '{result.path}'.")
+
+        seconds = time.perf_counter() - start
+        self._view.show_info(
+            f'Done. {pages} pages in {seconds:.1f} s, '
+            f'{pages / seconds:.1f} pages/s.')
 
     def _get_notebook_to_scan(
             self, notebook_titles: List[str]) -> models.Notebook:
@@ -257,7 +349,16 @@ class ScanCommand(command.Command):  # pylint: disable=too-few-public-methods
         """Asks for pages which should be appended and/or replaced."""
         pages_queue: Deque = collections.deque()
 
-        validator = validators.PagesToScanValidator(notebook)
+        try:
+            if self.conf.scanner_feeder:
+                max_pages = const.MAX_PAGES_TO_APPEND_FROM_FEEDER
+            else:
+                max_pages = const.MAX_PAGES_TO_APPEND
+
+        except config.Error as exception:
+            self.exit_with_error(exception)
+
+        validator = validators.PagesToScanValidator(notebook, max_pages)
         append = self._view.ask_for_pages_to_append(validator)
 
         if notebook.total_pages > 0:
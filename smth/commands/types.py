@@ -48,6 +48,11 @@ class TypesCommand(command.Command):  # pylint: disable=too-few-public-methods
             answers['page_width'],
             answers['page_height'])
         type_.pages_paired = answers['pages_paired']
+        type_.pdf_resolution = answers['pdf_resolution']
+        type_.codec = answers['codec']
+        type_.binarization = answers['binarization']
+        type_.deskew = answers['deskew']
+        type_.blank_pages = answers['blank_pages']
 
         try:
             self._db.save_type(type_)
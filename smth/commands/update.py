@@ -91,15 +91,30 @@ class UpdateCommand(command.Command):  # pylint: disable=too-few-public-methods
 
             notebook.path = path
 
+        old_page_files = []
+
         if title != notebook.title:
-            pages_root = pathlib.Path(
-                '~/.local/share/smth/pages').expanduser()
-            pages_dir = pages_root / notebook.title
-            new_pages_dir = pages_root / title
-            shutil.move(str(pages_dir), str(new_pages_dir))
+            # pages are found by the manifest, only pages scanned before the
+            # page store are in the directory named after the title
+            try:
+                old_page_files = notebook.copy_pages_to_store()
+
+            except OSError as exception:
+                self.exit_with_error(exception)
 
             notebook.title = title
 
-        self._db.save_notebook(notebook)
+        try:
+            self._db.save_notebook(notebook)
+
+        except db.Error as exception:
+            self.exit_with_error(exception)
+
+        try:
+            notebook.remove_page_files(old_page_files)
+
+        except OSError as exception:
+            log.exception(exception)
+            self._view.show_error(f'Failed to remove old pages: {exception}.')
 
         self._view.show_info('Notebook saved.')
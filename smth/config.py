@@ -12,6 +12,12 @@ It has the following structure:
     mode = Gray
     resolution = 150
     ask_upload = True
+    feeder = False
+    source =
+    preview = False
+    devices_cache_ttl = 86400
+    devices_refresh = True
+    low_memory = False
     ```
 
     Typical usage example:
@@ -50,6 +56,12 @@ class Config:
         self._default_config['scanner']['mode'] = 'Gray'
         self._default_config['scanner']['resolution'] = '150'
         self._default_config['scanner']['ask_upload'] = 'True'
+        self._default_config['scanner']['feeder'] = 'False'
+        self._default_config['scanner']['source'] = ''
+        self._default_config['scanner']['preview'] = 'False'
+        self._default_config['scanner']['devices_cache_ttl'] = '86400'
+        self._default_config['scanner']['devices_refresh'] = 'True'
+        self._default_config['scanner']['low_memory'] = 'False'
 
         if const.CONFIG_PATH.exists():
             try:
@@ -131,6 +143,92 @@ class Config:
         self._config.set('scanner', 'ask_upload', str(ask_upload))
         self._write_config()
 
+    @property
+    def scanner_feeder(self) -> bool:
+        """Defines whether to scan pages from document feeder until it's empty.
+        """
+        try:
+            return self._config.getboolean(
+                'scanner', 'feeder', fallback=False)
+
+        except ValueError as exception:
+            raise Error(str(exception))
+
+    @scanner_feeder.setter
+    def scanner_feeder(self, feeder: bool) -> None:
+        self._config.set('scanner', 'feeder', str(feeder))
+        self._write_config()
+
+    @property
+    def scanner_source(self) -> str:
+        """Scan source (e.g. Flatbed or ADF).  Device's default if not set."""
+        return self._config.get('scanner', 'source', fallback='')
+
+    @scanner_source.setter
+    def scanner_source(self, source: str) -> None:
+        self._config.set('scanner', 'source', source)
+        self._write_config()
+
+    @property
+    def scanner_preview(self) -> bool:
+        """Defines whether to find pages on the glass with preview scans."""
+        try:
+            return self._config.getboolean(
+                'scanner', 'preview', fallback=False)
+
+        except ValueError as exception:
+            raise Error(str(exception))
+
+    @scanner_preview.setter
+    def scanner_preview(self, preview: bool) -> None:
+        self._config.set('scanner', 'preview', str(preview))
+        self._write_config()
+
+    @property
+    def scanner_devices_cache_ttl(self) -> int:
+        """Time in seconds the list of found devices is kept.  0 disables."""
+        try:
+            return self._config.getint(
+                'scanner', 'devices_cache_ttl', fallback=86400)
+
+        except ValueError as exception:
+            raise Error(str(exception))
+
+    @scanner_devices_cache_ttl.setter
+    def scanner_devices_cache_ttl(self, ttl: int) -> None:
+        self._config.set('scanner', 'devices_cache_ttl', str(ttl))
+        self._write_config()
+
+    @property
+    def scanner_devices_refresh(self) -> bool:
+        """Defines whether to update cached devices while choosing a device."""
+        try:
+            return self._config.getboolean(
+                'scanner', 'devices_refresh', fallback=True)
+
+        except ValueError as exception:
+            raise Error(str(exception))
+
+    @scanner_devices_refresh.setter
+    def scanner_devices_refresh(self, refresh: bool) -> None:
+        self._config.set('scanner', 'devices_refresh', str(refresh))
+        self._write_config()
+
+    @property
+    def scanner_low_memory(self) -> bool:
+        """Defines whether to keep only one full scanned image in memory."""
+        try:
+            return self._config.getboolean(
+                'scanner', 'low_memory', fallback=False)
+
+        except ValueError as exception:
+            raise Error(str(exception))
+
+    @scanner_low_memory.setter
+    def scanner_low_memory(self, low_memory: bool) -> None:
+        self._config.set('scanner', 'low_memory', str(low_memory))
+        self._write_config()
+
     def _write_config(self):
         try:
             with open(str(const.CONFIG_PATH), 'w') as config_file:
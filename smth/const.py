@@ -12,14 +12,64 @@ DB_PATH = DATA_ROOT_PATH / 'smth.db'
 
 LOG_PATH = DATA_ROOT_PATH / 'smth.log'
 
+DEVICES_CACHE_PATH = DATA_ROOT_PATH / 'devices.json'
+
 PAGES_ROOT_PATH = DATA_ROOT_PATH / 'pages/'
 
+BLOBS_ROOT_PATH = DATA_ROOT_PATH / 'blobs/'
+
+PREVIEWS_ROOT_PATH = DATA_ROOT_PATH / 'previews/'
+
+LAYOUTS_ROOT_PATH = DATA_ROOT_PATH / 'layouts/'
+
+REPROCESS_JOURNAL_PATH = DATA_ROOT_PATH / 'reprocess.jsonl'
+
+LOCKS_ROOT_PATH = DATA_ROOT_PATH / 'locks/'
+
+JOBS_WORKER_LOCK_PATH = LOCKS_ROOT_PATH / 'worker.lock'
+
+MAX_PAGES_TO_APPEND = 100
+
+DEFAULT_PDF_RESOLUTION = 150
+
+# Pixels per inch sizes of PDF pages are computed with (PDF files have always
+# been made with this scale, so it is kept for them to look the same)
+PDF_PAGE_RESOLUTION = 150
+
+# What is done with blank pages: they are kept as they are scanned, stored as
+# placeholders and put to PDF as empty pages, or dropped from PDF
+BLANK_PAGES_POLICIES = ('keep', 'empty', 'drop')
+
+MAX_PAGES_TO_APPEND_FROM_FEEDER = 10000
+
+# Finished jobs older than this number of the latest jobs are removed
+MAX_PDF_JOBS_KEPT = 100
+
 SQL_CREATE_TABLE_NOTEBOOK_TYPE = '''CREATE TABLE IF NOT EXISTS notebook_type(
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     title TEXT UNIQUE,
     page_width INTEGER,
     page_height INTEGER,
-    pages_paired INTEGER)'''
+    pages_paired INTEGER,
+    pdf_resolution INTEGER DEFAULT 150,
+    codec TEXT DEFAULT 'jpeg',
+    binarization TEXT DEFAULT 'none',
+    deskew INTEGER DEFAULT 0,
+    blank_pages TEXT DEFAULT 'keep')'''
+
+# Columns added to `notebook_type` table after the first release
+SQL_NOTEBOOK_TYPE_NEW_COLUMNS = {
+    'pdf_resolution': 'pdf_resolution INTEGER DEFAULT 150',
+    'codec': "codec TEXT DEFAULT 'jpeg'",
+    'binarization': "binarization TEXT DEFAULT 'none'",
+    'deskew': 'deskew INTEGER DEFAULT 0',
+    'blank_pages': "blank_pages TEXT DEFAULT 'keep'",
+}
+
+SQL_ADD_COLUMN_TO_NOTEBOOK_TYPE = '''ALTER TABLE notebook_type
+    ADD COLUMN {}'''
+
+SQL_GET_NOTEBOOK_TYPE_COLUMNS = '''PRAGMA table_info(notebook_type)'''
 
 SQL_CREATE_TABLE_NOTEBOOK = '''CREATE TABLE IF NOT EXISTS notebook(
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -30,6 +80,24 @@ SQL_CREATE_TABLE_NOTEBOOK = '''CREATE TABLE IF NOT EXISTS notebook(
     first_page_number INTEGER,
     FOREIGN KEY(type_id) REFERENCES notebook_type(id))'''
 
+SQL_CREATE_TABLE_PAGE = '''CREATE TABLE IF NOT EXISTS page(
+    notebook_id INTEGER NOT NULL,
+    number INTEGER NOT NULL,
+    blob TEXT NOT NULL,
+    PRIMARY KEY(notebook_id, number),
+    FOREIGN KEY(notebook_id) REFERENCES notebook(id))'''
+
+SQL_CREATE_TABLE_PDF_JOB = '''CREATE TABLE IF NOT EXISTS pdf_job(
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    notebook_id INTEGER NOT NULL,
+    profile TEXT,
+    status TEXT DEFAULT 'queued',
+    done INTEGER DEFAULT 0,
+    total INTEGER DEFAULT 0,
+    error TEXT DEFAULT '',
+    updated TEXT DEFAULT (datetime('now', 'localtime')),
+    FOREIGN KEY(notebook_id) REFERENCES notebook(id))'''
+
 SQL_TABLE_EXISTS = '''SELECT COUNT(*) FROM sqlite_master
     WHERE type='table' AND name=?'''
 
@@ -56,18 +124,34 @@ SQL_UPDATE_NOTEBOOK = '''UPDATE notebook
 
 SQL_DELETE_NOTEBOOK = '''DELETE FROM notebook WHERE id=?'''
 
+SQL_GET_PAGES = '''SELECT number, blob FROM page WHERE notebook_id=?'''
+
+SQL_GET_BLOBS = '''SELECT DISTINCT blob FROM page'''
+
+SQL_SAVE_PAGE = '''INSERT OR REPLACE INTO
+    page(notebook_id, number, blob)
+    VALUES(?, ?, ?)'''
+
+SQL_DELETE_PAGES = '''DELETE FROM page WHERE notebook_id=?'''
+
+SQL_DELETE_PAGE = '''DELETE FROM page WHERE notebook_id=? AND number=?'''
+
 SQL_DELETE_TYPE_BY_TITLE = '''DELETE FROM notebook_type WHERE title=?'''
 
 SQL_CREATE_TYPE = '''INSERT INTO
-    notebook_type(title, page_width, page_height, pages_paired)
-    VALUES(?, ?, ?, ?)'''
+    notebook_type(title, page_width, page_height, pages_paired,
+        pdf_resolution, codec, binarization, deskew, blank_pages)
+    VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)'''
 
 SQL_UPDATE_TYPE = '''UPDATE notebook_type
-    SET title=?, page_width=?, page_height=?, pages_paired=?
+    SET title=?, page_width=?, page_height=?, pages_paired=?,
+    pdf_resolution=?, codec=?, binarization=?, deskew=?, blank_pages=?
     WHERE id=?'''
 
 SQL_GET_NOTEBOOK_BY_TITLE = '''SELECT * FROM notebook WHERE title=?'''
 
+SQL_GET_NOTEBOOK_BY_ID = '''SELECT * FROM notebook WHERE id=?'''
+
 SQL_GET_NOTEBOOK_BY_PATH = '''SELECT * FROM notebook WHERE path=?'''
 
 SQL_GET_TYPES = '''SELECT * FROM notebook_type ORDER BY title'''
@@ -79,3 +163,34 @@ SQL_GET_TYPE_BY_ID = '''SELECT * FROM notebook_type WHERE id=?'''
 SQL_GET_TYPE_BY_TITLE = '''SELECT * FROM notebook_type WHERE title=?'''
 
 SQL_TYPE_COUNT = '''SELECT COUNT(*) FROM notebook_type WHERE title=?'''
+
+SQL_ADD_PDF_JOB = '''INSERT INTO pdf_job(notebook_id, profile)
+    SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM pdf_job
+    WHERE notebook_id=? AND profile IS ? AND status='queued')'''
+
+SQL_GET_PDF_JOBS = '''SELECT pdf_job.*, notebook.title AS notebook_title
+    FROM pdf_job LEFT JOIN notebook ON notebook.id=pdf_job.notebook_id
+    ORDER BY pdf_job.id DESC LIMIT ?'''
+
+SQL_GET_QUEUED_PDF_JOB = '''SELECT pdf_job.*, notebook.title AS notebook_title
+    FROM pdf_job LEFT JOIN notebook ON notebook.id=pdf_job.notebook_id
+    WHERE status='queued' ORDER BY pdf_job.id LIMIT 1'''
+
+SQL_START_PDF_JOB = '''UPDATE pdf_job
+    SET status='running', updated=datetime('now', 'localtime')
+    WHERE status='queued' AND id=?'''
+
+SQL_UPDATE_PDF_JOB = '''UPDATE pdf_job
+    SET status=?, done=?, total=?, error=?,
+    updated=datetime('now', 'localtime')
+    WHERE id=?'''
+
+SQL_RESET_PDF_JOBS = """UPDATE pdf_job
+    SET status='queued', updated=datetime('now', 'localtime')
+    WHERE status='running'"""
+
+SQL_DELETE_OLD_PDF_JOBS = '''DELETE FROM pdf_job
+    WHERE status IN ('done', 'failed') AND id NOT IN
+    (SELECT id FROM pdf_job ORDER BY id DESC LIMIT ?)'''
+
+SQL_DELETE_PDF_JOBS = '''DELETE FROM pdf_job WHERE notebook_id=?'''
@@ -15,7 +15,7 @@
 import logging
 import pathlib
 import sqlite3
-from typing import List
+from typing import Dict, List, Optional, Set
 
 from smth import const, models
 
@@ -51,6 +51,8 @@ class DB:
                 type_a4 = models.NotebookType('A4', 210, 297)
                 self.save_type(type_a4)
                 log.info("Type 'A4' created")
+            else:
+                self._add_new_type_columns(connection)
 
             cursor = connection.execute(const.SQL_TABLE_EXISTS, ('notebook',))
             table_exists = cursor.fetchone()[0] > 0
@@ -59,6 +61,20 @@ class DB:
                 connection.execute(const.SQL_CREATE_TABLE_NOTEBOOK)
                 log.info("Table 'notebook' created")
 
+            cursor = connection.execute(const.SQL_TABLE_EXISTS, ('page',))
+            table_exists = cursor.fetchone()[0] > 0
+
+            if not table_exists:
+                connection.execute(const.SQL_CREATE_TABLE_PAGE)
+                log.info("Table 'page' created")
+
+            cursor = connection.execute(const.SQL_TABLE_EXISTS, ('pdf_job',))
+            table_exists = cursor.fetchone()[0] > 0
+
+            if not table_exists:
+                connection.execute(const.SQL_CREATE_TABLE_PDF_JOB)
+                log.info("Table 'pdf_job' created")
+
             connection.commit()
 
         except sqlite3.Error as exception:
@@ -127,6 +143,40 @@ class DB:
 
         return notebook
 
+    def get_notebook_by_id(self, id_: int) -> models.Notebook:
+        """Return notebook with the given id from database.
+
+        If there is no such notebook, returns an empty one with id -1.
+
+        Args:
+            id_:
+                ID of a notebook.
+        Raises:
+            db.Error:
+                An error occured executing the query.
+        """
+        notebook = models.Notebook(
+            '', models.NotebookType('', 0, 0), pathlib.Path())
+
+        connection = None
+
+        try:
+            connection = self._connect()
+            cursor = connection.execute(const.SQL_GET_NOTEBOOK_BY_ID, (id_,))
+            row = cursor.fetchone()
+            if row:
+                notebook = self._make_notebook_from_row(row)
+
+        except (sqlite3.Error, Error) as exception:
+            self._handle_error(
+                'Failed to get notebook from database', exception)
+
+        finally:
+            if connection:
+                connection.close()
+
+        return notebook
+
     def get_notebook_by_path(self, path: str) -> models.Notebook:
         """Return notebook with specific path from database.
 
@@ -246,7 +296,10 @@ class DB:
         return exists
 
     def save_notebook(self, notebook: models.Notebook) -> None:
-        """Create or update notebook.
+        """Create or update notebook with its manifest of pages.
+
+        Renaming a notebook changes only its row, pages are not touched.
+        Pages which are not in the manifest anymore are deleted.
 
         Args:
             notebook:
@@ -265,7 +318,8 @@ class DB:
                 values = (
                     notebook.title, notebook.type.title, str(notebook.path),
                     notebook.total_pages, notebook.first_page_number)
-                connection.execute(const.SQL_CREATE_NOTEBOOK, values)
+                cursor = connection.execute(const.SQL_CREATE_NOTEBOOK, values)
+                notebook.id = cursor.lastrowid
             else:
                 values = (
                     notebook.title, notebook.type.title, str(notebook.path),
@@ -273,6 +327,17 @@ class DB:
                     notebook.id)
                 connection.execute(const.SQL_UPDATE_NOTEBOOK, values)
 
+                # pages which are not in the manifest anymore
+                rows = connection.execute(
+                    const.SQL_GET_PAGES, (notebook.id,)).fetchall()
+                connection.executemany(const.SQL_DELETE_PAGE, [
+                    (notebook.id, number) for number, _ in rows
+                    if number not in notebook.pages])
+
+            connection.executemany(const.SQL_SAVE_PAGE, [
+                (notebook.id, page, blob)
+                for page, blob in notebook.pages.items()])
+
             connection.commit()
 
         except sqlite3.Error as exception:
@@ -298,6 +363,8 @@ class DB:
 
         try:
             connection = sqlite3.connect(self._path)
+            connection.execute(const.SQL_DELETE_PAGES, (id_,))
+            connection.execute(const.SQL_DELETE_PDF_JOBS, (id_,))
             connection.execute(const.SQL_DELETE_NOTEBOOK, (id_,))
             connection.commit()
 
@@ -308,6 +375,30 @@ class DB:
             if connection:
                 connection.close()
 
+    def get_blobs(self) -> Set[str]:
+        """Return blobs of pages which notebooks refer to.
+
+        Raises:
+            db.Error:
+                An error occured executing the query.
+        """
+        blobs = set()
+        connection = None
+
+        try:
+            connection = self._connect()
+            for row in connection.execute(const.SQL_GET_BLOBS):
+                blobs.add(row['blob'])
+
+        except sqlite3.Error as exception:
+            self._handle_error('Failed to get pages from database', exception)
+
+        finally:
+            if connection:
+                connection.close()
+
+        return blobs
+
     def get_types(self) -> List[models.NotebookType]:
         """Return list of types from database.
 
@@ -469,12 +560,15 @@ class DB:
             if type_.id < 0:
                 values = (
                     type_.title, type_.page_width, type_.page_height,
-                    type_.pages_paired)
+                    type_.pages_paired, type_.pdf_resolution, type_.codec,
+                    type_.binarization, type_.deskew, type_.blank_pages)
                 connection.execute(const.SQL_CREATE_TYPE, values)
             else:
                 values = (
                     type_.title, type_.page_width, type_.page_height,
-                    type_.pages_paired, type_.id)
+                    type_.pages_paired, type_.pdf_resolution, type_.codec,
+                    type_.binarization, type_.deskew, type_.blank_pages,
+                    type_.id)
                 connection.execute(const.SQL_UPDATE_TYPE, values)
 
             connection.commit()
@@ -511,6 +605,164 @@ class DB:
             if connection:
                 connection.close()
 
+    def add_pdf_job(
+            self, notebook_id: int, profile: Optional[str] = None) -> None:
+        """Queue making the notebook's PDF file unless it is queued already.
+
+        Old finished jobs are removed.
+
+        Args:
+            notebook_id:
+                ID of the notebook.
+            profile:
+                Name of the profile the PDF file is made with or None for the
+                notebook's own PDF file.
+
+        Raises:
+            db.Error:
+                An error occured executing the query.
+        """
+        connection = None
+
+        try:
+            connection = self._connect()
+            connection.execute(
+                const.SQL_ADD_PDF_JOB,
+                (notebook_id, profile, notebook_id, profile))
+            connection.execute(
+                const.SQL_DELETE_OLD_PDF_JOBS, (const.MAX_PDF_JOBS_KEPT,))
+            connection.commit()
+
+        except sqlite3.Error as exception:
+            self._handle_error('Failed to queue PDF job', exception)
+
+        finally:
+            if connection:
+                connection.close()
+
+    def take_pdf_job(self) -> Optional[models.PDFJob]:
+        """Mark the oldest queued job as running and return it.
+
+        Returns None if no jobs are queued.
+
+        Raises:
+            db.Error:
+                An error occured executing the query.
+        """
+        connection = None
+
+        try:
+            connection = self._connect()
+
+            while True:
+                row = connection.execute(
+                    const.SQL_GET_QUEUED_PDF_JOB).fetchone()
+
+                if row is None:
+                    return None
+
+                # the job may have been taken since it was selected
+                cursor = connection.execute(
+                    const.SQL_START_PDF_JOB, (row['id'],))
+                connection.commit()
+
+                if cursor.rowcount:
+                    return self._make_pdf_job_from_row(row)._replace(
+                        status='running')
+
+        except sqlite3.Error as exception:
+            self._handle_error('Failed to take PDF job', exception)
+
+        finally:
+            if connection:
+                connection.close()
+
+        return None
+
+    def update_pdf_job(self, job: models.PDFJob) -> None:
+        """Save the job's status, progress and error.
+
+        Raises:
+            db.Error:
+                An error occured executing the query.
+        """
+        connection = None
+
+        try:
+            connection = self._connect()
+            connection.execute(const.SQL_UPDATE_PDF_JOB, (
+                job.status, job.done, job.total, job.error, job.id))
+            connection.commit()
+
+        except sqlite3.Error as exception:
+            self._handle_error('Failed to update PDF job', exception)
+
+        finally:
+            if connection:
+                connection.close()
+
+    def reset_pdf_jobs(self) -> None:
+        """Queue running jobs again, e.g. after their worker was killed.
+
+        Raises:
+            db.Error:
+                An error occured executing the query.
+        """
+        connection = None
+
+        try:
+            connection = self._connect()
+            connection.execute(const.SQL_RESET_PDF_JOBS)
+            connection.commit()
+
+        except sqlite3.Error as exception:
+            self._handle_error('Failed to reset PDF jobs', exception)
+
+        finally:
+            if connection:
+                connection.close()
+
+    def get_pdf_jobs(self, limit: int = 20) -> List[models.PDFJob]:
+        """Return the latest jobs, the newest first.
+
+        Raises:
+            db.Error:
+                An error occured executing the query.
+        """
+        jobs = []
+        connection = None
+
+        try:
+            connection = self._connect()
+            for row in connection.execute(const.SQL_GET_PDF_JOBS, (limit,)):
+                jobs.append(self._make_pdf_job_from_row(row))
+
+        except sqlite3.Error as exception:
+            self._handle_error(
+                'Failed to get PDF jobs from database', exception)
+
+        finally:
+            if connection:
+                connection.close()
+
+        return jobs
+
+    def _add_new_type_columns(self, connection: sqlite3.Connection) -> None:  # pylint: disable=no-self-use  # noqa: E501
+        """Add columns missing in `notebook_type` table of older versions.
+
+        Raises:
+            sqlite3.Error:
+                Error when altering the table failed.
+        """
+        cursor = connection.execute(const.SQL_GET_NOTEBOOK_TYPE_COLUMNS)
+        columns = {row['name'] for row in cursor}
+
+        for column, definition in const.SQL_NOTEBOOK_TYPE_NEW_COLUMNS.items():
+            if column not in columns:
+                connection.execute(
+                    const.SQL_ADD_COLUMN_TO_NOTEBOOK_TYPE.format(definition))
+                log.info("Column '%s' added to 'notebook_type'", column)
+
     def _connect(self) -> sqlite3.Connection:
         """Connect to the database and return the connection object.
 
@@ -534,11 +786,41 @@ class DB:
         notebook.id = row['id']
         notebook.total_pages = row['total_pages']
         notebook.first_page_number = row['first_page_number']
+        notebook.pages = self._get_pages(notebook.id)
         return notebook
 
+    def _get_pages(self, notebook_id: int) -> Dict[int, str]:
+        """Return the manifest of notebook's pages.
+
+        Raises:
+            sqlite3.Error:
+                Error executing the query.
+        """
+        connection = self._connect()
+
+        try:
+            return {
+                row['number']: row['blob']
+                for row in connection.execute(
+                    const.SQL_GET_PAGES, (notebook_id,))}
+
+        finally:
+            connection.close()
+
     def _make_type_from_row(self, row: sqlite3.Row) -> models.NotebookType:  # pylint: disable=no-self-use  # noqa: E501
         type_ = models.NotebookType(
             row['title'], row['page_width'], row['page_height'])
         type_.id = row['id']
         type_.pages_paired = row['pages_paired'] > 0
+        type_.pdf_resolution = row['pdf_resolution']
+        type_.codec = row['codec']
+        type_.binarization = row['binarization']
+        type_.deskew = row['deskew'] > 0
+        type_.blank_pages = row['blank_pages']
         return type_
+
+    def _make_pdf_job_from_row(self, row: sqlite3.Row) -> models.PDFJob:  # pylint: disable=no-self-use  # noqa: E501
+        return models.PDFJob(
+            row['id'], row['notebook_id'], row['notebook_title'],
+            row['profile'], row['status'], row['done'], row['total'],
+            row['error'], row['updated'])
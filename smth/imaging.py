@@ -0,0 +1,482 @@
+# License: GNU GPL Version 3
+
+"""The module provides functions to analyze and process scanned images.
+
+All functions work with NumPy arrays, so they are fast enough to be used
+while scanning.
+
+    Typical usage example:
+
+    preview = device.scan()
+    box = imaging.find_page_box(preview)
+
+    if box:
+        page = preview.crop(box)
+"""
+
+import logging
+import math
+from typing import Any, Optional, Tuple
+
+import numpy as np
+import PIL.Image as pillow
+
+log = logging.getLogger(__name__)
+
+Box = Tuple[int, int, int, int]
+
+Size = Tuple[int, int]
+
+# Minimal difference between neighbor pixels which is treated as an edge
+EDGE_THRESHOLD = 24
+
+# Share of pixels in a row or a column which must be edges to be a part of page
+EDGE_DENSITY = 0.01
+
+# Pixels at image borders ignored because of shadows from scanner's frame
+BORDER = 2
+
+# Length in pixels of the shorter side of images the skew is found on
+DESKEW_SIZE = 600
+
+# Maximum skew angle in degrees which is corrected
+MAX_SKEW_ANGLE = 5.0
+
+# Steps in degrees between angles which are checked to find the skew
+SKEW_COARSE_STEP = 0.5
+SKEW_FINE_STEP = 0.05
+
+# Pages skewed less than by this angle in degrees are not rotated
+MIN_SKEW_ANGLE = 0.1
+
+# Pages are rotated by small angles, so the nearest pixel is good enough and
+# several times faster than interpolation
+DESKEW_RESAMPLE = pillow.NEAREST
+
+# Minimal share of dark pixels on a page to find the skew
+MIN_INK = 0.001
+
+# Maximum share of image's width or height trimmed from each side
+MAX_TRIM = 0.1
+
+# Minimal share of dark pixels in a row or a column of a border
+BORDER_DARKNESS = 0.5
+
+BINARIZATION_METHODS = ('none', 'otsu', 'sauvola')
+
+# Size in pixels of the window around a pixel for Sauvola's threshold
+SAUVOLA_WINDOW = 31
+
+# Sensitivity of Sauvola's threshold to the local contrast
+SAUVOLA_K = 0.2
+
+# Dynamic range of the standard deviation of gray levels
+SAUVOLA_R = 128
+
+# Number of rows binarized at once with Sauvola's method
+SAUVOLA_BAND_HEIGHT = 256
+
+# Length in pixels of the shorter side of images checked for being blank
+BLANK_SIZE = 800
+
+# Share of image's width or height ignored at each side because of shadows
+# from page edges and the binding
+BLANK_MARGIN = 0.05
+
+# Minimal difference between the paper and a pixel which is treated as ink
+BLANK_CONTRAST = 80
+
+# Maximum share of ink pixels on a blank page, enough for dust and specks
+BLANK_INK_COVERAGE = 0.0002
+
+
+def find_page_box(image: pillow.Image) -> Optional[Box]:
+    """Finds the bounding box of a page on a scanned image.
+
+    Edges (big differences between neighbor pixels) are found on a grayscale
+    copy of the image, then projected to rows and columns.  The page is the
+    area between the first and the last rows and columns which contain
+    enough edges.  Page borders as well as the text on the page are edges,
+    so the page is found on both dark and light scanner backgrounds.
+
+    Should be used with small images (e.g. preview scans).
+
+    Args:
+        image:
+            A scanned image.
+
+    Returns:
+        A box with the page or None if no page found.
+    """
+    pixels = np.asarray(image.convert('L'), dtype=np.int16)
+    height, width = pixels.shape
+
+    if width <= 2 * BORDER or height <= 2 * BORDER:
+        return None
+
+    edges = np.zeros(pixels.shape, dtype=bool)
+    edges[:, 1:] |= np.abs(np.diff(pixels, axis=1)) > EDGE_THRESHOLD
+    edges[1:, :] |= np.abs(np.diff(pixels, axis=0)) > EDGE_THRESHOLD
+
+    edges[:BORDER + 1, :] = False
+    edges[-BORDER:, :] = False
+    edges[:, :BORDER + 1] = False
+    edges[:, -BORDER:] = False
+
+    rows = np.flatnonzero(edges.sum(axis=1) > max(1, EDGE_DENSITY * width))
+    cols = np.flatnonzero(edges.sum(axis=0) > max(1, EDGE_DENSITY * height))
+
+    if rows.size == 0 or cols.size == 0:
+        return None
+
+    # An edge is marked on the first pixel after the difference,
+    # so the last edge is already outside the page
+    left, right = int(cols[0]), max(int(cols[-1]), int(cols[0]) + 1)
+    upper, lower = int(rows[0]), max(int(rows[-1]), int(rows[0]) + 1)
+
+    return left, upper, right, lower
+
+
+def reduce_image(image: pillow.Image, size: Size) -> None:
+    """Reduces an image in place to fit the given size.
+
+    The image is never enlarged.  If the image is a JPEG file which is not
+    loaded yet, it is decoded at the smallest scale (1/2, 1/4 or 1/8) which
+    is still at least twice bigger than the size, so a page scanned at
+    600 dpi is not fully decoded to be put to PDF at 150 dpi.  Then the
+    image is reduced by an integer factor and resized with antialiasing.
+
+    Args:
+        image:
+            An image opened with `PIL.Image.open()`.
+        size:
+            Maximum width and height of the image in pixels.
+    """
+    if image.width > size[0] or image.height > size[1]:
+        image.thumbnail(size, pillow.LANCZOS, reducing_gap=2.0)
+
+
+def binarize(image: pillow.Image, method: str) -> pillow.Image:
+    """Converts the image to black and white with the method.
+
+    Args:
+        image:
+            An image to convert.
+        method:
+            One of BINARIZATION_METHODS.  If 'none', the image is returned
+            as it is.
+
+    Returns:
+        A bilevel image (mode '1').
+    """
+    if method == 'otsu':
+        return binarize_otsu(image)
+
+    if method == 'sauvola':
+        return binarize_sauvola(image)
+
+    return image
+
+
+def get_otsu_threshold(gray: np.ndarray) -> int:
+    """Returns the gray level which best separates ink from paper.
+
+    The threshold maximizes the variance between the two classes of pixels
+    (Otsu's method).  It is computed from the histogram, so each pixel is
+    looked at only once.
+
+    Args:
+        gray:
+            An array of 8-bit gray levels.
+
+    Returns:
+        The highest gray level of dark pixels.
+    """
+    histogram = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256, dtype=np.float64)
+
+    weight_dark = np.cumsum(histogram)
+    weight_light = weight_dark[-1] - weight_dark
+
+    sum_dark = np.cumsum(histogram * levels)
+    mean_dark = sum_dark / np.maximum(weight_dark, 1)
+    mean_light = (sum_dark[-1] - sum_dark) / np.maximum(weight_light, 1)
+
+    variance = weight_dark * weight_light * (mean_dark - mean_light) ** 2
+    return int(np.argmax(variance))
+
+
+def binarize_otsu(image: pillow.Image) -> pillow.Image:
+    """Converts the image to black and white with a global threshold.
+
+    Works well for evenly lit pages.  See `get_otsu_threshold()`.
+    """
+    gray = np.asarray(image.convert('L'))
+    return pillow.fromarray(gray > get_otsu_threshold(gray))
+
+
+def binarize_sauvola(
+        image: pillow.Image, window: int = SAUVOLA_WINDOW,
+        k: float = SAUVOLA_K) -> pillow.Image:
+    """Converts the image to black and white with a local threshold.
+
+    The threshold of each pixel depends on the mean and the standard
+    deviation of gray levels in the window around it (Sauvola's method),
+    so shadows and uneven paper do not turn black.  Sums over windows are
+    taken from integral images.  The image is processed in bands of rows,
+    so integral images of the whole page are never kept in memory.
+
+    Args:
+        image:
+            An image to convert.
+        window:
+            Size of the window in pixels.
+        k:
+            Sensitivity to the local contrast (usually from 0.2 to 0.5).
+    """
+    gray = np.asarray(image.convert('L'))
+    height, width = gray.shape
+    radius = window // 2
+
+    result = np.empty(gray.shape, dtype=bool)
+
+    columns = np.arange(width)
+    left = np.clip(columns - radius, 0, width)
+    right = np.clip(columns + radius + 1, 0, width)
+
+    for start in range(0, height, SAUVOLA_BAND_HEIGHT):
+        end = min(height, start + SAUVOLA_BAND_HEIGHT)
+
+        # rows of the band with the rows their windows need
+        top = max(0, start - radius)
+        bottom = min(height, end + radius)
+        band = gray[top:bottom].astype(np.int32)
+
+        rows = np.arange(start, end) - top
+        upper = np.clip(rows - radius, 0, bottom - top)
+        lower = np.clip(rows + radius + 1, 0, bottom - top)
+
+        area = np.outer(lower - upper, right - left).astype(np.float32)
+        mean = _sum_windows(band, upper, lower, left, right) / area
+        mean_of_squares = _sum_windows(
+            band * band, upper, lower, left, right) / area
+
+        variance = mean_of_squares - mean * mean
+        deviation = np.sqrt(np.maximum(variance, 0, out=variance))
+        threshold = mean * (1 + k * (deviation / SAUVOLA_R - 1))
+
+        result[start:end] = gray[start:end] > threshold
+
+    return pillow.fromarray(result)
+
+
+def _sum_windows(  # pylint: disable=too-many-arguments
+        array: np.ndarray, upper: np.ndarray, lower: np.ndarray,
+        left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Returns sums of the array over windows given by their bounds.
+
+    The sums are differences of integral images, which are computed along
+    columns and then along rows.
+
+    Args:
+        array:
+            A 2D array of 32-bit integers.
+        upper, lower:
+            The first and the next after the last rows of each row's window.
+        left, right:
+            The first and the next after the last columns of each column's
+            window.
+    """
+    # Integral images of 32-bit integers may overflow, but differences of
+    # them are still correct as each window's sum fits in 32 bits.
+    integral = np.zeros((array.shape[0] + 1, array.shape[1]), dtype=np.int32)
+    np.cumsum(array, axis=0, out=integral[1:])
+    columns = integral[lower] - integral[upper]
+
+    integral = np.zeros(
+        (columns.shape[0], columns.shape[1] + 1), dtype=np.int32)
+    np.cumsum(columns, axis=1, out=integral[:, 1:])
+    return integral[:, right] - integral[:, left]
+
+
+def deskew(image: pillow.Image) -> pillow.Image:
+    """Trims dark borders from the image and straightens the page on it.
+
+    The borders and the skew angle are found on a reduced copy of the image
+    (see `get_trim_box()` and `get_skew_angle()`).  Then the image is trimmed
+    and rotated with a single affine transformation.
+
+    Returns:
+        The same image if it is neither skewed nor has dark borders.
+    """
+    small = image.convert('L')
+    factor = max(1, min(small.size) // DESKEW_SIZE)
+
+    if factor > 1:
+        small = small.reduce(factor)
+
+    box = get_trim_box(small)
+    angle = get_skew_angle(small.crop(box))
+
+    left, upper, right, lower = (coordinate * factor for coordinate in box)
+    right = image.width if box[2] == small.width else min(right, image.width)
+    lower = (image.height if box[3] == small.height
+             else min(lower, image.height))
+
+    if abs(angle) < MIN_SKEW_ANGLE:
+        if (left, upper, right, lower) == (0, 0) + image.size:
+            return image
+
+        return image.crop((left, upper, right, lower))
+
+    # the same matrix as in `PIL.Image.rotate()` moved to the trimmed area
+    radians = -math.radians(angle)
+    a, b = math.cos(radians), math.sin(radians)
+    d, e = -b, a
+    center_x, center_y = (right - left) / 2, (lower - upper) / 2
+    c = center_x + left - a * center_x - b * center_y
+    f = center_y + upper - d * center_x - e * center_y
+
+    fill = 255 if image.mode in ('1', 'L') else (255,) * len(image.mode)
+
+    return image.transform(
+        (right - left, lower - upper), pillow.AFFINE, (a, b, c, d, e, f),
+        DESKEW_RESAMPLE, fillcolor=fill)
+
+
+def get_skew_angle(gray: pillow.Image) -> float:
+    """Returns the angle in degrees the page should be rotated by.
+
+    Dark pixels are projected to rows along each candidate angle.  Lines of
+    text give the sharpest projection (the highest variance of rows' sums)
+    when the projection is parallel to them.  Angles are checked with a
+    coarse step first and then with a fine step around the best one.
+
+    Args:
+        gray:
+            A grayscale image, usually reduced.
+
+    Returns:
+        An angle to rotate the image counter-clockwise by, as in
+        `PIL.Image.rotate()`.
+    """
+    pixels = np.asarray(gray)
+    rows, columns = np.nonzero(pixels <= get_otsu_threshold(pixels))
+
+    if len(rows) < pixels.size * MIN_INK or len(rows) > pixels.size / 2:
+        return 0.0
+
+    rows = rows.astype(np.float64)
+    columns = columns.astype(np.float64) - pixels.shape[1] / 2
+
+    def get_best_angle(angles: np.ndarray) -> float:
+        variances = []
+
+        for angle in angles:
+            shifted = rows + columns * math.tan(math.radians(angle))
+            profile = np.bincount(
+                np.rint(shifted - shifted.min()).astype(np.int64))
+            variances.append(profile.var())
+
+        return float(angles[int(np.argmax(variances))])
+
+    angle = get_best_angle(np.arange(
+        -MAX_SKEW_ANGLE, MAX_SKEW_ANGLE + SKEW_COARSE_STEP, SKEW_COARSE_STEP))
+    angle = get_best_angle(np.arange(
+        angle - SKEW_COARSE_STEP, angle + SKEW_COARSE_STEP + SKEW_FINE_STEP,
+        SKEW_FINE_STEP))
+
+    # lines skewed by the angle are rotated by the opposite one
+    return round(-angle, 2) + 0.0
+
+
+def get_trim_box(gray: pillow.Image) -> Box:
+    """Returns the box without dark borders along the image's edges.
+
+    Rows and columns at the edges are trimmed while most of their pixels
+    are dark, but not more than MAX_TRIM of the image from each side.
+
+    Args:
+        gray:
+            A grayscale image, usually reduced.
+    """
+    pixels = np.asarray(gray)
+    dark = pixels <= get_otsu_threshold(pixels)
+
+    def count_dark_lines(darkness: np.ndarray) -> int:
+        limit = int(len(darkness) * MAX_TRIM)
+        light = np.nonzero(darkness[:limit] < BORDER_DARKNESS)[0]
+        return int(light[0]) if len(light) > 0 else limit
+
+    rows_darkness = dark.mean(axis=1)
+    columns_darkness = dark.mean(axis=0)
+
+    height, width = dark.shape
+    return (count_dark_lines(columns_darkness),
+            count_dark_lines(rows_darkness),
+            width - count_dark_lines(columns_darkness[::-1]),
+            height - count_dark_lines(rows_darkness[::-1]))
+
+
+def is_blank(image: pillow.Image) -> bool:
+    """Checks if there is nothing written or drawn on the page.
+
+    The page is reduced to about BLANK_SIZE pixels and its margins are
+    ignored.  Pixels which are darker than the paper by BLANK_CONTRAST are
+    treated as ink.  The page is blank if the share of ink pixels is less
+    than BLANK_INK_COVERAGE.
+
+    Args:
+        image:
+            A cropped page in any mode.
+    """
+    gray = image.convert('L')
+    factor = min(gray.size) // BLANK_SIZE
+
+    if factor > 1:
+        gray = gray.reduce(factor)
+
+    pixels = np.asarray(gray)
+    height, width = pixels.shape
+    margin_y, margin_x = int(height * BLANK_MARGIN), int(width * BLANK_MARGIN)
+    pixels = pixels[margin_y:height - margin_y, margin_x:width - margin_x]
+
+    if pixels.size == 0:
+        return True
+
+    histogram = np.bincount(pixels.ravel(), minlength=256)
+
+    # the 90th percentile of gray levels is the paper, ink is much darker
+    paper = int(np.searchsorted(np.cumsum(histogram), pixels.size * 0.9))
+    ink = int(histogram[:max(0, paper - BLANK_CONTRAST + 1)].sum())
+
+    return ink < pixels.size * BLANK_INK_COVERAGE
+
+
+def clean_page(
+        image: pillow.Image, notebook_type: Any) -> Optional[pillow.Image]:
+    """Prepares a cropped page to be stored as the notebook's type requires.
+
+    The page is straightened, checked for being blank and converted to black
+    and white, if the type's settings say so.
+
+    Args:
+        image:
+            A cropped page.
+        notebook_type:
+            `models.NotebookType` of the page's notebook.
+
+    Returns:
+        The page or None if it is blank and the type does not keep blank
+        pages.
+    """
+    if notebook_type.deskew:
+        image = deskew(image)
+
+    if notebook_type.blank_pages != 'keep' and is_blank(image):
+        return None
+
+    if notebook_type.binarization != 'none':
+        image = binarize(image, notebook_type.binarization)
+
+    return image
@@ -0,0 +1,378 @@
+# License: GNU GPL Version 3
+
+"""The module makes notebooks' PDF files in foreground or in background.
+
+Making the PDF file of a large notebook takes a while, so after scanning it
+is queued (see `submit()`) and made by a worker process detached from the
+terminal, which runs `smth jobs --run`.  The queue is a table in the
+database, so `smth jobs` shows what is being done.
+
+Only one worker runs at a time.  PDF files of a notebook are made under the
+notebook's lock (see `lock_notebook()`), so a file made in foreground, e.g.
+by `smth scan --pdf-only`, and the worker never write it at the same time.
+Locks are `flock()` locks, so they are released when their process exits,
+even if it is killed.
+
+PDF files of many notebooks, e.g. after a restore, are made by a pool of
+worker processes (see `make_pdfs()`).  A digest of the notebook's pages and
+settings is saved with the layout of its PDF file, so notebooks whose PDF
+files are up to date are skipped before their sheets are even listed.
+
+    Typical usage example:
+
+    jobs.submit(db_, notebook.id)
+
+    path, failed = jobs.make_pdf(notebook, 'screen')
+"""
+
+import collections
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import subprocess
+import sys
+import time
+from concurrent import futures
+from typing import (Callable, Dict, Iterable, Iterator, List, Optional, Set,
+                    TextIO, Tuple)
+
+import PIL.Image as pillow
+
+from smth import const, db, models, page_codecs, pdf
+
+log = logging.getLogger(__name__)
+
+# Seconds between saving progress of a job to the database
+PROGRESS_INTERVAL = 1.0
+
+# Number of processes which make PDF files of many notebooks
+WORKERS = os.cpu_count() or 1
+
+Result = collections.namedtuple('Result', 'notebook path failed error')
+Result.__doc__ = """A PDF file made by `make_pdfs()`.
+
+Attributes:
+    notebook:
+        The notebook whose PDF file is made.
+    path:
+        Path to the PDF file.
+    failed:
+        Slots whose images could not be read.
+    error:
+        Error message if the file could not be made, otherwise None.
+"""
+
+
+def get_sheets(notebook: models.Notebook) -> List[List[pdf.Slot]]:
+    """Returns pages of the notebook to put on each page of PDF.
+
+    If pages are paired, each PDF page holds a spread.  Blank pages are left
+    empty or dropped depending on the type's settings.
+    """
+    pages = range(
+        notebook.first_page_number,
+        notebook.first_page_number + notebook.total_pages)
+    slots = {}
+
+    for page in pages:
+        page_path = notebook.get_page_path(page)
+
+        if not page_codecs.is_blank_page(page_path):
+            slots[page] = pdf.Slot(
+                notebook.pages.get(page, str(page_path)), page_path)
+
+    sheets = []
+
+    for page in pages:
+        if notebook.type.pages_paired:
+            if notebook.first_page_number % 2 != page % 2:
+                # the right page is added with the left one
+                continue
+
+            spread = (page, page + 1)
+        else:
+            spread = (page,)
+
+        if (notebook.type.blank_pages == 'drop' and
+                all(page_ not in slots for page_ in spread)):
+            continue
+
+        # the page or a half of the spread is left empty
+        sheets.append([slots.get(page_) for page_ in spread])
+
+    return sheets
+
+
+def get_manifest_digest(
+        notebook: models.Notebook, profile: Optional[str] = None) -> str:
+    """Returns a digest of everything that defines the notebook's PDF file.
+
+    Names of blobs are digests of pages, so the digest changes when any page
+    changes.
+    """
+    type_ = notebook.type
+    manifest = [
+        sorted(notebook.pages.items()), notebook.first_page_number,
+        notebook.total_pages, type_.page_width, type_.page_height,
+        type_.pages_paired, type_.pdf_resolution, type_.blank_pages,
+        const.PDF_PAGE_RESOLUTION, profile,
+    ]
+    return hashlib.sha256(json.dumps(manifest).encode()).hexdigest()
+
+
+def is_pdf_up_to_date(
+        notebook: models.Notebook, profile: Optional[str] = None) -> bool:
+    """Returns True if the PDF file was made from the notebook's pages.
+
+    The file must not have been changed since it was made.
+    """
+    path = (pdf.get_profile_path(notebook.path, profile) if profile
+            else notebook.path)
+    digest = pdf.get_digest(path, pdf.get_layout_path(notebook.id, profile))
+    return digest == get_manifest_digest(notebook, profile)
+
+
+def make_pdf(
+        notebook: models.Notebook, profile: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        workers: Optional[int] = None
+) -> Tuple[pathlib.Path, List[pdf.Slot]]:
+    """Makes the notebook's PDF file or its copy with the profile.
+
+    Waits until no one else makes PDF files of the notebook.  Only pages
+    which have changed since the file was made are written (see `pdf`).
+
+    Args:
+        notebook:
+            A notebook whose PDF file is made.
+        profile:
+            Name of the profile (see `pdf.PROFILES`).  If given, the PDF file
+            is saved next to the notebook's PDF file, which is left as it is.
+        progress:
+            Called with the number of PDF pages done and the number of all
+            pages.
+        workers:
+            Number of threads which prepare images (see `pdf.update()`).
+
+    Returns:
+        Path to the PDF file and slots whose images could not be read.
+
+    Raises:
+        OSError:
+            Failed to write the PDF file.
+    """
+    type_ = notebook.type
+    page_size = (
+        int(type_.page_width * const.PDF_PAGE_RESOLUTION / 25.4) *
+        (2 if type_.pages_paired else 1),
+        int(type_.page_height * const.PDF_PAGE_RESOLUTION / 25.4))
+
+    if profile:
+        profile_ = pdf.PROFILES[profile]
+        path = pdf.get_profile_path(notebook.path, profile)
+    else:
+        profile_ = pdf.Profile(type_.pdf_resolution, None, None)
+        path = notebook.path
+
+    resolution = profile_.resolution
+    max_image_size = (
+        int(type_.page_width * resolution / 25.4),
+        int(type_.page_height * resolution / 25.4),
+    ) if resolution else None
+
+    sheets = get_sheets(notebook)
+
+    with lock_notebook(notebook.id):
+        failed = pdf.update(
+            path, pdf.get_layout_path(notebook.id, profile), page_size,
+            sheets, max_image_size, workers, mode=profile_.mode,
+            quality=profile_.quality, progress=progress,
+            digest=get_manifest_digest(notebook, profile))
+
+    return path, failed
+
+
+def make_pdfs(
+        notebooks: Iterable[models.Notebook], profile: Optional[str] = None,
+        workers: Optional[int] = None) -> Iterator[Result]:
+    """Makes PDF files of the notebooks in a pool of worker processes.
+
+    Each worker makes one PDF file at a time with one thread preparing
+    images, so workers do not compete for cores.  Results are yielded in
+    the order PDF files are done.  If the caller stops iterating, notebooks
+    which are not started yet are cancelled.
+    """
+    workers = max(1, workers or WORKERS)
+    notebooks = iter(notebooks)
+    pending: Set[futures.Future] = set()
+    submitted: Dict[futures.Future, models.Notebook] = {}
+
+    with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        try:
+            while True:
+                for notebook in notebooks:
+                    future = executor.submit(
+                        _make_pdf_in_worker, notebook, profile)
+                    submitted[future] = notebook
+                    pending.add(future)
+
+                    if len(pending) >= 2 * workers:
+                        break
+
+                if not pending:
+                    return
+
+                done, pending = futures.wait(
+                    pending, return_when=futures.FIRST_COMPLETED)
+
+                for future in done:
+                    notebook = submitted.pop(future)
+                    yield Result(notebook, *future.result())
+
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+@contextlib.contextmanager
+def lock_notebook(notebook_id: int) -> Iterator[None]:
+    """Waits until the notebook is not locked and holds its lock.
+
+    Raises:
+        OSError:
+            Failed to create the lock file.
+    """
+    const.LOCKS_ROOT_PATH.mkdir(parents=True, exist_ok=True)
+    path = const.LOCKS_ROOT_PATH / f'{notebook_id}.lock'
+
+    with open(str(path), 'w', encoding='utf-8') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def submit(
+        db_: db.DB, notebook_id: int, profile: Optional[str] = None) -> None:
+    """Queues making the notebook's PDF file and starts the worker.
+
+    Raises:
+        db.Error:
+            Failed to queue the job.
+        OSError:
+            Failed to start the worker.
+    """
+    db_.add_pdf_job(notebook_id, profile)
+    start_worker()
+
+
+def start_worker() -> None:
+    """Starts a worker detached from the terminal.
+
+    If a worker is running already, the new one exits at once and the
+    running one takes the queued jobs.
+
+    Raises:
+        OSError:
+            Failed to start the worker.
+    """
+    subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, '-m', 'smth', 'jobs', '--run'],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def run_worker(db_: db.DB) -> None:
+    """Runs queued jobs one after another until none is left.
+
+    Returns at once if another worker is running.  Jobs which were running
+    when their worker was killed are run again.
+
+    Raises:
+        db.Error:
+            Failed to get or update jobs.
+        OSError:
+            Failed to create the lock file.
+    """
+    while True:
+        with _try_lock(const.JOBS_WORKER_LOCK_PATH) as locked:
+            if not locked:
+                return
+
+            db_.reset_pdf_jobs()
+            job = db_.take_pdf_job()
+
+            while job:
+                _run_job(db_, job)
+                job = db_.take_pdf_job()
+
+        # a job may have been queued after the last one was taken, while its
+        # worker could not get the lock and exited
+        if not any(job.status == 'queued' for job in db_.get_pdf_jobs()):
+            return
+
+
+def _run_job(db_: db.DB, job: models.PDFJob) -> None:
+    """Makes the job's PDF file and saves the job's progress and result."""
+    log.info("Making PDF of '%s'", job.notebook_title)
+    last_saved = time.monotonic()
+
+    def save_progress(done: int, total: int) -> None:
+        nonlocal job, last_saved
+
+        job = job._replace(done=done, total=total)
+
+        if time.monotonic() - last_saved >= PROGRESS_INTERVAL:
+            db_.update_pdf_job(job)
+            last_saved = time.monotonic()
+
+    try:
+        notebook = db_.get_notebook_by_id(job.notebook_id)
+
+        if notebook.id < 0:
+            job = job._replace(status='failed', error='Notebook not found')
+        else:
+            _, failed = make_pdf(notebook, job.profile, save_progress)
+            error = ', '.join(str(slot.path) for slot in failed)
+            job = job._replace(
+                status='done',
+                error=f'Pages missing or incorrect: {error}' if error else '')
+
+    except (db.Error, OSError) as exception:
+        log.exception(exception)
+        job = job._replace(status='failed', error=str(exception))
+
+    db_.update_pdf_job(job)
+    log.info("Job %s for '%s' %s", job.id, job.notebook_title, job.status)
+
+
+def _make_pdf_in_worker(
+        notebook: models.Notebook, profile: Optional[str]
+) -> Tuple[Optional[pathlib.Path], List[pdf.Slot], Optional[str]]:
+    """Makes the PDF file in a worker process, returns path, failed, error."""
+    try:
+        path, failed = make_pdf(notebook, profile, workers=1)
+        return path, failed, None
+
+    except (OSError, ValueError, pillow.UnidentifiedImageError,
+            db.Error) as exception:
+        log.exception(exception)
+        return None, [], str(exception)
+
+
+@contextlib.contextmanager
+def _try_lock(path: pathlib.Path) -> Iterator[Optional[TextIO]]:
+    """Holds the lock if it is free, yields None if it is held by others."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(str(path), 'w', encoding='utf-8') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+        except BlockingIOError:
+            yield None
+            return
+
+        yield lock_file
@@ -0,0 +1,168 @@
+# License: GNU GPL Version 3
+
+"""The module provides lossless cropping and rotation of JPEG files.
+
+JPEG data is transformed without decoding with `jpegtran` (from libjpeg or
+libjpeg-turbo) if it is installed.  This is faster than decoding and
+encoding an image again and does not lose quality.
+
+It is possible only if the upper left corner of the crop box lies on the
+boundary of JPEG's iMCU (a block of 8x8 or 16x16 pixels) and the image is
+rotated by a multiple of 90 degrees.
+
+    Typical usage example:
+
+    if not jpeg.transform(source, destination, -90, (0, 0, 800, 1200)):
+        image = PIL.Image.open(source).rotate(-90, expand=True)
+        image.crop((0, 0, 800, 1200)).save(destination)
+"""
+
+import logging
+import os
+import pathlib
+import shutil
+import subprocess
+import tempfile
+from typing import Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+Box = Tuple[int, int, int, int]
+
+# Markers of JPEG segments which contain frame headers
+SOF_MARKERS = frozenset(
+    (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+     0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF))
+
+# `jpegtran -rotate` arguments (clockwise) by counter-clockwise angles
+ROTATE_ARGS_BY_ANGLE = {
+    0: [],
+    90: ['-rotate', '270'],
+    -90: ['-rotate', '90'],
+}
+
+
+def is_available() -> bool:
+    """Check if `jpegtran` is installed."""
+    return shutil.which('jpegtran') is not None
+
+
+def get_imcu_size(path: pathlib.Path) -> Optional[Tuple[int, int]]:
+    """Return width and height of the iMCU of a JPEG file.
+
+    Only the headers of the file are read.
+
+    Returns:
+        A size in pixels or None if the file is not a JPEG.
+    """
+    try:
+        with open(str(path), 'rb') as jpeg_file:
+            if jpeg_file.read(2) != b'\xff\xd8':
+                return None
+
+            while True:
+                marker = jpeg_file.read(2)
+
+                if len(marker) < 2 or marker[0] != 0xFF:
+                    return None
+
+                length = int.from_bytes(jpeg_file.read(2), 'big')
+
+                if marker[1] not in SOF_MARKERS:
+                    jpeg_file.seek(length - 2, os.SEEK_CUR)
+                    continue
+
+                header = jpeg_file.read(length - 2)
+                components = header[5]
+
+                if components == 1:
+                    return 8, 8
+
+                sampling = header[7:6 + 3 * components:3]
+                return (8 * max(factor >> 4 for factor in sampling),
+                        8 * max(factor & 0x0F for factor in sampling))
+
+    except (OSError, IndexError) as exception:
+        log.exception(exception)
+        return None
+
+
+def can_transform(path: pathlib.Path, angle: int, box: Box) -> bool:
+    """Check if a JPEG file can be cropped and rotated losslessly.
+
+    Args:
+        path:
+            A path to JPEG file.
+        angle:
+            An angle in degrees (0, 90 or -90) to rotate the image
+            counter-clockwise by.
+        box:
+            A box to crop from the rotated image.
+    """
+    if angle not in ROTATE_ARGS_BY_ANGLE:
+        return False
+
+    imcu_size = get_imcu_size(path)
+
+    if not imcu_size:
+        return False
+
+    imcu_width, imcu_height = imcu_size
+
+    if angle:
+        imcu_width, imcu_height = imcu_height, imcu_width
+
+    return box[0] % imcu_width == 0 and box[1] % imcu_height == 0
+
+
+def transform(
+        source: pathlib.Path, destination: pathlib.Path,
+        angle: int, box: Box) -> bool:
+    """Rotate and crop a JPEG file without decoding it.
+
+    The source and the destination may be the same file.
+
+    Args:
+        source:
+            A path to JPEG file.
+        destination:
+            A path to save the result at.
+        angle:
+            An angle in degrees (0, 90 or -90) to rotate the image
+            counter-clockwise by.
+        box:
+            A box to crop from the rotated image.
+
+    Returns:
+        False if `jpegtran` is not installed or the image cannot be
+        transformed losslessly.  In this case, nothing is saved.
+    """
+    if not is_available() or not can_transform(source, angle, box):
+        return False
+
+    left, upper, right, lower = box
+    crop = f'{right - left}x{lower - upper}+{left}+{upper}'
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.NamedTemporaryFile(
+            dir=str(destination.parent), suffix='.jpg',
+            delete=False) as output:
+        output_path = output.name
+
+    args = ['jpegtran', '-copy', 'all', '-perfect']
+    args.extend(ROTATE_ARGS_BY_ANGLE[angle])
+    args.extend(['-crop', crop, '-outfile', output_path, str(source)])
+
+    try:
+        subprocess.run(args, check=True, capture_output=True)
+        os.replace(output_path, str(destination))
+        return True
+
+    except (OSError, subprocess.CalledProcessError) as exception:
+        log.info('Cannot transform %s losslessly: %s', source, exception)
+
+        if os.path.exists(output_path):
+            os.remove(output_path)
+
+        return False
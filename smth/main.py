@@ -7,7 +7,7 @@ import importlib.util
 import logging
 import sys
 
-from smth import __version__, commands, const, db, view
+from smth import __version__, commands, const, db, pdf, view
 
 
 def main():
@@ -18,6 +18,9 @@ def main():
     if not const.PAGES_ROOT_PATH.exists():
         const.PAGES_ROOT_PATH.mkdir(parents=True, exist_ok=True)
 
+    if not const.BLOBS_ROOT_PATH.exists():
+        const.BLOBS_ROOT_PATH.mkdir(parents=True, exist_ok=True)
+
     if not const.CONFIG_PATH.parent.exists():
         const.CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
 
@@ -69,6 +72,13 @@ def parse_args(db_: db.DB, view_: view.View) -> None:
         'delete', aliases=['d'], help='delete notebook'
     ).set_defaults(func=delete)
 
+    parser_jobs = subparsers.add_parser(
+        'jobs', aliases=['j'], help='show PDF files being made in background')
+    parser_jobs.set_defaults(func=jobs)
+
+    parser_jobs.add_argument(
+        '--run', help=argparse.SUPPRESS, action='store_true')
+
     subparsers.add_parser(
         'list', aliases=['l'], help='show available notebooks'
     ).set_defaults(func=list_)
@@ -77,6 +87,32 @@ def parse_args(db_: db.DB, view_: view.View) -> None:
         'open', aliases=['o'], help='open notebook in default PDF viewer'
     ).set_defaults(func=open_)
 
+    parser_preview = subparsers.add_parser(
+        'preview', aliases=['p'],
+        help="show thumbnails of notebook's pages")
+    parser_preview.set_defaults(func=preview)
+
+    parser_preview.add_argument(
+        '--pdf', help='make PDF with reduced pages instead of thumbnails',
+        action='store_true')
+
+    parser_reprocess = subparsers.add_parser(
+        'reprocess', aliases=['r'],
+        help="crop and encode stored pages again with their types' settings")
+    parser_reprocess.set_defaults(func=reprocess)
+
+    parser_reprocess.add_argument(
+        '--all', help='reprocess all notebooks', action='store_true')
+
+    parser_reprocess.add_argument(
+        '--resolution', type=int,
+        help='resolution pages were scanned with (scanner resolution from '
+             'config by default)')
+
+    parser_reprocess.add_argument(
+        '--workers', type=int,
+        help='number of worker processes (number of cores by default)')
+
     parser_scan = subparsers.add_parser(
         'scan', aliases=['s'], help='scan notebook')
     parser_scan.set_defaults(func=scan)
@@ -90,6 +126,24 @@ def parse_args(db_: db.DB, view_: view.View) -> None:
         '--pdf-only', help='do not scan but only create PDF',
         action='store_true')
 
+    parser_scan.add_argument(
+        '--all', action='store_true',
+        help='with --pdf-only, make PDF files of all notebooks which have '
+             'changed')
+
+    parser_scan.add_argument(
+        '--type', help='with --all, only notebooks of the type')
+
+    parser_scan.add_argument(
+        '--workers', type=int,
+        help='with --all, number of worker processes (number of cores by '
+             'default)')
+
+    parser_scan.add_argument(
+        '--profile', choices=list(pdf.PROFILES),
+        help="make a separate PDF with the profile's resolution and quality "
+             "instead of the notebook's PDF")
+
     subparsers.add_parser(
         'share', aliases=['sh'],
         help='share notebook uploaded to Google Drive (requires PyDrive)'
@@ -136,6 +190,11 @@ def delete(args, db_: db.DB, view_: view.View) -> None:
     commands.DeleteCommand(db_, view_).execute(args)
 
 
+def jobs(args, db_: db. DB, view_: view.View) -> None:
+    """Runs `jobs` command."""
+    commands.JobsCommand(db_, view_).execute(args)
+
+
 def list_(args, db_: db. DB, view_: view.View) -> None:
     """Runs `list` command."""
     commands.ListCommand(db_, view_).execute(args)
@@ -146,6 +205,16 @@ def open_(args, db_: db. DB, view_: view.View) -> None:
     commands.OpenCommand(db_, view_).execute(args)
 
 
+def preview(args, db_: db. DB, view_: view.View) -> None:
+    """Runs `preview` command."""
+    commands.PreviewCommand(db_, view_).execute(args)
+
+
+def reprocess(args, db_: db. DB, view_: view.View) -> None:
+    """Runs `reprocess` command."""
+    commands.ReprocessCommand(db_, view_).execute(args)
+
+
 def scan(args, db_: db. DB, view_: view.View) -> None:
     """Runs `scan` command."""
     commands.ScanCommand(db_, view_).execute(args)
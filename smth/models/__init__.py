@@ -1,6 +1,6 @@
 # License: GNU GPL Version 3
 
-"""The package provides Notebook and Notebook Type models.
+"""The package provides Notebook, Notebook Type and PDF Job models.
 
 Notebook is a collection of pages ordered by their numbers.
 Notebook is what the user scans: book, sheets with handwriting etc.
@@ -10,6 +10,8 @@ Notebook type defines the size of a notebook's pages and whether pages are
 paired.  This information is essential when rotating, cropping, and merging
 scanned images.
 
+PDF job is a request to make a notebook's PDF file in background.
+
     Typical usage example:
 
     type = models.NotebookType('A4', 210, 297)
@@ -20,5 +22,6 @@ scanned images.
 
 from .notebook import Notebook
 from .notebook_type import NotebookType
+from .pdf_job import PDFJob
 
-__all__ = ['Notebook', 'NotebookType']
+__all__ = ['Notebook', 'NotebookType', 'PDFJob']
@@ -2,15 +2,37 @@
 
 """The module provides the Notebook model."""
 
+import collections
+import functools
+import logging
 import math
 import pathlib
+from typing import Dict, List, Tuple
 
 from PIL import Image as pillow
 
-from smth import const
+from smth import const, jpeg, page_codecs, page_store
 
 from .notebook_type import NotebookType
 
+log = logging.getLogger(__name__)
+
+Box = Tuple[int, int, int, int]
+
+CropPlan = collections.namedtuple('CropPlan', 'box transpose')
+CropPlan.__doc__ = """A box to crop from a scanned image and a rotation.
+
+The rotation is one of `PIL.Image.ROTATE_*` transpositions to apply to
+the cropped image or None.
+"""
+
+# Transpositions which rotate an image counter-clockwise by the angle
+TRANSPOSE_BY_ANGLE = {
+    0: None,
+    90: pillow.ROTATE_90,
+    -90: pillow.ROTATE_270,
+}
+
 
 class Notebook:  # pylint: disable=too-many-instance-attributes
     """Collection of pages orderded by their numbers."""
@@ -23,6 +45,7 @@ class Notebook:  # pylint: disable=too-many-instance-attributes
         self.path = path
         self.total_pages = 0
         self.first_page_number = 1
+        self.pages = {}
 
     @property
     def id(self) -> int:  # pylint: disable=invalid-name
@@ -80,59 +103,304 @@ class Notebook:  # pylint: disable=too-many-instance-attributes
         else:
             self._first_page_number = 1
 
-    def crop_image(  # pylint: disable=too-many-branches
+    @property
+    def pages(self) -> Dict[int, str]:
+        """Manifest mapping numbers of pages to their blobs in `page_store`.
+
+        Pages scanned before the store was introduced are not in the
+        manifest but in the notebook's directory in PAGES_ROOT_PATH.
+        """
+        return self._pages
+
+    @pages.setter
+    def pages(self, pages: Dict[int, str]) -> None:
+        self._pages = pages
+
+    def crop_image(
             self, page: int, image: pillow.Image,
             resolution: int) -> pillow.Image:
         """Rotate and crop image so it fits the notebook's type."""
-        img = image.copy()
-
-        orig_width, orig_height = img.size
-
-        if orig_width > orig_height:
-            img = img.rotate(90, expand=True)
-            orig_width, orig_height = img.size
+        plan = self.get_crop_plan(page, image.size, resolution)
+        return _apply_crop_plan(image, plan)
 
+    def split_image(
+            self, page: int, image: pillow.Image,
+            resolution: int) -> Tuple[pillow.Image, pillow.Image]:
+        """Crop both the page and the next one from an image with two pages.
+
+        Both pages are cropped from the same image and only the pages are
+        rotated, so the result is the same as calling `crop_image()` for
+        each page but the whole image is never rotated.
+
+        Should be used if `holds_two_pages()` returns True.
+
+        Returns:
+            Images with the left (given) page and the right (next) page.
+        """
+        left_plan = self.get_crop_plan(page, image.size, resolution)
+        right_plan = self.get_crop_plan(page + 1, image.size, resolution)
+
+        return (_apply_crop_plan(image, left_plan),
+                _apply_crop_plan(image, right_plan))
+
+    def crop_image_file(
+            self, page: int, source: pathlib.Path,
+            destination: pathlib.Path, resolution: int) -> None:
+        """Crop an image file so it fits the notebook's type and save it.
+
+        JPEG files are cropped and rotated losslessly without decoding if
+        possible (see `smth.jpeg`).  Otherwise, the image is decoded, cropped
+        with `crop_image()` and encoded again.
+
+        The source and the destination may be the same file.
+
+        Raises:
+            OSError:
+                Failed to read or write the image.
+        """
+        if self.crop_jpeg_file(page, source, destination, resolution):
+            return
+
+        with pillow.open(str(source)) as image:
+            image = self.crop_image(page, image, resolution)
+
+        image.save(str(destination))
+
+    def crop_jpeg_file(
+            self, page: int, source: pathlib.Path,
+            destination: pathlib.Path, resolution: int) -> bool:
+        """Crop a JPEG file losslessly without decoding (see `smth.jpeg`).
+
+        Returns:
+            False if the file is not JPEG or cannot be cropped losslessly.
+
+        Raises:
+            OSError:
+                Failed to read the image.
+        """
+        if destination.suffix.lower() not in ('.jpg', '.jpeg'):
+            return False
+
+        with pillow.open(str(source)) as image:
+            if image.format != 'JPEG':
+                return False
+
+            angle, box = self.get_crop_box(page, image.size, resolution)
+
+        return jpeg.transform(source, destination, angle, box)
+
+    def get_crop_plan(
+            self, page: int, size: Tuple[int, int],
+            resolution: int) -> CropPlan:
+        """Return a box to crop from an image and a rotation to apply after.
+
+        The plan gives the same page as `get_crop_box()` but only the page
+        is rotated, not the whole image.  Plans are cached for each page
+        size, resolution, page parity and image size.
+
+        Args:
+            page:
+                Number of page on the image.
+            size:
+                Width and height of the scanned image.
+            resolution:
+                Resolution the image was scanned with.
+        """
+        return _get_crop_plan(
+            self.type.page_width, self.type.page_height,
+            self.type.pages_paired, self._is_left_page(page),
+            tuple(size), resolution)
+
+    def get_crop_box(
+            self, page: int, size: Tuple[int, int],
+            resolution: int) -> Tuple[int, Box]:
+        """Return rotation and crop box which fit an image to notebook's type.
+
+        Args:
+            page:
+                Number of page on the image.
+            size:
+                Width and height of the scanned image.
+            resolution:
+                Resolution the image was scanned with.
+
+        Returns:
+            An angle in degrees (0, 90 or -90) to rotate the image
+            counter-clockwise by and a box to crop from the rotated image.
+        """
+        return _get_crop_box(
+            self.type.page_width, self.type.page_height,
+            self.type.pages_paired, self._is_left_page(page),
+            tuple(size), resolution)
+
+    def holds_two_pages(
+            self, page: int, size: Tuple[int, int], resolution: int) -> bool:
+        """Check if both the page and the next one fit a scanned image.
+
+        This is possible only for paired pages when the page is a left one
+        and the scanner's glass is wider than two pages.
+
+        Args:
+            page:
+                Number of page on the image.
+            size:
+                Width and height of the scanned image.
+            resolution:
+                Resolution the image was scanned with.
+        """
         page_width_pt = math.ceil(self.type.page_width * resolution / 25.4)
-        page_height_pt = math.ceil(self.type.page_height * resolution / 25.4)
+
+        return (self.type.pages_paired and
+                page_width_pt * 2 < size[1] and
+                self._is_left_page(page))
+
+    def get_scan_area(
+            self, size: Tuple[int, int], resolution: int,
+            margin: int = 0) -> Box:
+        """Return the part of scanner's glass which pages are cropped from.
+
+        Scanning only this area gives the same pages as scanning the whole
+        glass.  If it is not possible, the whole glass is returned.
+
+        Args:
+            size:
+                Width and height of scanner's glass in pixels.
+            resolution:
+                Resolution which is used for scanning.
+            margin:
+                Extra pixels to keep around pages.
+
+        Returns:
+            A box on scanner's glass in pixels.
+        """
+        width, height = size
+        boxes = self._get_page_boxes(size, resolution)
+
+        area = (
+            max(0, min(box[0] for box in boxes) - margin),
+            max(0, min(box[1] for box in boxes) - margin),
+            min(width, max(box[2] for box in boxes) + margin),
+            min(height, max(box[3] for box in boxes) + margin),
+        )
+
+        area_size = (area[2] - area[0], area[3] - area[1])
+        area_boxes = [
+            _move_box(box, area[0], area[1])
+            for box in self._get_page_boxes(area_size, resolution)
+        ]
+
+        first_page = self.first_page_number
+
+        if (area_boxes == boxes and
+                self.holds_two_pages(first_page, area_size, resolution) ==
+                self.holds_two_pages(first_page, size, resolution)):
+            return area
+
+        return 0, 0, width, height
+
+    def _get_page_boxes(
+            self, size: Tuple[int, int], resolution: int) -> List[Box]:
+        """Return boxes of pages on a scanned image before rotation."""
+        pages = [self.first_page_number]
 
         if self.type.pages_paired:
-            if page_height_pt < orig_width:
-                img = img.rotate(-90, expand=True)
-                orig_width, orig_height = img.size
-
-            if self.first_page_number % 2 == page % 2:
-                # left page, crop from left side
-                if page_width_pt < orig_width:
-                    img = img.crop((0, 0, page_width_pt, orig_height))
-            else:
-                # right page, crop from right side
-                if page_width_pt < orig_width:
-                    if page_width_pt * 2 < orig_width:
-                        offset_x = page_width_pt
-                    else:
-                        offset_x = orig_width - page_width_pt
-
-                    box = (offset_x, 0, page_width_pt + offset_x, orig_height)
-                    img = img.crop(box)
-
-            if page_height_pt < orig_height:
-                img = img.crop((0, 0, img.size[0], page_height_pt))
-        else:
-            if page_width_pt > page_height_pt:
-                img = img.rotate(-90, expand=True)
-                orig_width, orig_height = img.size
+            pages.append(self.first_page_number + 1)
 
-            if page_width_pt < orig_width:
-                img = img.crop((0, 0, page_width_pt, orig_height))
+        boxes = []
 
-            if page_height_pt < orig_height:
-                img = img.crop((0, 0, img.size[0], page_height_pt))
+        for page in pages:
+            angle, box = self.get_crop_box(page, size, resolution)
+            boxes.append(_unrotate_box(box, size, angle))
 
-        return img
+        return boxes
+
+    def _is_left_page(self, page: int) -> bool:
+        """Check if the page is a left one when pages are paired."""
+        return self.first_page_number % 2 == page % 2
 
     def get_page_path(self, page: int) -> pathlib.Path:
-        """Return absolute path to notebook's page with given number."""
-        return const.PAGES_ROOT_PATH / self.title / f'{page}.jpg'
+        """Return absolute path to the file of notebook's page.
+
+        Pages may be stored in different formats (see `page_codecs`).
+        If the page is not in the manifest, the path to the page in the
+        notebook's directory is returned, even if it does not exist.
+
+        Args:
+            page:
+                Page number.
+        """
+        if page in self.pages:
+            return page_store.get_path(self.pages[page])
+
+        pages_dir = self.get_pages_dir()
+
+        for extension in page_codecs.EXTENSIONS:
+            path = pages_dir / f'{page}{extension}'
+
+            if path.exists():
+                return path
+
+        codec = self.type.codec if self.type else None
+        return pages_dir / f'{page}{page_codecs.get(codec).extension}'
+
+    def get_pages_dir(self) -> pathlib.Path:
+        """Return the directory with pages scanned before `page_store`."""
+        return const.PAGES_ROOT_PATH / self.title
+
+    def copy_pages_to_store(self) -> List[pathlib.Path]:
+        """Copy pages from the notebook's directory to `page_store`.
+
+        Copied pages are added to the manifest.  Pages which are already in
+        the manifest replaced the ones in the directory.  Files are left in
+        the directory, so pages are not lost if the manifest is not saved.
+
+        Returns:
+            Paths to the files in the directory whose pages are in the
+            manifest.  Remove them with `remove_page_files()` once the
+            manifest is saved.
+
+        Raises:
+            OSError:
+                Failed to copy pages.
+        """
+        pages_dir = self.get_pages_dir()
+
+        if not pages_dir.is_dir():
+            return []
+
+        paths = []
+
+        for path in sorted(pages_dir.iterdir()):
+            if (not path.stem.isdigit() or
+                    path.suffix not in page_codecs.EXTENSIONS):
+                continue
+
+            page = int(path.stem)
+
+            if page not in self.pages:
+                self.pages[page] = page_store.put(path, keep=True)
+
+            paths.append(path)
+
+        log.info("Pages of '%s' copied to the store", self.title)
+        return paths
+
+    @staticmethod
+    def remove_page_files(paths: List[pathlib.Path]) -> None:
+        """Remove files of pages copied to `page_store`.
+
+        Their directory is removed if nothing else is left in it.
+
+        Raises:
+            OSError:
+                Failed to remove files.
+        """
+        for path in paths:
+            path.unlink()
+
+        for pages_dir in {path.parent for path in paths}:
+            if not any(pages_dir.iterdir()):
+                pages_dir.rmdir()
 
     def __eq__(self, other):
         return (isinstance(other, self.__class__) and
@@ -140,3 +408,103 @@ class Notebook:  # pylint: disable=too-many-instance-attributes
 
     def __repr__(self):
         return f"<Notebook '{self._title}' of type '{self._type.title}'>"
+
+
+@functools.lru_cache(maxsize=256)
+def _get_crop_box(  # pylint: disable=too-many-arguments,too-many-branches
+        page_width: int, page_height: int, pages_paired: bool,
+        left_page: bool, size: Tuple[int, int],
+        resolution: int) -> Tuple[int, Box]:
+    """See `Notebook.get_crop_box()`."""
+    angle = 0
+    orig_width, orig_height = size
+
+    if orig_width > orig_height:
+        angle += 90
+        orig_width, orig_height = orig_height, orig_width
+
+    page_width_pt = math.ceil(page_width * resolution / 25.4)
+    page_height_pt = math.ceil(page_height * resolution / 25.4)
+
+    left, right = 0, orig_width
+
+    if pages_paired:
+        if page_height_pt < orig_width:
+            angle -= 90
+            orig_width, orig_height = orig_height, orig_width
+            right = orig_width
+
+        if left_page:
+            # left page, crop from left side
+            if page_width_pt < orig_width:
+                right = page_width_pt
+        else:
+            # right page, crop from right side
+            if page_width_pt < orig_width:
+                if page_width_pt * 2 < orig_width:
+                    left = page_width_pt
+                else:
+                    left = orig_width - page_width_pt
+
+                right = left + page_width_pt
+    else:
+        if page_width_pt > page_height_pt:
+            angle -= 90
+            orig_width, orig_height = orig_height, orig_width
+            right = orig_width
+
+        if page_width_pt < orig_width:
+            right = page_width_pt
+
+    return angle, (left, 0, right, min(page_height_pt, orig_height))
+
+
+@functools.lru_cache(maxsize=256)
+def _get_crop_plan(  # pylint: disable=too-many-arguments
+        page_width: int, page_height: int, pages_paired: bool,
+        left_page: bool, size: Tuple[int, int],
+        resolution: int) -> CropPlan:
+    """See `Notebook.get_crop_plan()`."""
+    angle, box = _get_crop_box(
+        page_width, page_height, pages_paired, left_page, size, resolution)
+
+    return CropPlan(
+        _unrotate_box(box, size, angle), TRANSPOSE_BY_ANGLE[angle])
+
+
+def _apply_crop_plan(image: pillow.Image, plan: CropPlan) -> pillow.Image:
+    """Crop and rotate the image according to the plan."""
+    image = image.crop(plan.box)
+
+    if plan.transpose is not None:
+        image = image.transpose(plan.transpose)
+
+    return image
+
+
+def _move_box(box: Box, x: int, y: int) -> Box:  # pylint: disable=invalid-name  # noqa: E501
+    """Return the box moved by x and y."""
+    return box[0] + x, box[1] + y, box[2] + x, box[3] + y
+
+
+def _unrotate_box(box: Box, size: Tuple[int, int], angle: int) -> Box:
+    """Map a box on a rotated image to the image before rotation.
+
+    Args:
+        box:
+            A box on the image rotated counter-clockwise by the angle.
+        size:
+            Width and height of the image before rotation.
+        angle:
+            An angle in degrees (0, 90 or -90).
+    """
+    width, height = size
+    left, upper, right, lower = box
+
+    if angle == 90:
+        return width - lower, left, width - upper, right
+
+    if angle == -90:
+        return upper, height - right, lower, height - left
+
+    return box
@@ -2,6 +2,8 @@
 
 """The module provides the Notebook Type model."""
 
+from smth import const, imaging, page_codecs
+
 
 class NotebookType:  # pylint: disable=too-many-instance-attributes
     """Contains information about notebook like its page size."""
@@ -12,6 +14,11 @@ class NotebookType:  # pylint: disable=too-many-instance-attributes
         self.page_width = page_width
         self.page_height = page_height
         self.pages_paired = False
+        self.pdf_resolution = const.DEFAULT_PDF_RESOLUTION
+        self.codec = page_codecs.DEFAULT_CODEC
+        self.binarization = 'none'
+        self.deskew = False
+        self.blank_pages = 'keep'
 
     @property
     def id(self):  # pylint: disable=invalid-name
@@ -70,6 +77,78 @@ class NotebookType:  # pylint: disable=too-many-instance-attributes
         else:
             self._pages_paired = False
 
+    @property
+    def pdf_resolution(self) -> int:
+        """Resolution of pages in PDF (in DPI).
+
+        Pages scanned at a higher resolution are reduced to this one when
+        PDF is created.  If 0, pages are put to PDF as they are.
+        """
+        return self._pdf_resolution
+
+    @pdf_resolution.setter
+    def pdf_resolution(self, resolution):
+        if isinstance(resolution, int) and resolution > 0:
+            self._pdf_resolution = resolution
+        else:
+            self._pdf_resolution = 0
+
+    @property
+    def codec(self) -> str:
+        """Name of the codec used to store new pages (see `page_codecs`)."""
+        return self._codec
+
+    @codec.setter
+    def codec(self, codec):
+        if codec in page_codecs.CODECS:
+            self._codec = codec
+        else:
+            self._codec = page_codecs.DEFAULT_CODEC
+
+    @property
+    def binarization(self) -> str:
+        """Method used to convert scanned pages to black and white.
+
+        One of `imaging.BINARIZATION_METHODS`.  If 'none', pages are stored
+        as they are scanned.
+        """
+        return self._binarization
+
+    @binarization.setter
+    def binarization(self, method):
+        if method in imaging.BINARIZATION_METHODS:
+            self._binarization = method
+        else:
+            self._binarization = 'none'
+
+    @property
+    def deskew(self) -> bool:
+        """Indicates whether scanned pages should be straightened."""
+        return self._deskew
+
+    @deskew.setter
+    def deskew(self, deskew):
+        if isinstance(deskew, bool):
+            self._deskew = deskew
+        else:
+            self._deskew = False
+
+    @property
+    def blank_pages(self) -> str:
+        """What is done with blank pages.
+
+        One of `const.BLANK_PAGES_POLICIES`.  If 'keep', pages are not
+        checked for being blank.
+        """
+        return self._blank_pages
+
+    @blank_pages.setter
+    def blank_pages(self, policy):
+        if policy in const.BLANK_PAGES_POLICIES:
+            self._blank_pages = policy
+        else:
+            self._blank_pages = 'keep'
+
     def __eq__(self, other):
         return (isinstance(other, self.__class__) and
                 other.title == self.title)
@@ -0,0 +1,32 @@
+# License: GNU GPL Version 3
+
+"""The module provides the PDF Job model."""
+
+import collections
+
+PDFJob = collections.namedtuple(
+    'PDFJob',
+    'id notebook_id notebook_title profile status done total error updated')
+PDFJob.__doc__ = """A queued request to make a notebook's PDF file.
+
+Attributes:
+    id:
+        Job's id in the database.
+    notebook_id:
+        ID of the notebook whose PDF file is made.
+    notebook_title:
+        Title of the notebook or None if it has been deleted.
+    profile:
+        Name of the profile the PDF file is made with (see `pdf.PROFILES`)
+        or None for the notebook's own PDF file.
+    status:
+        'queued', 'running', 'done' or 'failed'.
+    done:
+        Number of PDF pages made so far.
+    total:
+        Number of PDF pages in the file.
+    error:
+        What went wrong if the job has failed or some pages are missing.
+    updated:
+        Local time of the last change of the status or progress.
+"""
@@ -0,0 +1,109 @@
+# License: GNU GPL Version 3
+
+"""The module provides codecs which define how scanned pages are stored.
+
+Each notebook type has a codec which is used to save new pages of notebooks
+of this type.  The format of a page is recorded in its file's extension, so
+pages of the same notebook may be stored in different formats, e.g. if the
+type's codec has been changed after some pages were scanned.  Blank pages
+may be stored as empty placeholder files with BLANK_EXTENSION.
+
+    Typical usage example:
+
+    codec = page_codecs.get(notebook.type.codec)
+    codec.save(image, path.with_suffix(codec.extension))
+"""
+
+import pathlib
+from typing import Any, Dict, Optional
+
+import PIL.Image as pillow
+
+# Gray level below which pixels become black when converting to bilevel
+BILEVEL_THRESHOLD = 128
+
+DEFAULT_CODEC = 'jpeg'
+
+# Extension of empty files which stand for blank pages
+BLANK_EXTENSION = '.blank'
+
+# Extensions of image files which can be put to PDF as they are
+PDF_EXTENSIONS = ('.jpg', '.png')
+
+
+class Codec:  # pylint: disable=too-few-public-methods
+    """Saves images in some file format.
+
+    Attributes:
+        name:
+            Codec's name which is stored in notebook type's settings.
+        extension:
+            Extension of files (with the leading dot).
+        mode:
+            Image mode (e.g. '1' for bilevel) to convert images to before
+            saving or None to save images in their mode.
+        options:
+            Options passed to `PIL.Image.save()`.
+    """
+
+    def __init__(
+            self, name: str, extension: str, mode: Optional[str] = None,
+            **options: Any):
+        self.name = name
+        self.extension = extension
+        self.mode = mode
+        self.options = options
+
+    def save(self, image: pillow.Image, path: pathlib.Path) -> None:
+        """Saves the image to the file.
+
+        Raises:
+            OSError:
+                Failed to write the file.
+        """
+        if self.mode == '1' and image.mode != '1':
+            image = to_bilevel(image)
+        elif self.mode and image.mode != self.mode:
+            image = image.convert(self.mode)
+
+        image.save(str(path), **self.options)
+
+    def __repr__(self):
+        return f"<Codec '{self.name}'>"
+
+
+CODECS: Dict[str, Codec] = {
+    codec.name: codec for codec in (
+        Codec('jpeg', '.jpg'),
+        Codec('jpeg-optimized', '.jpg', quality=85, optimize=True),
+        Codec('jpeg-progressive', '.jpg', quality=85, optimize=True,
+              progressive=True),
+        Codec('png', '.png', optimize=True),
+        Codec('webp', '.webp', quality=80, method=4),
+        Codec('tiff-g4', '.tif', mode='1', compression='group4'),
+    )
+}
+
+EXTENSIONS = tuple(sorted(
+    {codec.extension for codec in CODECS.values()} | {BLANK_EXTENSION}))
+
+
+def get(name: str) -> Codec:
+    """Returns the codec with the name or the default one if not found."""
+    return CODECS.get(name, CODECS[DEFAULT_CODEC])
+
+
+def is_blank_page(path: pathlib.Path) -> bool:
+    """Checks if the file is a placeholder of a blank page."""
+    return path.suffix == BLANK_EXTENSION
+
+
+def is_pdf_compatible(path: pathlib.Path) -> bool:
+    """Checks if the image file can be put to PDF without conversion."""
+    return path.suffix.lower() in PDF_EXTENSIONS
+
+
+def to_bilevel(image: pillow.Image) -> pillow.Image:
+    """Converts the image to black and white without dithering."""
+    return image.convert('L').point(
+        lambda value: 255 if value >= BILEVEL_THRESHOLD else 0, mode='1')
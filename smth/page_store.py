@@ -0,0 +1,165 @@
+# License: GNU GPL Version 3
+
+"""The module provides the content-addressed store of scanned pages.
+
+Each page's file is stored once under a name made of the digest of its
+content (a blob) in BLOBS_ROOT_PATH.  Notebooks refer to blobs by their
+names in a manifest mapping page numbers to blobs (see `Notebook.pages`),
+which is saved in the database.  So renaming a notebook does not touch its
+pages, identical pages are stored once and replaced pages are removed only
+when no notebook refers to them.
+
+    Typical usage example:
+
+    codec = page_codecs.get(notebook.type.codec)
+    notebook.pages[page] = page_store.save(image, codec)
+
+    image = PIL.Image.open(page_store.get_path(notebook.pages[page]))
+"""
+
+import hashlib
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+from typing import Callable, Iterable, Optional
+
+import PIL.Image as pillow
+
+from smth import const, page_codecs, previews
+
+log = logging.getLogger(__name__)
+
+# Size in bytes of chunks in which files are read to compute the digest
+CHUNK_SIZE = 1 << 20
+
+
+def get_path(blob: str) -> pathlib.Path:
+    """Returns the path to the blob's file.
+
+    Blobs are spread among subdirectories named by the first two characters
+    of the digest, so directories do not grow too large.
+    """
+    return const.BLOBS_ROOT_PATH / blob[:2] / blob
+
+
+def put(path: pathlib.Path, keep: bool = False) -> str:
+    """Moves the file to the store and returns the name of its blob.
+
+    If the store already has the same file, the given one is removed.  If
+    `keep` is True, the file is copied to the store and left as it is.
+
+    Raises:
+        OSError:
+            Failed to read or move the file.
+    """
+    digest = hashlib.sha256()
+
+    with open(str(path), 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+
+    blob = f'{digest.hexdigest()}{path.suffix.lower()}'
+    blob_path = get_path(blob)
+
+    if blob_path.exists():
+        if not keep:
+            path.unlink()
+    elif keep:
+        _put_new_file(
+            lambda new_path: shutil.copyfile(str(path), str(new_path)),
+            path.suffix.lower())
+    else:
+        blob_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(str(path), str(blob_path))
+
+    return blob
+
+
+def save(image: pillow.Image, codec: page_codecs.Codec) -> str:
+    """Saves the image with the codec and returns the name of its blob.
+
+    Raises:
+        OSError:
+            Failed to write the file.
+    """
+    return _put_new_file(lambda path: codec.save(image, path), codec.extension)
+
+
+def save_blank() -> str:
+    """Saves the placeholder of a blank page and returns its blob's name.
+
+    All placeholders are empty, so they share the same blob.
+
+    Raises:
+        OSError:
+            Failed to write the file.
+    """
+    return _put_new_file(pathlib.Path.touch, page_codecs.BLANK_EXTENSION)
+
+
+def save_page(
+        image: Optional[pillow.Image], codec: page_codecs.Codec) -> str:
+    """Saves the page with its previews and returns the name of its blob.
+
+    Args:
+        image:
+            The page or None if it is blank.
+        codec:
+            The codec to save the page with.
+
+    Raises:
+        OSError:
+            Failed to write the page.
+    """
+    if image is None:
+        return save_blank()
+
+    blob = save(image, codec)
+
+    try:
+        previews.save(image, blob)
+
+    except OSError as exception:
+        # previews are made again when they are needed
+        log.exception(exception)
+
+    return blob
+
+
+def remove(blobs: Iterable[str]) -> None:
+    """Removes files of the blobs and their previews from the store.
+
+    Blobs which are still referred to by notebooks must not be removed.
+    """
+    for blob in blobs:
+        previews.remove(blob)
+
+        try:
+            get_path(blob).unlink()
+            log.info("Blob '%s' removed", blob)
+
+        except FileNotFoundError:
+            pass
+
+        except OSError as exception:
+            log.exception(exception)
+
+
+def _put_new_file(
+        write: Callable[[pathlib.Path], None], extension: str) -> str:
+    """Writes a file with the function and moves it to the store."""
+    const.BLOBS_ROOT_PATH.mkdir(parents=True, exist_ok=True)
+    descriptor, name = tempfile.mkstemp(
+        dir=str(const.BLOBS_ROOT_PATH), suffix=extension)
+    os.close(descriptor)
+    path = pathlib.Path(name)
+
+    try:
+        write(path)
+        return put(path)
+
+    finally:
+        if path.exists():
+            path.unlink()
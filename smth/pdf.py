@@ -0,0 +1,804 @@
+# License: GNU GPL Version 3
+
+"""The module writes notebooks' PDF files and updates them incrementally.
+
+A PDF file is written in full only once.  When pages are appended to the
+notebook or replaced, only new images and PDF pages are appended to the end
+of the file with a new cross-reference section (an incremental update, see
+section 3.4.5 of PDF Reference 1.4).  Objects of unchanged pages are left
+where they are, so updating a PDF takes time proportional to the number of
+changed pages, not to the size of the notebook.
+
+To know which objects hold which pages, the layout of the file is saved
+in LAYOUTS_ROOT_PATH.  If the file has been
+changed by another program, the layout is lost or settings of PDF pages
+have changed, the file is written in full again.  The file is also written
+in full when superseded images take more space than the shown ones.
+
+Each PDF page (a sheet) shows one page of the notebook or two pages of
+a spread side by side.  JPEG pages are embedded as they are.  Other
+formats are deflated.  Pages larger than the PDF resolution allows are
+reduced before.  JPEG files are not read to memory but copied to the PDF
+file by the kernel (with `os.sendfile()`), so writing a notebook whose
+pages fit the PDF resolution takes as long as copying its pages and memory
+usage does not depend on the number of pages.
+
+Images may be converted to grayscale and encoded as JPEG with the quality
+of a profile (see `PROFILES`), so a small copy of the notebook can be made
+for sharing while its own PDF file keeps full quality.
+
+Writing is split into two phases.  Images of new pages are read, reduced
+and encoded by a pool of threads (Pillow and zlib release the GIL while
+doing that) a few pages ahead of the writer, which writes objects one
+after another in the order of sheets.
+
+    Typical usage example:
+
+    sheets = [[pdf.Slot(blob, page_store.get_path(blob))]
+              for blob in notebook.pages.values()]
+    failed = pdf.update(notebook.path, pdf.get_layout_path(notebook.id),
+                        (1240, 1754), sheets)
+"""
+
+import array
+import collections
+import errno
+import io
+import itertools
+import json
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+import zlib
+from concurrent import futures
+from typing import (Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator,
+                    List, Optional, Sequence, Set, Tuple, Union)
+
+import PIL.Image as pillow
+
+from smth import const, imaging, page_codecs
+
+log = logging.getLogger(__name__)
+
+CATALOG_OBJECT = 1
+PAGES_OBJECT = 2
+
+DEFLATE_LEVEL = 6
+
+# Number of threads which prepare images
+PREPARE_WORKERS = os.cpu_count() or 1
+
+# Images prepared ahead of the writer per thread, so memory usage is bounded
+IMAGES_IN_FLIGHT_PER_WORKER = 2
+
+COLOR_SPACES = {
+    '1': '/DeviceGray',
+    'L': '/DeviceGray',
+    'RGB': '/DeviceRGB',
+    'CMYK': '/DeviceCMYK',
+}
+
+Slot = collections.namedtuple('Slot', 'key path')
+Slot.__doc__ = """A notebook's page to put on a sheet.
+
+Attributes:
+    key:
+        A string which identifies the content of the image, e.g. the name
+        of its blob.  Images with the same key are embedded once.
+    path:
+        Path to the page's image file.
+"""
+
+Sheet = Sequence[Optional[Slot]]
+
+Profile = collections.namedtuple('Profile', 'resolution mode quality')
+Profile.__doc__ = """Settings of images in a PDF file made for some purpose.
+
+Attributes:
+    resolution:
+        Resolution of images in PDF (in DPI).  If 0, images are not reduced.
+    mode:
+        Pillow mode color images are converted to (e.g. 'L' for grayscale)
+        or None if they are kept in color.  Bilevel images are not converted.
+    quality:
+        JPEG quality images are encoded with.  If None, images which are not
+        JPEG files are deflated.  JPEG files which are not reduced or
+        converted are embedded as they are anyway.
+"""
+
+PROFILES = {
+    'screen': Profile(96, 'L', 60),
+    'ebook': Profile(150, 'L', 75),
+    'print': Profile(300, None, 90),
+    'archive': Profile(0, None, None),
+}
+
+PreparedImage = collections.namedtuple(
+    'PreparedImage', 'width height mode filter data')
+PreparedImage.__doc__ = """Image data ready to be embedded in PDF.
+
+Attributes:
+    width:
+        Width of the image in pixels.
+    height:
+        Height of the image in pixels.
+    mode:
+        Pillow mode of the image data ('1', 'L', 'RGB' or 'CMYK').
+    filter:
+        PDF filter the data is encoded with ('DCTDecode' or 'FlateDecode').
+    data:
+        Encoded image or path to the file to embed as it is.
+"""
+
+
+def get_layout_path(
+        notebook_id: int, profile: Optional[str] = None) -> pathlib.Path:
+    """Returns the path to the layout of the notebook's PDF file.
+
+    If the profile's name is given, returns the path to the layout of the
+    PDF file made with the profile.
+    """
+    if profile:
+        return const.LAYOUTS_ROOT_PATH / f'{notebook_id}-{profile}.json'
+
+    return const.LAYOUTS_ROOT_PATH / f'{notebook_id}.json'
+
+
+def get_profile_path(path: pathlib.Path, profile: str) -> pathlib.Path:
+    """Returns the path to the notebook's PDF file made with the profile.
+
+    The file is put next to the notebook's PDF file, e.g. 'notes-screen.pdf'
+    for 'notes.pdf'.
+    """
+    return path.with_name(f'{path.stem}-{profile}{path.suffix}')
+
+
+def prepare_image(
+        path: pathlib.Path, max_size: Optional[Tuple[int, int]] = None,
+        mode: Optional[str] = None,
+        quality: Optional[int] = None) -> PreparedImage:
+    """Reads the image and encodes it to be embedded in PDF.
+
+    JPEG files which fit the maximum size and are in the right mode are
+    embedded as they are, they are not even read here but copied when the
+    PDF file is written.  Larger images are reduced (see
+    `imaging.reduce_image()`), JPEG images are encoded as JPEG again and
+    other ones are deflated.  If the quality is given, all images except
+    bilevel ones are encoded as JPEG with this quality.
+
+    Args:
+        path:
+            Path to the image file.
+        max_size:
+            Maximum width and height of the image in pixels or None if the
+            image is not reduced.
+        mode:
+            Pillow mode color images are converted to or None if they are
+            not converted.
+        quality:
+            JPEG quality or None if only JPEG images are encoded as JPEG.
+
+    Raises:
+        OSError:
+            Failed to read or decode the image.
+    """
+    with pillow.open(str(path)) as image:
+        fits = (max_size is None or
+                image.width <= max_size[0] and image.height <= max_size[1])
+        jpeg = image.format == 'JPEG' and image.mode in ('L', 'RGB', 'CMYK')
+        convert = mode is not None and image.mode not in (mode, '1')
+
+        if jpeg and fits and not convert:
+            return PreparedImage(
+                image.width, image.height, image.mode, 'DCTDecode', path)
+
+        if not fits:
+            bilevel = image.mode == '1'
+
+            if bilevel:
+                image = image.convert('L')
+
+            imaging.reduce_image(image, max_size)
+
+            if bilevel:
+                image = page_codecs.to_bilevel(image)
+
+        if image.mode not in COLOR_SPACES:
+            image = image.convert(
+                'L' if image.mode in ('LA', 'I', 'I;16', 'F') else 'RGB')
+
+        if convert and image.mode != '1':
+            image = image.convert(mode)
+
+        if jpeg or quality and image.mode != '1':
+            stream = io.BytesIO()
+            options = {'quality': quality} if quality else {}
+            image.save(stream, 'JPEG', **options)
+            return PreparedImage(
+                image.width, image.height, image.mode, 'DCTDecode',
+                stream.getvalue())
+
+        return PreparedImage(
+            image.width, image.height, image.mode, 'FlateDecode',
+            zlib.compress(image.tobytes(), DEFLATE_LEVEL))
+
+
+def update(
+        path: pathlib.Path, layout_path: pathlib.Path,
+        page_size: Tuple[int, int], sheets: List[Sheet],
+        max_image_size: Optional[Tuple[int, int]] = None,
+        workers: Optional[int] = None, mode: Optional[str] = None,
+        quality: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        digest: Optional[str] = None) -> List[Slot]:
+    """Makes the PDF file show the sheets, writing only what has changed.
+
+    Args:
+        path:
+            Path to the PDF file.
+        layout_path:
+            Path to the file with the layout of the PDF file.
+        page_size:
+            Width and height of sheets in points.
+        sheets:
+            Pages of the notebook on each sheet.  Slots divide a sheet into
+            columns of the same width.  Empty slots are None.
+        max_image_size:
+            Maximum width and height of images in pixels, larger images are
+            reduced.
+        workers:
+            Number of threads which prepare images, `PREPARE_WORKERS` if
+            None.
+        mode:
+            Pillow mode color images are converted to or None if they are
+            kept in color.
+        quality:
+            JPEG quality images are encoded with or None if images which are
+            not JPEG files are deflated.
+        progress:
+            Called with the number of sheets done and the number of all
+            sheets after each sheet.
+        digest:
+            A string which identifies what the file shows, e.g. a digest of
+            the notebook's pages.  It is saved with the layout unless some
+            images could not be read (see `get_digest()`).
+
+    Returns:
+        Slots whose images could not be read.  They are left empty.
+
+    Raises:
+        OSError:
+            Failed to write the PDF file.
+    """
+    settings = [list(page_size), max_image_size and list(max_image_size),
+                mode, quality]
+    layout = _load_layout(path, layout_path, settings)
+    preparer = _Preparer(
+        max_image_size, mode, quality, workers or PREPARE_WORKERS)
+
+    if layout is None:
+        layout = _new_layout(settings)
+        failed = _write_file(
+            path, layout, page_size, sheets, preparer, progress)
+    else:
+        failed = _update_file(
+            path, layout, page_size, sheets, preparer, progress)
+
+    stat = path.stat()
+    layout['size'], layout['mtime_ns'] = stat.st_size, stat.st_mtime_ns
+    layout['digest'] = None if failed else digest
+
+    try:
+        layout_path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(str(layout_path), 'w', encoding='utf-8') as layout_file:
+            json.dump(layout, layout_file)
+
+    except OSError as exception:
+        # the file is written in full next time
+        log.exception(exception)
+
+    return failed
+
+
+def get_digest(
+        path: pathlib.Path, layout_path: pathlib.Path) -> Optional[str]:
+    """Returns the digest given when the PDF file was updated last time.
+
+    Returns None if there is no digest or the file has been changed since.
+    """
+    try:
+        with open(str(layout_path), encoding='utf-8') as layout_file:
+            layout = json.load(layout_file)
+
+        stat = path.stat()
+
+        if (layout['size'] != stat.st_size or
+                layout['mtime_ns'] != stat.st_mtime_ns):
+            return None
+
+        return layout.get('digest')
+
+    except FileNotFoundError:
+        return None
+
+    except (OSError, ValueError, KeyError, TypeError) as exception:
+        log.exception(exception)
+        return None
+
+
+def _new_layout(settings: List[Any]) -> Dict[str, Any]:
+    """Returns the layout of a file without objects.
+
+    The layout holds numbers and sizes of images by their keys, keys and
+    numbers of sheets in the page tree and the size of superseded objects.
+    """
+    return {
+        'settings': settings,
+        'objects': PAGES_OBJECT + 1,
+        'xref': None,
+        'images': {},
+        'kids': [],
+        'garbage': 0,
+        'digest': None,
+    }
+
+
+def _load_layout(
+        path: pathlib.Path, layout_path: pathlib.Path,
+        settings: List[Any]) -> Optional[Dict[str, Any]]:
+    """Returns the layout if the PDF file can be updated incrementally."""
+    try:
+        with open(str(layout_path), encoding='utf-8') as layout_file:
+            layout = json.load(layout_file)
+
+        stat = path.stat()
+
+        if (layout['settings'] != settings or
+                layout['size'] != stat.st_size or
+                layout['mtime_ns'] != stat.st_mtime_ns or
+                layout['garbage'] > sum(
+                    size for _, size in layout['images'].values())):
+            return None
+
+        return layout
+
+    except FileNotFoundError:
+        return None
+
+    except (OSError, ValueError, KeyError, TypeError) as exception:
+        log.exception(exception)
+        return None
+
+
+def _write_file(  # pylint: disable=too-many-arguments
+        path: pathlib.Path, layout: Dict[str, Any],
+        page_size: Tuple[int, int], sheets: List[Sheet],
+        preparer: '_Preparer',
+        progress: Optional[Callable[[int, int], None]]) -> List[Slot]:
+    """Writes the whole PDF file to a temporary file and replaces the file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, name = tempfile.mkstemp(
+        dir=str(path.parent), prefix=f'.{path.stem}.', suffix='.pdf')
+
+    try:
+        with os.fdopen(descriptor, 'w+b') as file:
+            file.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+            writer = _Writer(file, layout['objects'])
+            writer.write_object(
+                CATALOG_OBJECT,
+                f'<</Type /Catalog /Pages {PAGES_OBJECT} 0 R>>'.encode())
+            failed = _write_sheets(
+                writer, layout, page_size, sheets, preparer, progress)
+            layout['xref'] = writer.write_xref(None)
+            layout['objects'] = writer.next_number
+
+        os.replace(name, str(path))
+        return failed
+
+    except BaseException:
+        os.unlink(name)
+        raise
+
+
+def _update_file(  # pylint: disable=too-many-arguments
+        path: pathlib.Path, layout: Dict[str, Any],
+        page_size: Tuple[int, int], sheets: List[Sheet],
+        preparer: '_Preparer',
+        progress: Optional[Callable[[int, int], None]]) -> List[Slot]:
+    """Appends changed objects to the PDF file."""
+    keys = [_get_sheet_key(sheet) for sheet in sheets or [[]]]
+
+    if keys == [key for key, _ in layout['kids']]:
+        return []
+
+    with open(str(path), 'r+b') as file:
+        file.seek(0, os.SEEK_END)
+        writer = _Writer(file, layout['objects'])
+        failed = _write_sheets(
+            writer, layout, page_size, sheets, preparer, progress)
+        layout['xref'] = writer.write_xref(layout['xref'])
+        layout['objects'] = writer.next_number
+
+    return failed
+
+
+def _write_sheets(  # pylint: disable=too-many-arguments
+        writer: '_Writer', layout: Dict[str, Any],
+        page_size: Tuple[int, int], sheets: List[Sheet],
+        preparer: '_Preparer',
+        progress: Optional[Callable[[int, int], None]]) -> List[Slot]:
+    """Writes sheets which are not in the file yet and the page tree.
+
+    First, sheets which are already in the file are found, so images of the
+    other ones can be prepared ahead while sheets are written in order.
+
+    Images which are no longer shown are removed from the layout and counted
+    as garbage.
+    """
+    failed: List[Slot] = []
+    images: Dict[str, List[int]] = {}
+    old_images = layout['images']
+    old_kids: Dict[str, List[int]] = collections.defaultdict(list)
+
+    for key, number in layout['kids']:
+        old_kids[key].append(number)
+
+    # the page tree must have at least one page
+    sheets = sheets or [[]]
+    # keys of the sheets and their numbers if they are in the file
+    kids: List[Tuple[str, Optional[int]]] = []
+
+    for sheet in sheets:
+        key = _get_sheet_key(sheet)
+        numbers = old_kids[key]
+        kids.append((key, numbers.pop() if numbers else None))
+
+    layout['kids'] = []
+    new_slots = _get_new_slots(sheets, kids, old_images)
+
+    with preparer.start(new_slots):
+        for done, (sheet, (key, number)) in enumerate(
+                zip(sheets, kids), start=1):
+            if number is not None:
+                images.update((slot.key, old_images[slot.key])
+                              for slot in sheet if slot)
+            else:
+                failed_before = len(failed)
+                number = _write_sheet(
+                    writer, sheet, page_size, preparer, old_images, images,
+                    failed)
+
+                if len(failed) > failed_before:
+                    # the sheet is written again when its images can be read
+                    key = _get_sheet_key(
+                        [None if slot in failed else slot for slot in sheet])
+
+            layout['kids'].append([key, number])
+
+            if progress:
+                progress(done, len(sheets))
+
+    layout['garbage'] += sum(
+        size for key, (_, size) in old_images.items() if key not in images)
+    layout['images'] = images
+
+    kids_refs = ' '.join(f'{number} 0 R' for _, number in layout['kids'])
+    writer.write_object(
+        PAGES_OBJECT,
+        f"<</Type /Pages /Kids [{kids_refs}] "
+        f"/Count {len(layout['kids'])}>>".encode())
+
+    return failed
+
+
+def _get_new_slots(
+        sheets: List[Sheet], kids: List[Tuple[str, Optional[int]]],
+        old_images: Dict[str, List[int]]) -> Iterator[Slot]:
+    """Yields slots whose images are not in the file in the order of sheets.
+
+    Each image is yielded once, even if it is shown on several sheets.
+    """
+    keys: Set[str] = set()
+
+    for sheet, (_, number) in zip(sheets, kids):
+        if number is not None:
+            continue
+
+        for slot in sheet:
+            if slot and slot.key not in old_images and slot.key not in keys:
+                keys.add(slot.key)
+                yield slot
+
+
+def _write_sheet(  # pylint: disable=too-many-arguments
+        writer: '_Writer', sheet: Sheet, page_size: Tuple[int, int],
+        preparer: '_Preparer',
+        old_images: Dict[str, List[int]], images: Dict[str, List[int]],
+        failed: List[Slot]) -> int:
+    """Writes the sheet with its new images and returns its number."""
+    xobjects = []
+    content = []
+    width = page_size[0] / max(1, len(sheet))
+
+    for index, slot in enumerate(sheet):
+        if slot is None:
+            continue
+
+        image = images.get(slot.key) or old_images.get(slot.key)
+
+        if image is None:
+            prepared = preparer.get(slot)
+
+            if prepared is None:
+                failed.append(slot)
+                continue
+
+            image = [writer.write_image(prepared), _get_length(prepared.data)]
+
+        images[slot.key] = image
+        xobjects.append(f'/I{image[0]} {image[0]} 0 R')
+        content.append(
+            f'q {width:.2f} 0 0 {page_size[1]:.2f} {index * width:.2f} 0 cm '
+            f'/I{image[0]} Do Q')
+
+    contents = writer.write_object(None, b'', '\n'.join(content).encode())
+
+    return writer.write_object(None, (
+        f'<</Type /Page /Parent {PAGES_OBJECT} 0 R '
+        f'/MediaBox [0 0 {page_size[0]} {page_size[1]}] '
+        f"/Resources <</XObject <<{' '.join(xobjects)}>>>> "
+        f'/Contents {contents} 0 R>>').encode())
+
+
+def _get_length(data: Union[bytes, pathlib.Path]) -> int:
+    """Returns the size of the data or the file in bytes."""
+    if isinstance(data, pathlib.Path):
+        return data.stat().st_size
+
+    return len(data)
+
+
+def _get_sheet_key(sheet: Sheet) -> str:
+    """Returns a string which identifies what the sheet shows."""
+    return json.dumps([slot and slot.key for slot in sheet])
+
+
+class _Preparer:
+    """Prepares images in a pool of threads ahead of the writer.
+
+    Images are prepared in the order of the slots and must be requested in
+    the same order.  Only a few images are prepared ahead, so memory usage
+    does not depend on the number of pages.
+
+    `start()` should be used as a context manager, so threads are stopped
+    when the file is written.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, max_size: Optional[Tuple[int, int]], mode: Optional[str],
+            quality: Optional[int], workers: int):
+        self._max_size = max_size
+        self._mode = mode
+        self._quality = quality
+        self._workers = max(1, workers)
+        self._slots: Iterator[Slot] = iter([])
+        self._executor: Optional[futures.ThreadPoolExecutor] = None
+        self._pending: Deque[futures.Future] = collections.deque()
+        self._failed: Set[str] = set()
+
+    def start(self, slots: Iterable[Slot]) -> '_Preparer':
+        """Starts preparing images of the slots."""
+        self._slots = iter(slots)
+        return self
+
+    def __enter__(self) -> '_Preparer':
+        self._executor = futures.ThreadPoolExecutor(
+            max_workers=self._workers)
+        self._schedule()
+        return self
+
+    def __exit__(self, *args) -> None:
+        for future in self._pending:
+            future.cancel()
+
+        self._pending.clear()
+
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def get(self, slot: Slot) -> Optional[PreparedImage]:
+        """Returns the slot's image or None if it could not be read.
+
+        A slot whose image could not be read may be requested again.
+        """
+        if slot.key in self._failed:
+            return None
+
+        future = self._pending.popleft()
+        self._schedule()
+
+        try:
+            return future.result()
+
+        except OSError as exception:
+            log.exception(exception)
+            self._failed.add(slot.key)
+            return None
+
+    def _schedule(self) -> None:
+        """Submits next slots until enough images are being prepared."""
+        max_in_flight = self._workers * IMAGES_IN_FLIGHT_PER_WORKER
+
+        for slot in self._slots:
+            self._pending.append(self._executor.submit(
+                prepare_image, slot.path, self._max_size, self._mode,
+                self._quality))
+
+            if len(self._pending) >= max_in_flight:
+                break
+
+
+class _Writer:
+    """Writes numbered objects to the file and their cross-reference table.
+
+    Objects are written to the file as soon as they are made, only their
+    offsets are kept until the cross-reference table is written.  Offsets
+    of new objects, which are numbered one after another, are kept in an
+    array, so a PDF file with thousands of pages takes a few kilobytes.
+    """
+
+    def __init__(self, file: BinaryIO, next_number: int):
+        self._file = file
+        self._first_number = next_number
+        self._offsets = array.array('Q')
+        self._fixed_offsets: Dict[int, int] = {}
+        self.next_number = next_number
+
+    def write_object(
+            self, number: Optional[int], dictionary: bytes,
+            stream: Union[bytes, pathlib.Path, None] = None) -> int:
+        """Writes the object and returns its number.
+
+        Args:
+            number:
+                Number of the object or None to take the next free one.
+            dictionary:
+                The object or the dictionary of the stream.  The stream's
+                length is added to it.
+            stream:
+                Data of the stream object, path to the file to copy it from
+                or None if the object is not a stream.
+
+        Raises:
+            OSError:
+                Failed to write the object or to read the stream's file.
+        """
+        if number is None:
+            number = self.next_number
+            self.next_number += 1
+            self._offsets.append(self._file.tell())
+        else:
+            self._fixed_offsets[number] = self._file.tell()
+        self._file.write(f'{number} 0 obj\n'.encode())
+
+        if stream is None:
+            self._file.write(dictionary)
+        else:
+            length = _get_length(stream)
+            self._file.write(
+                b'<<' + dictionary + f'/Length {length}>>'.encode())
+            self._file.write(b'\nstream\n')
+
+            if isinstance(stream, pathlib.Path):
+                self._copy_file(stream, length)
+            else:
+                self._file.write(stream)
+
+            self._file.write(b'\nendstream')
+
+        self._file.write(b'\nendobj\n')
+        return number
+
+    def _copy_file(self, path: pathlib.Path, length: int) -> None:
+        """Appends the file to the written file without reading it here.
+
+        Falls back to copying through a buffer if the kernel can not copy
+        between the files.
+        """
+        self._file.flush()
+
+        with open(str(path), 'rb') as source:
+            offset = 0
+
+            try:
+                while offset < length:
+                    sent = os.sendfile(
+                        self._file.fileno(), source.fileno(), offset,
+                        length - offset)
+
+                    if not sent:
+                        raise OSError(f"'{path}' is shorter than expected")
+
+                    offset += sent
+
+            except (AttributeError, io.UnsupportedOperation):
+                shutil.copyfileobj(source, self._file)
+
+            except OSError as exception:
+                if offset or exception.errno not in (
+                        errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK):
+                    raise
+
+                shutil.copyfileobj(source, self._file)
+
+        # the file object does not know the kernel moved the position
+        self._file.seek(0, os.SEEK_END)
+
+    def write_image(self, image: PreparedImage) -> int:
+        """Writes the image XObject and returns its number."""
+        dictionary = (
+            f'/Type /XObject /Subtype /Image '
+            f'/Width {image.width} /Height {image.height} '
+            f'/ColorSpace {COLOR_SPACES[image.mode]} '
+            f"/BitsPerComponent {1 if image.mode == '1' else 8} "
+            f'/Filter /{image.filter} ')
+
+        if image.mode == 'CMYK' and image.filter == 'DCTDecode':
+            # Adobe applications write inverted CMYK JPEG files
+            dictionary += '/Decode [1 0 1 0 1 0 1 0] '
+
+        return self.write_object(None, dictionary.encode(), image.data)
+
+    def write_xref(self, previous: Optional[int]) -> int:
+        """Writes the cross-reference section of written objects.
+
+        Args:
+            previous:
+                Offset of the previous section if the file is updated.
+
+        Returns:
+            Offset of the section.
+        """
+        offset = self._file.tell()
+        self._file.write(b'xref\n')
+
+        # the head of the list of free objects, readers expect it in every
+        # section
+        numbers = itertools.chain(
+            [0], sorted(self._fixed_offsets),
+            range(self._first_number, self.next_number))
+        subsections: List[List[int]] = []
+
+        for number in numbers:
+            if subsections and subsections[-1][1] == number:
+                subsections[-1][1] += 1
+            else:
+                subsections.append([number, number + 1])
+
+        for start, end in subsections:
+            self._file.write(f'{start} {end - start}\n'.encode())
+
+            for number in range(start, end):
+                if number == 0:
+                    self._file.write(b'0000000000 65535 f \n')
+                    continue
+
+                if number in self._fixed_offsets:
+                    object_offset = self._fixed_offsets[number]
+                else:
+                    object_offset = self._offsets[number - self._first_number]
+
+                self._file.write(f'{object_offset:010d} 00000 n \n'.encode())
+
+        trailer = f'/Size {self.next_number} /Root {CATALOG_OBJECT} 0 R'
+
+        if previous is not None:
+            trailer += f' /Prev {previous}'
+
+        self._file.write(
+            f'trailer\n<<{trailer}>>\nstartxref\n{offset}\n%%EOF\n'.encode())
+        return offset
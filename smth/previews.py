@@ -0,0 +1,142 @@
+# License: GNU GPL Version 3
+
+"""The module provides the cache of small copies of scanned pages.
+
+Each page in `page_store` gets a pyramid of reduced copies: a preview, which
+is enough to read the page on screen, and a thumbnail made from the preview.
+They are made when the page is scanned, so the full page is not decoded
+again, and are cached by the name of the page's blob.  A replaced page gets
+a new blob, so its old previews are never used and are removed along with
+the old blob.
+
+    Typical usage example:
+
+    previews.save(image, blob)
+
+    thumbnail = previews.open_image(
+        notebook.get_page_path(page), 'thumbnail', notebook.pages.get(page))
+"""
+
+import logging
+import pathlib
+from typing import Optional
+
+import PIL.Image as pillow
+
+from smth import const, page_codecs
+
+log = logging.getLogger(__name__)
+
+# Maximum width and height in pixels of each level of the pyramid, from the
+# largest one, each level is reduced from the previous one
+SIZES = {
+    'preview': 1000,
+    'thumbnail': 200,
+}
+
+QUALITY = 80
+
+
+def get_path(blob: str, size: str) -> pathlib.Path:
+    """Returns the path to the blob's reduced copy of the size."""
+    name = pathlib.PurePath(blob).stem
+    return const.PREVIEWS_ROOT_PATH / size / name[:2] / f'{name}.jpg'
+
+
+def save(image: pillow.Image, blob: str) -> None:
+    """Makes and saves all reduced copies of the page.
+
+    Args:
+        image:
+            The page which is saved to the blob.
+        blob:
+            The name of the page's blob in `page_store`.
+
+    Raises:
+        OSError:
+            Failed to write the files.
+    """
+    for size, max_size in SIZES.items():
+        image = _reduce(image, max_size)
+        path = get_path(blob, size)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        image.save(str(path), quality=QUALITY)
+
+
+def open_image(
+        source: pathlib.Path, size: str,
+        blob: Optional[str] = None) -> Optional[pillow.Image]:
+    """Returns the reduced copy of the page of the size.
+
+    If the page's blob is not in the cache yet, it is made from the page's
+    file and cached.  Pages which are not in `page_store` (scanned by older
+    versions) are reduced each time.
+
+    Args:
+        source:
+            The page's file.
+        size:
+            One of SIZES.
+        blob:
+            The name of the page's blob in `page_store`.
+
+    Returns:
+        The image or None if the page is blank.
+
+    Raises:
+        OSError:
+            Failed to read the page.
+    """
+    if page_codecs.is_blank_page(source):
+        return None
+
+    if blob:
+        path = get_path(blob, size)
+
+        if not path.exists():
+            with pillow.open(str(source)) as image:
+                max_size = max(SIZES.values())
+                image.draft('RGB', (max_size, max_size))
+                save(image, blob)
+
+        with pillow.open(str(path)) as image:
+            image.load()
+            return image
+
+    with pillow.open(str(source)) as image:
+        image.draft('RGB', (SIZES[size], SIZES[size]))
+        return _reduce(image, SIZES[size])
+
+
+def remove(blob: str) -> None:
+    """Removes all reduced copies of the blob."""
+    for size in SIZES:
+        try:
+            get_path(blob, size).unlink()
+
+        except FileNotFoundError:
+            pass
+
+        except OSError as exception:
+            log.exception(exception)
+
+
+def _reduce(image: pillow.Image, max_size: int) -> pillow.Image:
+    """Returns a copy of the image which fits the square of the size.
+
+    Black and white images are converted to grayscale, so thin lines are
+    not lost.
+    """
+    if image.mode not in ('L', 'RGB'):
+        image = image.convert(
+            'L' if image.mode in ('1', 'I', 'I;16', 'F') else 'RGB')
+
+    factor = max(image.size) // max_size
+
+    if factor > 1:
+        image = image.reduce(factor)
+    else:
+        image = image.copy()
+
+    image.thumbnail((max_size, max_size), pillow.LANCZOS)
+    return image
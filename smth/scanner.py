@@ -18,21 +18,53 @@
 import abc
 import collections
 import itertools
+import json
 import logging
 import math
+import os
+import pathlib
+import threading
 import time
-from typing import List
+from concurrent import futures
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple
 
 import _sane
 import PIL.Image as pillow
 import sane
 
-from smth import config, models
+from smth import config, const, imaging, models
 
 log = logging.getLogger(__name__)
 
 Device = collections.namedtuple('Device', 'name vendor model type')
 
+# Number of threads which crop and save scanned pages
+PAGE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Scanning pauses when this number of pages is waiting to be processed
+MAX_PAGES_IN_FLIGHT = 2 * PAGE_WORKERS
+
+# Millimeters of glass kept around pages when only a part of glass is scanned
+SCAN_AREA_MARGIN = 2
+
+# Resolution of preview scans which are used to find pages on the glass
+PREVIEW_RESOLUTION = 50
+
+# Boxes found on previews which are smaller than this part of the page in
+# any dimension are text on a page whose edges are not seen
+MIN_PAGE_BOX_RATIO = 0.9
+
+# Options which define the scan area and SANE_UNIT_MM unit for them
+SCAN_AREA_OPTIONS = ('tl-x', 'tl-y', 'br-x', 'br-y')
+UNIT_MM = 3
+
+# Message of SANE_STATUS_NO_DOCS which backends return when the feeder is empty
+FEEDER_EMPTY_MESSAGE = 'Document feeder out of documents'
+
+
+class Error(Exception):
+    """An error which occurs when processing scanned pages."""
+
 
 class Callback(abc.ABC):
     """Used to notify about scanner's events. Must be subclassed."""
@@ -53,7 +85,9 @@ class Callback(abc.ABC):
         """
 
     @abc.abstractmethod
-    def on_start(self, device_name: str, pages_queue: List[int]) -> None:
+    def on_start(
+            self, device_name: str, pages_queue: List[int],
+            append_from_feeder: bool = False) -> None:
         """Called when scanning process starts.
 
         Args:
@@ -61,6 +95,9 @@ class Callback(abc.ABC):
                 Name of the device which is used to perform scanning process.
             pages_queue:
                 A list of pages the scanner is going to scan.
+            append_from_feeder:
+                Whether sheets left in the document feeder after the pages
+                are appended to the notebook.
         """
 
     @abc.abstractmethod
@@ -75,7 +112,7 @@ class Callback(abc.ABC):
     @abc.abstractmethod
     def on_finish_scan_page(
             self, notebook: models.Notebook, page: int,
-            image: pillow.Image) -> None:
+            image: Optional[pillow.Image]) -> None:
         """Called when scanning of a page finishes.
 
         Args:
@@ -84,7 +121,17 @@ class Callback(abc.ABC):
             page:
                 A number of page which the scanner just scanned.
             image:
-                An image with the scanned page.
+                An image with the scanned page or None if the page is blank
+                and notebook's type does not keep blank pages.
+        """
+
+    @abc.abstractmethod
+    def on_feeder_empty(self, pages_queue: List[int]) -> None:
+        """Called when document feeder runs out of pages before the end.
+
+        Args:
+            pages_queue:
+                A list of pages which have not been scanned.
         """
 
     @abc.abstractmethod
@@ -106,14 +153,82 @@ class Callback(abc.ABC):
         """
 
 
+class DevicesCache:
+    """Keeps the list of devices found by SANE in a file.
+
+    Searching for devices may take a long time (especially with network
+    backends), so the devices found before are used while they are fresh.
+    """
+
+    def __init__(self, path: pathlib.Path, ttl: int):
+        """Initializes the cache.
+
+        Args:
+            path:
+                A path to the cache file.
+            ttl:
+                Time in seconds cached devices are fresh.  If not positive,
+                devices are not cached at all.
+        """
+        self._path = path
+        self._ttl = ttl
+
+    def load(self) -> List[Device]:
+        """Returns cached devices or an empty list if they are not fresh."""
+        if self._ttl <= 0 or not self._path.exists():
+            return []
+
+        try:
+            with open(str(self._path), 'r') as cache_file:
+                cache = json.load(cache_file)
+
+            if time.time() - cache['time'] > self._ttl:
+                return []
+
+            return list(itertools.starmap(Device, cache['devices']))
+
+        except (OSError, ValueError, KeyError, TypeError) as exception:
+            log.exception(exception)
+            return []
+
+    def save(self, devices: List[Device]) -> None:
+        """Replaces cached devices with the given ones."""
+        if self._ttl <= 0:
+            return
+
+        cache = {
+            'time': time.time(),
+            'devices': [list(device) for device in devices],
+        }
+
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+
+            with open(str(self._path), 'w') as cache_file:
+                json.dump(cache, cache_file)
+
+        except OSError as exception:
+            log.exception(exception)
+
+    def clear(self) -> None:
+        """Removes cached devices."""
+        try:
+            if self._path.exists():
+                self._path.unlink()
+
+        except OSError as exception:
+            log.exception(exception)
+
+
 class Scanner:  # pylint: disable=too-few-public-methods
     """Represents a scanner device which can scan notebooks."""
 
     def __init__(self, conf: config.Config, callback_: Callback):
         self._conf = conf
         self._callback = callback_
+        self._refresh: Optional[threading.Thread] = None
 
-    def scan(  # pylint: disable=too-many-branches
+    def scan(
             self, notebook: models.Notebook,
             pages_queue: collections.deque) -> None:
         """Performs scanning with the given preferences.
@@ -124,24 +239,17 @@ class Scanner:  # pylint: disable=too-few-public-methods
             pages_queue:
                 Numbers of pages that should be scanned.
         """
+        device_from_cache = False
+        refreshing = False
+
         if not self._conf.scanner_device:
             try:
                 sane.init()
 
-                self._callback.on_searching_for_devices()
-                devices = list(itertools.starmap(Device, sane.get_devices()))
+                device_from_cache = self._set_device()
+                refreshing = self._is_refreshing()
 
-                if devices:
-                    device_name = self._callback.on_set_device(devices)
-
-                    if device_name:
-                        self._conf.scanner_device = device_name
-                    else:
-                        self._callback.on_error('Device is not set.')
-                else:
-                    self._callback.on_error('No devices found.')
-
-            except _sane.error as exception:
+            except (_sane.error, config.Error) as exception:
                 log.exception(exception)
                 self._callback.on_error('Failed to load the list of devices')
 
@@ -151,17 +259,22 @@ class Scanner:  # pylint: disable=too-few-public-methods
                 self._callback.on_error(message)
 
             finally:
-                sane.exit()
+                # the chosen device is opened in the same session while
+                # cached devices are still refreshed in background
+                if not refreshing:
+                    self._exit()
 
         device = None
 
         try:
-            sane.init()
+            if not refreshing:
+                sane.init()
 
-            device = self._get_device(self._conf.scanner_device)
+            device = self._open_device(device_from_cache)
+            self._set_scan_area(device, notebook)
             self._scan(device, notebook, pages_queue)
 
-        except _sane.error as exception:
+        except (_sane.error, Error) as exception:
             log.exception(exception)
             self._callback.on_error(str(exception))
 
@@ -173,7 +286,136 @@ class Scanner:  # pylint: disable=too-few-public-methods
             if device:
                 device.close()
 
-            sane.exit()
+            self._exit()
+
+    def _is_refreshing(self) -> bool:
+        """Returns whether cached devices are refreshed in background."""
+        return self._refresh is not None and self._refresh.is_alive()
+
+    def _exit(self) -> None:
+        """Waits for the background refresh of devices if any, exits SANE."""
+        if self._is_refreshing():
+            self._refresh.join()
+
+        self._refresh = None
+        sane.exit()
+
+    def _set_device(self) -> bool:
+        """Asks the callback to choose a device and saves it in the config.
+
+        Devices found before are shown at once if they are cached.  In this
+        case the cache is updated in background while the device is chosen
+        and opened (if `devices_refresh` config option is set).  The refresh
+        is waited for only before SANE exits.
+
+        Returns:
+            True if the device has been chosen from the cached devices.
+
+        Raises:
+            _sane.error:
+                Failed to find devices.
+            config.Error:
+                Failed to read or write config.
+        """
+        cache = DevicesCache(
+            const.DEVICES_CACHE_PATH, self._conf.scanner_devices_cache_ttl)
+
+        devices = cache.load()
+        from_cache = bool(devices)
+
+        if from_cache:
+            if self._conf.scanner_devices_refresh:
+                self._refresh = threading.Thread(
+                    target=self._refresh_devices, args=(cache,), daemon=True)
+                self._refresh.start()
+        else:
+            self._callback.on_searching_for_devices()
+            devices = self._find_devices(cache)
+
+        if devices:
+            device_name = self._callback.on_set_device(devices)
+
+            if device_name:
+                self._conf.scanner_device = device_name
+            else:
+                self._callback.on_error('Device is not set.')
+        else:
+            self._callback.on_error('No devices found.')
+
+        return from_cache
+
+    def _open_device(self, device_from_cache: bool) -> sane.SaneDev:
+        """Opens the device set in the config.
+
+        If the device has been chosen from cached devices and cannot be
+        opened, devices are searched again and the device is chosen again.
+
+        Args:
+            device_from_cache:
+                Whether the device has been chosen from cached devices.
+
+        Returns:
+            A sane.SaneDev object representing a SANE device.
+
+        Raises:
+            _sane.error:
+                Failed to open the device.
+            scanner.Error:
+                No device found or chosen.
+        """
+        try:
+            return self._get_device(self._conf.scanner_device)
+
+        except _sane.error as exception:
+            if not device_from_cache:
+                raise
+
+            log.warning(
+                "Failed to open cached device '%s': %s",
+                self._conf.scanner_device, exception)
+
+        if self._is_refreshing():
+            self._refresh.join()
+
+        cache = DevicesCache(
+            const.DEVICES_CACHE_PATH, self._conf.scanner_devices_cache_ttl)
+        cache.clear()
+
+        self._callback.on_searching_for_devices()
+        devices = self._find_devices(cache)
+
+        if not devices:
+            raise Error('No devices found.')
+
+        device_name = self._callback.on_set_device(devices)
+
+        if not device_name:
+            raise Error('Device is not set.')
+
+        self._conf.scanner_device = device_name
+
+        return self._get_device(device_name)
+
+    @staticmethod
+    def _find_devices(cache: 'DevicesCache') -> List[Device]:
+        """Returns devices found by SANE and saves them in the cache.
+
+        Raises:
+            _sane.error:
+                Failed to find devices.
+        """
+        devices = list(itertools.starmap(Device, sane.get_devices()))
+        cache.save(devices)
+        return devices
+
+    def _refresh_devices(self, cache: 'DevicesCache') -> None:
+        """Updates the cache with found devices.  Used in background."""
+        try:
+            self._find_devices(cache)
+            log.info('Cached devices updated')
+
+        except _sane.error as exception:
+            log.exception(exception)
 
     def _get_device(self, device_name: str) -> sane.SaneDev:
         """Opens the device and sets the parameters according to config.
@@ -198,6 +440,9 @@ class Scanner:  # pylint: disable=too-few-public-methods
                 'resolution': self._conf.scanner_resolution,
             }
 
+            if self._conf.scanner_source:
+                config_options['source'] = self._conf.scanner_source
+
             for conf_option in config_options:
                 if hasattr(device, conf_option):
                     for option in available_options:
@@ -223,11 +468,241 @@ class Scanner:  # pylint: disable=too-few-public-methods
 
         return device
 
+    def _set_scan_area(
+            self, device: sane.SaneDev, notebook: models.Notebook) -> None:
+        """Limits the scan area to the part of glass with notebook's pages.
+
+        The area is computed with `models.Notebook.get_scan_area()`, so pages
+        are the same as if the whole glass was scanned.  Less data is read
+        from the scanner, which is faster especially at high resolutions.
+
+        The whole glass is scanned if the device does not support setting
+        the scan area in millimeters.  If even the whole glass cannot be
+        set, the device's default scan area is kept.
+
+        Args:
+            device:
+                A sane.SaneDev object representing a SANE device.
+            notebook:
+                A notebook which is going to be scanned.
+        """
+        glass = self._get_glass(device)
+
+        if not glass:
+            log.info('Scan area cannot be set, scanning the whole glass')
+            return
+
+        resolution = device.resolution
+        glass_width, glass_height = glass
+        glass_size = (
+            math.floor(glass_width * resolution / 25.4),
+            math.floor(glass_height * resolution / 25.4),
+        )
+        margin = math.ceil(SCAN_AREA_MARGIN * resolution / 25.4)
+
+        area = notebook.get_scan_area(glass_size, resolution, margin)
+
+        if area == (0, 0) + glass_size:
+            return
+
+        left, upper, right, lower = (
+            coordinate * 25.4 / resolution for coordinate in area)
+
+        if area[2] == glass_size[0]:
+            right = glass_width
+
+        if area[3] == glass_size[1]:
+            lower = glass_height
+
+        try:
+            self._set_area(device, (left, upper, right, lower))
+
+        except (_sane.error, AttributeError) as exception:
+            log.exception(exception)
+
+            try:
+                self._set_area(device, (0, 0, glass_width, glass_height))
+
+            except (_sane.error, AttributeError) as exception_:
+                log.exception(exception_)
+                log.info('Scan area cannot be set, keeping device default')
+
+    @staticmethod
+    def _get_glass(device: sane.SaneDev) -> Optional[Tuple[float, float]]:
+        """Returns width and height of scanner's glass in millimeters.
+
+        Returns:
+            None if the scan area cannot be set in millimeters.
+        """
+        glass = {}
+
+        for option in device.get_options():
+            if option[1] in SCAN_AREA_OPTIONS and option[5] == UNIT_MM:
+                if isinstance(option[8], tuple):
+                    glass[option[1]] = option[8]
+
+        if len(glass) < len(SCAN_AREA_OPTIONS):
+            return None
+
+        return glass['br-x'][1], glass['br-y'][1]
+
+    @staticmethod
+    def _set_area(
+            device: sane.SaneDev,
+            area: Tuple[float, float, float, float]) -> None:
+        """Sets the scan area in millimeters."""
+        device.tl_x, device.tl_y = area[0], area[1]
+        device.br_x, device.br_y = area[2], area[3]
+        log.info('Scan area set to (%.1f, %.1f, %.1f, %.1f) mm', *area)
+
+    @staticmethod
+    def _get_preview_resolution(device: sane.SaneDev) -> int:
+        """Returns the supported resolution closest to PREVIEW_RESOLUTION."""
+        for option in device.get_options():
+            if option[1] == 'resolution':
+                allowed_values = option[8]
+
+                if isinstance(allowed_values, list) and allowed_values:
+                    return min(
+                        allowed_values,
+                        key=lambda value: (
+                            value < PREVIEW_RESOLUTION,
+                            abs(value - PREVIEW_RESOLUTION)))
+
+                if isinstance(allowed_values, tuple):
+                    return max(allowed_values[0], PREVIEW_RESOLUTION)
+
+        return PREVIEW_RESOLUTION
+
+    def _scan_with_preview(
+            self, device: sane.SaneDev, glass: Tuple[float, float],
+            notebook: models.Notebook) -> pillow.Image:
+        """Scans only the area of glass where a page lies.
+
+        At first, the whole glass is scanned at low resolution.  The page is
+        found on this preview with `imaging.find_page_box()`.  Then the area
+        of the notebook's page size (see `models.Notebook.get_scan_area()`)
+        from the found top left corner is scanned at the configured
+        resolution.
+
+        If the found box is much smaller than the page, it is the text on a
+        page whose edges are not seen (e.g. a white page under a white lid),
+        so the whole glass is scanned.
+
+        Args:
+            device:
+                A sane.SaneDev object representing a SANE device.
+            glass:
+                Width and height of scanner's glass in millimeters.
+            notebook:
+                A notebook which is being scanned.
+
+        Returns:
+            An image with the page.
+        """
+        resolution = device.resolution
+        preview_resolution = self._get_preview_resolution(device)
+
+        self._set_area(device, (0, 0) + glass)
+        device.resolution = preview_resolution
+
+        try:
+            preview = device.scan()
+
+        finally:
+            device.resolution = resolution
+
+        box = imaging.find_page_box(preview)
+        area = notebook.get_scan_area(
+            (math.floor(glass[0] * resolution / 25.4),
+             math.floor(glass[1] * resolution / 25.4)), resolution)
+        page_width, page_height = (
+            (area[2] - area[0]) * 25.4 / resolution,
+            (area[3] - area[1]) * 25.4 / resolution)
+
+        if box:
+            left, upper, right, lower = (
+                coordinate * 25.4 / preview_resolution for coordinate in box)
+
+            if (right - left < page_width * MIN_PAGE_BOX_RATIO or
+                    lower - upper < page_height * MIN_PAGE_BOX_RATIO):
+                log.info('Page edges not found on preview, '
+                         'scanning the whole glass')
+            else:
+                self._set_area(device, (
+                    max(0, left - SCAN_AREA_MARGIN),
+                    max(0, upper - SCAN_AREA_MARGIN),
+                    min(glass[0], left + page_width + SCAN_AREA_MARGIN),
+                    min(glass[1], upper + page_height + SCAN_AREA_MARGIN),
+                ))
+        else:
+            log.info('No page found on preview, scanning the whole glass')
+
+        return self._acquire(device)
+
+    def _acquire(self, device: sane.SaneDev) -> pillow.Image:
+        """Scans an image at the configured resolution.
+
+        If `low_memory` config option is set, the image is read with
+        `_snap()` which avoids copying the whole image once more.
+        """
+        if not self._conf.scanner_low_memory:
+            return device.scan()
+
+        device.start()
+        return _snap(device)
+
+    def _feed(self, device: sane.SaneDev) -> Iterator[pillow.Image]:
+        """Yields images scanned from the document feeder until it is empty.
+
+        `sane.SaneDev.multi_scan()` is not used, because the iterator it
+        returns in python-sane 2.8 cannot be used with `next()` in Python 3.
+
+        Raises:
+            _sane.error:
+                A SANE error occured other than the empty feeder.
+        """
+        try:
+            while True:
+                try:
+                    device.start()
+
+                except _sane.error as exception:
+                    if str(exception) == FEEDER_EMPTY_MESSAGE:
+                        return
+
+                    raise
+
+                if self._conf.scanner_low_memory:
+                    yield _snap(device, no_cancel=True)
+                else:
+                    yield device.snap(True)
+
+        finally:
+            device.cancel()
+
     def _scan(
             self, device: sane.SaneDev, notebook: models.Notebook,
             pages_queue: collections.deque) -> None:
         """Performs the actual scanning.
 
+        Scanning is done in the current thread while scanned pages are cropped
+        and saved by `_PagePipeline` in background.
+
+        If `feeder` config option is set, pages are taken from the document
+        feeder one after another without delay until the feeder is empty.
+        Sheets left in the feeder after the given pages are appended to the
+        notebook if nothing but new pages is asked for.  If pages are only
+        replaced, scanning stops after the last of them.
+
+        Otherwise, if `preview` config option is set, each page is scanned
+        twice: at low resolution to find the page on the glass and then at
+        the configured resolution within the found area only.
+
+        If `low_memory` config option is set, the scanned image is cropped
+        before the next page is scanned, so only one full image is kept in
+        memory.  Otherwise, full images are cropped in background.
+
         Args:
             device:
                 A sane.SaneDev object representing a SANE device.
@@ -235,55 +710,105 @@ class Scanner:  # pylint: disable=too-few-public-methods
                 A notebook which should be scanned.
             pages_queue:
                 Numbers of pages that should be scanned.
+
+        Raises:
+            scanner.Error:
+                Failed to process a scanned page.
         """
-        if len(pages_queue) == 0:
+        feeder = self._conf.scanner_feeder
+
+        if len(pages_queue) == 0 and not feeder:
             self._callback.on_error('Nothing to scan')
             return
 
-        self._callback.on_start(device.devname, list(pages_queue))
+        first_new_page = notebook.first_page_number + notebook.total_pages
+        append_from_feeder = feeder and (
+            len(pages_queue) == 0 or pages_queue[-1] >= first_new_page)
 
-        while len(pages_queue) > 0:
-            page = pages_queue.popleft()
+        self._callback.on_start(
+            device.devname, list(pages_queue), append_from_feeder)
 
-            self._callback.on_start_scan_page(page)
+        images = self._feed(device) if feeder else None
 
-            image = device.scan()
+        glass = None
 
-            if notebook.type.pages_paired:
-                page_width_pt = math.ceil(
-                    notebook.type.page_width * device.resolution / 25.4)
-                orig_width = image.size[1]
+        if self._conf.scanner_preview and not feeder:
+            glass = self._get_glass(device)
 
-                if (page_width_pt * 2 < orig_width and
-                        notebook.first_page_number % 2 == page % 2):
-                    # two pages on image, crop both left and right pages
-                    self._process_scanned_page(
-                        page, notebook, image, device.resolution)
+            if not glass:
+                log.info('Scan area cannot be set, preview is not used')
+
+        pipeline = _PagePipeline(self._callback)
+
+        try:
+            while len(pages_queue) > 0 or append_from_feeder:
+                if feeder:
+                    image = next(images, None)
+
+                    if image is None:
+                        log.info('Document feeder is empty')
+
+                        if pages_queue:
+                            self._callback.on_feeder_empty(list(pages_queue))
+
+                        break
+
+                    if pages_queue:
+                        page = pages_queue.popleft()
+                    else:
+                        # the sheet is appended to the notebook
+                        page = (notebook.first_page_number +
+                                notebook.total_pages)
+
+                    self._callback.on_start_scan_page(page)
+                else:
+                    page = pages_queue.popleft()
+                    self._callback.on_start_scan_page(page)
+
+                    if glass:
+                        image = self._scan_with_preview(
+                            device, glass, notebook)
+                    else:
+                        image = self._acquire(device)
 
+                if notebook.holds_two_pages(
+                        page, image.size, device.resolution):
+                    # two pages on image, crop both left and right pages
                     self._process_scanned_page(
-                        page + 1, notebook, image, device.resolution)
+                        pipeline, page, notebook, image, device.resolution,
+                        two_pages=True)
 
                     if pages_queue:
                         if pages_queue[0] == page + 1:
                             pages_queue.popleft()
                 else:
                     self._process_scanned_page(
-                        page, notebook, image, device.resolution)
-            else:
-                self._process_scanned_page(
-                    page, notebook, image, device.resolution)
+                        pipeline, page, notebook, image, device.resolution)
+
+                del image
+
+                if pages_queue and not feeder:
+                    time.sleep(self._conf.scanner_delay)
+
+            pipeline.join()
+
+        finally:
+            if images:
+                images.close()
 
-            if pages_queue:
-                time.sleep(self._conf.scanner_delay)
+            pipeline.close()
 
         self._callback.on_finish(notebook)
 
-    def _process_scanned_page(
-            self, page: int, notebook: models.Notebook, image: pillow.Image,
-            resolution: int) -> None:
-        """Crops an image with page, increases total number of pages if needed.
+    def _process_scanned_page(  # pylint: disable=too-many-arguments
+            self, pipeline: '_PagePipeline', page: int,
+            notebook: models.Notebook, image: pillow.Image,
+            resolution: int, two_pages: bool = False) -> None:
+        """Increases total number of pages if needed, sends page to pipeline.
 
         Args:
+            pipeline:
+                A pipeline which crops and saves the page.
             page:
                 Number of page which has been scanned.
             notebook:
@@ -291,12 +816,183 @@ class Scanner:  # pylint: disable=too-few-public-methods
             image:
                 An image with the scanned page.  This image will be cropped and
                 rotated as needed and saved to a file.
+            resolution:
+                Resolution the image was scanned with.
+            two_pages:
+                Whether the image contains also the next page.
+
+        Raises:
+            scanner.Error:
+                Failed to process one of previously scanned pages.
+        """
+        pages = [page, page + 1] if two_pages else [page]
+
+        for page_ in pages:
+            if page_ > (notebook.total_pages +
+                        notebook.first_page_number - 1):
+                notebook.total_pages += 1
+
+        if self._conf.scanner_low_memory:
+            # crop now, so the full image is freed before the next scan
+            if two_pages:
+                images = notebook.split_image(page, image, resolution)
+            else:
+                images = (notebook.crop_image(page, image, resolution),)
+
+            pipeline.submit_cropped(notebook, list(zip(pages, images)))
+        else:
+            pipeline.submit(notebook, page, image, resolution, two_pages)
+
+
+def _snap(device: sane.SaneDev, no_cancel: bool = False) -> pillow.Image:
+    """Reads the scanned image from the device.
+
+    `sane.SaneDev.snap()` copies the data read by the backend to `bytes`
+    before making an image, so two full copies of the image are alive at
+    once.  Here the image is made directly from the backend's buffer.
+    Grayscale images even share memory with the buffer.
+
+    If `no_cancel` is True, the scan is not cancelled after the image is
+    read, so the next sheet can be taken from the document feeder.
+
+    Raises:
+        _sane.error:
+            The scanner returned no data or another SANE error occured.
+    """
+    data, width, height, samples, _ = device.dev.snap(no_cancel)
+
+    if not data:
+        raise _sane.error('Scanner returned no data')
+
+    mode = 'RGB' if samples == 3 else 'L'
+    return pillow.frombuffer(mode, (width, height), data, 'raw', mode, 0, 1)
+
+
+class _PagePipeline:
+    """Crops scanned pages and passes them to the callback in background.
+
+    Pages are cropped by a pool of worker threads, so the scanner may acquire
+    the next page while the previous ones are being processed.  The callback
+    is notified about pages in the same order they were submitted.
+
+    If too many pages are waiting to be processed, `submit()` blocks until
+    the oldest page is done, so memory usage does not grow with the number of
+    scanned pages.
+    """
+
+    def __init__(
+            self, callback_: Callback,
+            max_workers: int = PAGE_WORKERS,
+            max_pages_in_flight: int = MAX_PAGES_IN_FLIGHT):
+        self._callback = callback_
+        self._executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+        self._pending: Deque[futures.Future] = collections.deque()
+        self._max_pages_in_flight = max(1, max_pages_in_flight)
+
+    def submit(  # pylint: disable=too-many-arguments
+            self, notebook: models.Notebook, page: int, image: pillow.Image,
+            resolution: int, two_pages: bool = False) -> None:
+        """Schedules the page (or two pages) for cropping and saving.
+
+        Raises:
+            scanner.Error:
+                Failed to process one of previously submitted pages.
         """
-        image = notebook.crop_image(
-            page, image, resolution)
+        self._schedule(
+            self._process, notebook, page, image, resolution, two_pages)
+
+    def submit_cropped(
+            self, notebook: models.Notebook,
+            pages: List[Tuple[int, pillow.Image]]) -> None:
+        """Schedules pages which have already been cropped for saving.
+
+        Args:
+            notebook:
+                A notebook to which the pages belong.
+            pages:
+                Numbers of pages and cropped images.
+
+        Raises:
+            scanner.Error:
+                Failed to process one of previously submitted pages.
+        """
+        self._schedule(self._notify, notebook, pages)
+
+    def join(self) -> None:
+        """Waits until all submitted pages are processed.
+
+        Raises:
+            scanner.Error:
+                Failed to process one of the pages.
+        """
+        while self._pending:
+            self._wait(self._pending.popleft())
+
+    def close(self) -> None:
+        """Cancels pages which are not started yet and stops workers."""
+        for future in self._pending:
+            future.cancel()
+
+        self._pending.clear()
+        self._executor.shutdown(wait=True)
+
+    def _schedule(self, function: Callable, *args) -> None:
+        """Runs the function in a worker after waiting for a free slot.
+
+        The future of the previously scheduled page is passed to the function
+        as the last argument.
+        """
+        while len(self._pending) >= self._max_pages_in_flight:
+            self._wait(self._pending.popleft())
+
+        previous = self._pending[-1] if self._pending else None
+
+        self._pending.append(
+            self._executor.submit(function, *args, previous))
+
+    def _process(  # pylint: disable=too-many-arguments
+            self, notebook: models.Notebook, page: int, image: pillow.Image,
+            resolution: int, two_pages: bool,
+            previous: Optional[futures.Future]) -> None:
+        """Crops the page and notifies the callback after the previous page.
+
+        If the image contains two pages, it is split with a single rotation.
+        """
+        if two_pages:
+            pages = zip(
+                (page, page + 1),
+                notebook.split_image(page, image, resolution))
+        else:
+            pages = [(page, notebook.crop_image(page, image, resolution))]
+
+        self._notify(notebook, pages, previous)
+
+    def _notify(
+            self, notebook: models.Notebook,
+            pages: Iterable[Tuple[int, pillow.Image]],
+            previous: Optional[futures.Future]) -> None:
+        """Passes cropped pages to the callback after the previous page.
+
+        Pages are straightened, checked for being blank and converted to
+        black and white before, if the notebook's type requires it.  Blank
+        pages are passed as None.
+        """
+        pages = [(page_, imaging.clean_page(image_, notebook.type))
+                 for page_, image_ in pages]
+
+        if previous:
+            previous.result()
+
+        for page_, image_ in pages:
+            self._callback.on_finish_scan_page(notebook, page_, image_)
+
+    @staticmethod
+    def _wait(future: futures.Future) -> None:
+        try:
+            future.result()
 
-        if page > (notebook.total_pages +
-                   notebook.first_page_number - 1):
-            notebook.total_pages += 1
+        except futures.CancelledError:
+            pass
 
-        self._callback.on_finish_scan_page(notebook, page, image)
+        except Exception as exception:  # pylint: disable=broad-except
+            raise Error(f'Failed to process page: {exception}') from exception
@@ -32,7 +32,7 @@ from typing import NoReturn
 
 from PyInquirer import ValidationError
 
-from smth import db, models
+from smth import const, db, models
 
 
 class NotebookValidator:
@@ -260,15 +260,40 @@ class TypeValidator:
 
         return True
 
+    def validate_resolution(self, resolution: str) -> bool:  # pylint: disable=no-self-use  # noqa: E501
+        """Checks if given input is an integer from 0 to 1200.
+
+        Args:
+            resolution:
+                A resolution of pages in DPI.
+
+        Returns:
+            True, if validation succeeded.  Never returns False.
+
+        Raises:
+            PyInquirer.ValidationError:
+                An error when validation failed.
+        """
+        resolution = resolution.strip()
+
+        if not resolution.isnumeric() or int(resolution) > 1200:
+            raise ValidationError(
+                message='Please, enter a number from 0 to 1200')
+
+        return True
+
 
 class PagesToScanValidator:  # pylint: disable=too-few-public-methods
     """Validates user input when choosing scan preferences."""
 
-    def __init__(self, notebook: models.Notebook):
+    def __init__(
+            self, notebook: models.Notebook,
+            max_pages_to_append: int = const.MAX_PAGES_TO_APPEND):
         self._notebook = notebook
+        self._max_pages_to_append = max_pages_to_append
 
-    def validate_number_of_pages_to_append(self, number: str) -> bool:  # pylint: disable=no-self-use  # noqa: E501
-        """Checks if number is an integer from 0 to 100.
+    def validate_number_of_pages_to_append(self, number: str) -> bool:
+        """Checks if number is an integer from 0 to the maximum (100 default).
 
         Args:
             number:
@@ -285,17 +310,18 @@ class PagesToScanValidator:  # pylint: disable=too-few-public-methods
         if len(number.strip()) == 0:
             return True
 
+        max_pages = self._max_pages_to_append
+        message = (f'Please, enter a number from 0 to {max_pages} '
+                   'or leave empty.')
+
         if not number.isnumeric():
-            raise ValidationError(
-                message='Please, enter a number from 0 to 100 or leave empty.')
+            raise ValidationError(message=message)
 
-        if len(number) > 3:
-            raise ValidationError(
-                message='Please, enter a number from 0 to 100 or leave empty.')
+        if len(number) > len(str(max_pages)):
+            raise ValidationError(message=message)
 
-        if int(number) > 100:
-            raise ValidationError(
-                message='Please, enter a number from 0 to 100 or leave empty.')
+        if int(number) > max_pages:
+            raise ValidationError(message=message)
 
         return True
 
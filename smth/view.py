@@ -17,7 +17,7 @@ from typing import Any, Dict, List
 
 import PyInquirer as inquirer
 
-from smth import models, scanner, validators
+from smth import const, imaging, models, page_codecs, scanner, validators
 
 Answers = Dict[str, Any]
 
@@ -158,6 +158,39 @@ class View:
                 'message': 'Are pages paired? (default - no)',
                 'default': False,
             },
+            {
+                'type': 'input',
+                'name': 'pdf_resolution',
+                'message': 'Enter resolution of pages in PDF '
+                           '(0 - as scanned):',
+                'default': str(const.DEFAULT_PDF_RESOLUTION),
+                'validate': validator.validate_resolution,
+            },
+            {
+                'type': 'list',
+                'name': 'codec',
+                'message': 'Choose format of scanned pages',
+                'choices': list(page_codecs.CODECS),
+            },
+            {
+                'type': 'list',
+                'name': 'binarization',
+                'message': 'Convert pages to black and white?',
+                'choices': list(imaging.BINARIZATION_METHODS),
+            },
+            {
+                'type': 'confirm',
+                'name': 'deskew',
+                'message': 'Straighten pages and trim dark borders? '
+                           '(default - no)',
+                'default': False,
+            },
+            {
+                'type': 'list',
+                'name': 'blank_pages',
+                'message': 'What to do with blank pages?',
+                'choices': list(const.BLANK_PAGES_POLICIES),
+            },
         ]
 
         answers = self._prompt(questions)
@@ -166,6 +199,7 @@ class View:
             answers['title'] = answers['title'].strip()
             answers['page_width'] = int(answers['page_width'])
             answers['page_height'] = int(answers['page_height'])
+            answers['pdf_resolution'] = int(answers['pdf_resolution'])
             return answers
 
         return {}
@@ -368,6 +402,35 @@ class View:
         else:
             print('No types found.')
 
+    def show_pdf_jobs(self, jobs: List[models.PDFJob]) -> None:  # pylint: disable=no-self-use  # noqa: E501
+        """Shows the list of PDF jobs or a message if no jobs found.
+
+        Args:
+            jobs:
+                A list of jobs to show.  For each job the function prints
+                the notebook's title and the profile, the status, progress
+                and the time of the last change, and the error if any.
+        """
+        if jobs:
+            print('PDF jobs:')
+            for job in jobs:
+                title = job.notebook_title or f'(deleted notebook {job.notebook_id})'  # noqa: E501
+
+                if job.profile:
+                    title = f'{title} ({job.profile})'
+
+                status = job.status
+
+                if job.status == 'running' and job.total:
+                    status = f'{status} {job.done}/{job.total} pages'
+
+                print(f'  {title}  {status}  {job.updated}')
+
+                if job.error:
+                    print(f'    {job.error}')
+        else:
+            print('No PDF jobs found.')
+
     def confirm(self, question: str, default_yes: bool = False) -> bool:  # pylint: disable=no-self-use  # noqa: E501
         """Asks for confirmation and returns the answer (yes/no question).
 
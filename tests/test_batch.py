@@ -0,0 +1,127 @@
+import logging
+import pathlib
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import PIL.Image as pillow
+
+from smth import batch, models, page_codecs, page_store
+
+
+class BatchTestCase(unittest.TestCase):
+    """Test processing of batches of pages in worker processes."""
+
+    def setUp(self):
+        logging.disable()
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+
+        patcher = mock.patch.multiple(
+            'smth.const',
+            BLOBS_ROOT_PATH=self.directory / 'blobs',
+            PREVIEWS_ROOT_PATH=self.directory / 'previews')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        type_ = models.NotebookType('Type', 100, 200)
+        type_.codec = 'png'
+        self.notebook = models.Notebook('notebook', type_, 'path')
+
+        # 100x200 mm page scanned at 25.4 dpi on a larger glass
+        self.source = self.directory / 'scan.png'
+        pillow.new('L', (150, 250), 255).save(str(self.source))
+
+    def tearDown(self):
+        shutil.rmtree(str(self.directory))
+
+    def test_process_page(self):
+        task = batch.Task(self.notebook, 1, self.source, 25.4)
+
+        blob = batch.process_page(task)
+
+        self.assertTrue(blob.endswith('.png'))
+
+        with pillow.open(str(page_store.get_path(blob))) as image:
+            self.assertEqual(image.size, (100, 200))
+
+    def test_process_page_not_cropped(self):
+        task = batch.Task(self.notebook, 1, self.source, 0)
+
+        with pillow.open(str(page_store.get_path(
+                batch.process_page(task)))) as image:
+            self.assertEqual(image.size, (150, 250))
+
+    def test_process_page_crop_only(self):
+        self.notebook.type.codec = 'jpeg'
+        source = self.directory / 'page.jpg'
+        pillow.new('L', (150, 250), 255).save(str(source))
+        task = batch.Task(self.notebook, 1, source, 25.4, crop_only=True)
+
+        def transform(source, destination, angle, box):  # pylint: disable=unused-argument  # noqa: E501
+            shutil.copy(str(source), str(destination))
+            return True
+
+        with mock.patch('smth.jpeg.transform', side_effect=transform):
+            with mock.patch('smth.imaging.clean_page') as clean_page:
+                blob = batch.process_page(task)
+
+        clean_page.assert_not_called()
+        self.assertEqual(
+            page_store.get_path(blob).read_bytes(), source.read_bytes())
+        self.assertEqual(len(list(self.directory.glob('blobs/*.jpg'))), 0)
+
+    def test_process_page_crop_only_not_lossless(self):
+        self.notebook.type.codec = 'jpeg'
+        source = self.directory / 'page.jpg'
+        pillow.new('L', (150, 250), 255).save(str(source))
+        task = batch.Task(self.notebook, 1, source, 25.4, crop_only=True)
+
+        with mock.patch('smth.jpeg.transform', return_value=False):
+            blob = batch.process_page(task)
+
+        with pillow.open(str(page_store.get_path(blob))) as image:
+            self.assertEqual(image.size, (100, 200))
+
+    def test_get_encoding(self):
+        type_ = self.notebook.type
+        encoding = batch.get_encoding(type_)
+
+        type_.page_width = 150
+        self.assertEqual(batch.get_encoding(type_), encoding)
+
+        type_.binarization = 'otsu'
+        self.assertNotEqual(batch.get_encoding(type_), encoding)
+
+    def test_process_blank_page(self):
+        self.notebook.type.blank_pages = 'drop'
+        task = batch.Task(self.notebook, 1, self.source, 25.4)
+
+        blob = batch.process_page(task)
+
+        self.assertTrue(
+            page_codecs.is_blank_page(page_store.get_path(blob)))
+
+    def test_run(self):
+        tasks = [batch.Task(self.notebook, page, self.source, 25.4)
+                 for page in range(1, 6)]
+
+        with batch.BatchProcessor(workers=2) as processor:
+            results = list(processor.run(tasks))
+
+        self.assertCountEqual([task for task, _ in results], tasks)
+
+        for _, blob in results:
+            self.assertTrue(page_store.get_path(blob).exists())
+
+    def test_run_missing_page(self):
+        tasks = [batch.Task(
+            self.notebook, 1, self.directory / 'missing.png', 25.4)]
+
+        with batch.BatchProcessor(workers=1) as processor:
+            with self.assertRaises(batch.Error):
+                list(processor.run(tasks))
+
+    def test_run_not_started(self):
+        with self.assertRaises(batch.Error):
+            list(batch.BatchProcessor().run([]))
@@ -22,6 +22,12 @@ class ConfigTestCase(fake_filesystem_unittest.TestCase):
             'resolution': (150, 300),
             'mode': ('Gray', 'Color'),
             'ask_upload': (True, False),
+            'feeder': (True, False),
+            'source': ('Flatbed', 'ADF'),
+            'preview': (True, False),
+            'devices_cache_ttl': (60, 0),
+            'devices_refresh': (True, False),
+            'low_memory': (True, False),
         }
 
     def test_read_scanner_config(self):
@@ -52,6 +58,11 @@ class ConfigTestCase(fake_filesystem_unittest.TestCase):
         wrong_conf = {
             'resolution': 'not integer',
             'ask_upload': 'not boolean',
+            'feeder': 'not boolean',
+            'preview': 'not boolean',
+            'devices_cache_ttl': 'not integer',
+            'devices_refresh': 'not boolean',
+            'low_memory': 'not boolean',
         }
 
         for param in wrong_conf:
@@ -19,6 +19,11 @@ class CreateTypeTestCase(fake_filesystem_unittest.TestCase):
             'page_width': 100,
             'page_height': 200,
             'pages_paired': True,
+            'pdf_resolution': 300,
+            'codec': 'png',
+            'binarization': 'sauvola',
+            'deskew': True,
+            'blank_pages': 'drop',
         }
 
         self.view.ask_for_new_type_info.return_value = self.answers
@@ -110,6 +110,57 @@ class CropImageTestCase(unittest.TestCase):
         image = self.notebook.crop_image(2, orig_image, self.resolution)
         self.assertTupleEqual(image.size, self._type_size_pt())
 
+    def test_split_paired_pages(self):
+        self.notebook.type.pages_paired = True
+
+        for width_mm, height_mm in ((220, 300), (300, 220)):
+            orig_image = Image.effect_noise(
+                (self._mm_to_pt(width_mm), self._mm_to_pt(height_mm)), 64)
+
+            for type_width_mm, type_height_mm in ((100, 150), (100, 200)):
+                self._set_type_size_mm(type_width_mm, type_height_mm)
+
+                left, right = self.notebook.split_image(
+                    1, orig_image, self.resolution)
+
+                expected_left = self.notebook.crop_image(
+                    1, orig_image, self.resolution)
+                expected_right = self.notebook.crop_image(
+                    2, orig_image, self.resolution)
+
+                self.assertEqual(left.tobytes(), expected_left.tobytes())
+                self.assertEqual(right.tobytes(), expected_right.tobytes())
+                self.assertTupleEqual(left.size, self._type_size_pt())
+                self.assertTupleEqual(right.size, self._type_size_pt())
+
+    def test_crop_plan_cached(self):
+        self._set_type_size_mm(100, 150)
+        size = (self._mm_to_pt(220), self._mm_to_pt(300))
+
+        plan = self.notebook.get_crop_plan(1, size, self.resolution)
+
+        self.assertIs(
+            self.notebook.get_crop_plan(1, size, self.resolution), plan)
+        self.assertIs(
+            self.notebook.get_crop_plan(3, list(size), self.resolution), plan)
+
+    def test_crop_plan_same_as_rotate_and_crop(self):
+        orig_image = Image.effect_noise(
+            (self._mm_to_pt(300), self._mm_to_pt(220)), 64)
+
+        for paired, width_mm, height_mm in (
+                (False, 100, 150), (False, 150, 100), (True, 100, 150)):
+            self.notebook.type.pages_paired = paired
+            self._set_type_size_mm(width_mm, height_mm)
+
+            for page in (1, 2):
+                angle, box = self.notebook.get_crop_box(
+                    page, orig_image.size, self.resolution)
+                expected = orig_image.rotate(angle, expand=True).crop(box)
+                image = self.notebook.crop_image(
+                    page, orig_image, self.resolution)
+                self.assertEqual(image.tobytes(), expected.tobytes())
+
     def test_crop_orig_landscape(self):
         orig_image = self._new_image(300, 220)
         self._set_type_size_mm(100, 150)
@@ -135,3 +186,65 @@ class CropImageTestCase(unittest.TestCase):
 
     def _mm_to_pt(self, size_mm: int) -> int:
         return math.ceil(size_mm * self.resolution / 25.4)
+
+
+class ScanAreaTestCase(unittest.TestCase):
+    """Tests on the part of scanner's glass which is scanned."""
+
+    def setUp(self):
+        self.resolution = 50
+        self.glass_size = (
+            math.floor(216 * self.resolution / 25.4),
+            math.floor(297 * self.resolution / 25.4),
+        )
+        self.glass_image = Image.effect_noise(self.glass_size, 64)
+
+    def test_scan_area_portrait_single_page(self):
+        notebook = self._new_notebook(100, 150)
+        area = notebook.get_scan_area(self.glass_size, self.resolution)
+        self.assertTupleEqual(area, (0, 0) + self._size_pt(100, 150))
+        self._assert_same_pages(notebook, area, [1])
+
+    def test_scan_area_landscape_single_page(self):
+        notebook = self._new_notebook(150, 100)
+        area = notebook.get_scan_area(self.glass_size, self.resolution, 2)
+        self._assert_same_pages(notebook, area, [1])
+
+    def test_scan_area_paired_pages(self):
+        notebook = self._new_notebook(100, 150, pages_paired=True)
+        area = notebook.get_scan_area(self.glass_size, self.resolution, 2)
+        self._assert_same_pages(notebook, area, [1, 2])
+
+    def test_scan_area_paired_pages_wider_than_glass(self):
+        notebook = self._new_notebook(160, 200, pages_paired=True)
+        area = notebook.get_scan_area(self.glass_size, self.resolution, 2)
+        self._assert_same_pages(notebook, area, [1, 2])
+
+    def test_scan_area_larger_than_glass(self):
+        notebook = self._new_notebook(240, 320)
+        area = notebook.get_scan_area(self.glass_size, self.resolution)
+        self.assertTupleEqual(area, (0, 0) + self.glass_size)
+
+    def _new_notebook(
+            self, width_mm: int, height_mm: int,
+            pages_paired: bool = False) -> models.Notebook:
+        type_ = models.NotebookType('', width_mm, height_mm)
+        type_.pages_paired = pages_paired
+        return models.Notebook('', type_, '')
+
+    def _assert_same_pages(self, notebook, area, pages):
+        self.assertLess(
+            (area[2] - area[0]) * (area[3] - area[1]),
+            self.glass_size[0] * self.glass_size[1])
+
+        area_image = self.glass_image.crop(area)
+
+        for page in pages:
+            expected = notebook.crop_image(
+                page, self.glass_image, self.resolution)
+            image = notebook.crop_image(page, area_image, self.resolution)
+            self.assertEqual(image.tobytes(), expected.tobytes())
+
+    def _size_pt(self, width_mm: int, height_mm: int) -> Tuple[int, int]:
+        return (math.ceil(width_mm * self.resolution / 25.4),
+                math.ceil(height_mm * self.resolution / 25.4))
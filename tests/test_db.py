@@ -89,6 +89,125 @@ class TestDB(unittest.TestCase):
         self.assertEqual(type_.page_height, expected.page_height)
         self.assertEqual(type_.pages_paired, expected.pages_paired)
 
+    def test_pdf_resolution(self):
+        type_ = self.db.get_type_by_title('Type 1')
+        self.assertEqual(type_.pdf_resolution, 150)
+
+        type_.pdf_resolution = 300
+        self.db.save_type(type_)
+
+        type_ = self.db.get_type_by_title('Type 1')
+        self.assertEqual(type_.pdf_resolution, 300)
+
+    def test_codec(self):
+        type_ = self.db.get_type_by_title('Type 1')
+        self.assertEqual(type_.codec, 'jpeg')
+
+        type_.codec = 'tiff-g4'
+        self.db.save_type(type_)
+
+        type_ = self.db.get_type_by_title('Type 1')
+        self.assertEqual(type_.codec, 'tiff-g4')
+
+    def test_binarization(self):
+        type_ = self.db.get_type_by_title('Type 1')
+        self.assertEqual(type_.binarization, 'none')
+
+        type_.binarization = 'otsu'
+        self.db.save_type(type_)
+
+        type_ = self.db.get_type_by_title('Type 1')
+        self.assertEqual(type_.binarization, 'otsu')
+
+    def test_deskew(self):
+        type_ = self.db.get_type_by_title('Type 1')
+        self.assertFalse(type_.deskew)
+
+        type_.deskew = True
+        self.db.save_type(type_)
+
+        type_ = self.db.get_type_by_title('Type 1')
+        self.assertTrue(type_.deskew)
+
+    def test_blank_pages(self):
+        type_ = self.db.get_type_by_title('Type 1')
+        self.assertEqual(type_.blank_pages, 'keep')
+
+        type_.blank_pages = 'empty'
+        self.db.save_type(type_)
+
+        type_ = self.db.get_type_by_title('Type 1')
+        self.assertEqual(type_.blank_pages, 'empty')
+
+    def test_new_columns_added(self):
+        os.remove(self.DB_PATH)
+
+        connection = sqlite3.connect(self.DB_PATH)
+        connection.execute('''CREATE TABLE notebook_type(
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT UNIQUE,
+            page_width INTEGER,
+            page_height INTEGER,
+            pages_paired INTEGER)''')
+        connection.execute('''INSERT INTO
+            notebook_type(title, page_width, page_height, pages_paired)
+            VALUES('A5', 148, 210, 0)''')
+        connection.commit()
+        connection.close()
+
+        type_ = db.DB(self.DB_PATH).get_type_by_title('A5')
+        self.assertEqual(type_.page_width, 148)
+        self.assertEqual(type_.pdf_resolution, 150)
+        self.assertEqual(type_.codec, 'jpeg')
+        self.assertEqual(type_.binarization, 'none')
+        self.assertFalse(type_.deskew)
+        self.assertEqual(type_.blank_pages, 'keep')
+
+    def test_pages(self):
+        notebook = self.db.get_notebook_by_title('Notebook 1')
+        self.assertDictEqual(notebook.pages, {})
+
+        notebook.pages = {1: 'a.jpg', 2: 'b.png'}
+        self.db.save_notebook(notebook)
+
+        notebook.title = 'Renamed'
+        notebook.pages[2] = 'c.png'
+        self.db.save_notebook(notebook)
+
+        notebook = self.db.get_notebook_by_title('Renamed')
+        self.assertDictEqual(notebook.pages, {1: 'a.jpg', 2: 'c.png'})
+        self.assertSetEqual(self.db.get_blobs(), {'a.jpg', 'c.png'})
+
+    def test_pages_removed_from_manifest(self):
+        notebook = self.db.get_notebook_by_title('Notebook 1')
+        notebook.pages = {1: 'a.jpg', 2: 'b.png'}
+        self.db.save_notebook(notebook)
+
+        del notebook.pages[2]
+        self.db.save_notebook(notebook)
+
+        notebook = self.db.get_notebook_by_title('Notebook 1')
+        self.assertDictEqual(notebook.pages, {1: 'a.jpg'})
+        self.assertSetEqual(self.db.get_blobs(), {'a.jpg'})
+
+    def test_pages_of_new_notebook(self):
+        notebook = models.Notebook(
+            'New', self.types[0], '/test/new.pdf')
+        notebook.pages = {1: 'a.jpg'}
+        self.db.save_notebook(notebook)
+
+        self.assertGreater(notebook.id, 0)
+        self.assertDictEqual(
+            self.db.get_notebook_by_title('New').pages, {1: 'a.jpg'})
+
+    def test_pages_deleted_with_notebook(self):
+        notebook = self.db.get_notebook_by_title('Notebook 1')
+        notebook.pages = {1: 'a.jpg'}
+        self.db.save_notebook(notebook)
+
+        self.db.delete_notebook_by_id(notebook.id)
+        self.assertSetEqual(self.db.get_blobs(), set())
+
     def test_notebook_exists(self):
         for notebook in self.notebooks:
             self.assertTrue(self.db.notebook_exists(notebook.title))
@@ -123,6 +242,66 @@ class TestDB(unittest.TestCase):
         self.db.save_type(self.types[0])
         self.assertTrue(self.db.type_exists('New Title'))
 
+    def test_get_notebook_by_id(self):
+        id_ = self.db.get_notebook_by_title('Notebook 2').id
+
+        self.assertEqual(self.db.get_notebook_by_id(id_).title, 'Notebook 2')
+        self.assertEqual(self.db.get_notebook_by_id(100).id, -1)
+
+    def test_pdf_jobs(self):
+        id_ = self.db.get_notebook_by_title('Notebook 2').id
+
+        self.db.add_pdf_job(id_)
+        self.db.add_pdf_job(id_)  # already queued
+        self.db.add_pdf_job(id_, 'screen')
+
+        job = self.db.take_pdf_job()
+        self.assertEqual(
+            (job.notebook_title, job.profile, job.status),
+            ('Notebook 2', None, 'running'))
+
+        self.db.update_pdf_job(job._replace(status='done', done=5, total=5))
+
+        jobs = self.db.get_pdf_jobs()
+        self.assertEqual([job.status for job in jobs], ['queued', 'done'])
+        self.assertEqual((jobs[1].done, jobs[1].total), (5, 5))
+        self.assertEqual(jobs[0].profile, 'screen')
+
+        self.assertEqual(self.db.take_pdf_job().profile, 'screen')
+        self.assertIsNone(self.db.take_pdf_job())
+
+    def test_reset_pdf_jobs(self):
+        id_ = self.db.get_notebook_by_title('Notebook 2').id
+        self.db.add_pdf_job(id_)
+        self.db.take_pdf_job()
+
+        self.db.reset_pdf_jobs()
+
+        self.assertEqual(self.db.take_pdf_job().notebook_id, id_)
+
+    def test_old_pdf_jobs_removed(self):
+        id_ = self.db.get_notebook_by_title('Notebook 2').id
+
+        with mock.patch('smth.const.MAX_PDF_JOBS_KEPT', 2):
+            for _ in range(3):
+                self.db.add_pdf_job(id_)
+                job = self.db.take_pdf_job()
+                self.db.update_pdf_job(job._replace(status='done'))
+
+            self.db.add_pdf_job(id_)
+
+        self.assertEqual(
+            [job.status for job in self.db.get_pdf_jobs()],
+            ['queued', 'done'])
+
+    def test_pdf_jobs_of_deleted_notebook_removed(self):
+        id_ = self.db.get_notebook_by_title('Notebook 2').id
+        self.db.add_pdf_job(id_)
+
+        self.db.delete_notebook_by_id(id_)
+
+        self.assertEqual(self.db.get_pdf_jobs(), [])
+
     @mock.patch.object(sqlite3, 'connect', side_effect=sqlite3.Error)
     def test_errors(self, connect_mock):
         del connect_mock  # Unused
@@ -141,6 +320,11 @@ class TestDB(unittest.TestCase):
         self.assertRaises(db.Error, self.db.save_notebook, self.notebooks[0])
         self.assertRaises(db.Error, self.db.delete_notebook_by_id, 0)
         self.assertRaises(db.Error, self.db.save_type, self.types[0])
+        self.assertRaises(db.Error, self.db.get_notebook_by_id, 0)
+        self.assertRaises(db.Error, self.db.add_pdf_job, 0)
+        self.assertRaises(db.Error, self.db.take_pdf_job)
+        self.assertRaises(db.Error, self.db.reset_pdf_jobs)
+        self.assertRaises(db.Error, self.db.get_pdf_jobs)
 
     def tearDown(self):
         os.remove(self.DB_PATH)
@@ -4,12 +4,14 @@ from unittest import mock
 
 from pyfakefs import fake_filesystem_unittest
 
-from smth import commands, db, models
+from smth import commands, db, models, page_store, pdf
+from tests import testutils
 
 
 class DeleteCommandTestCase(fake_filesystem_unittest.TestCase):
     def setUp(self):
         self.setUpPyfakefs()
+        testutils.use_fake_data_paths(self)
         logging.disable()
 
         self.notebook = models.Notebook(
@@ -18,6 +20,7 @@ class DeleteCommandTestCase(fake_filesystem_unittest.TestCase):
         self.db = mock.MagicMock(**{
             'get_notebook_titles.return_value': [self.notebook.title],
             'get_notebook_by_title.return_value': self.notebook,
+            'get_blobs.return_value': {'shared.jpg'},
         })
 
         self.view = mock.MagicMock(**{
@@ -40,6 +43,27 @@ class DeleteCommandTestCase(fake_filesystem_unittest.TestCase):
         self.assertTrue(self.notebook.path.exists())
         self.assertFalse(self.pages_dir_path.exists())
 
+    def test_execute_removes_blobs(self):
+        self.notebook.pages = {1: 'own.jpg', 2: 'shared.jpg'}
+
+        for blob in self.notebook.pages.values():
+            self.fs.create_file(str(page_store.get_path(blob)))
+
+        commands.DeleteCommand(self.db, self.view).execute(self.args)
+
+        self.assertFalse(page_store.get_path('own.jpg').exists())
+        self.assertTrue(page_store.get_path('shared.jpg').exists())
+
+    def test_execute_removes_pdf_layout(self):
+        self.notebook.id = 1
+        self.fs.create_file(str(pdf.get_layout_path(1)))
+        self.fs.create_file(str(pdf.get_layout_path(1, 'screen')))
+
+        commands.DeleteCommand(self.db, self.view).execute(self.args)
+
+        self.assertFalse(pdf.get_layout_path(1).exists())
+        self.assertFalse(pdf.get_layout_path(1, 'screen').exists())
+
     def test_execute_no_notebook_chosen(self):
         self.view.ask_for_notebook.return_value = ''
         commands.DeleteCommand(self.db, self.view).execute(self.args)
@@ -0,0 +1,63 @@
+import json
+import logging
+import pathlib
+import time
+
+from pyfakefs import fake_filesystem_unittest
+
+from smth import scanner
+
+
+class DevicesCacheTestCase(fake_filesystem_unittest.TestCase):
+    """Test caching of found scanner devices."""
+
+    def setUp(self):
+        logging.disable()
+
+        self.setUpPyfakefs()
+
+        self.path = pathlib.Path('/cache/devices.json')
+        self.devices = [
+            scanner.Device('device1', 'vendor', 'model', 'type'),
+            scanner.Device('device2', 'vendor', 'model', 'type'),
+        ]
+
+    def test_save_and_load(self):
+        cache = scanner.DevicesCache(self.path, 60)
+        cache.save(self.devices)
+
+        self.assertListEqual(cache.load(), self.devices)
+
+    def test_load_no_cache_file(self):
+        cache = scanner.DevicesCache(self.path, 60)
+        self.assertListEqual(cache.load(), [])
+
+    def test_load_expired(self):
+        cache = {
+            'time': time.time() - 120,
+            'devices': [list(device) for device in self.devices],
+        }
+        self.fs.create_file(str(self.path), contents=json.dumps(cache))
+
+        self.assertListEqual(scanner.DevicesCache(self.path, 60).load(), [])
+        self.assertListEqual(
+            scanner.DevicesCache(self.path, 600).load(), self.devices)
+
+    def test_load_bad_cache_file(self):
+        self.fs.create_file(str(self.path), contents='{bad json')
+        self.assertListEqual(scanner.DevicesCache(self.path, 60).load(), [])
+
+    def test_cache_disabled(self):
+        cache = scanner.DevicesCache(self.path, 0)
+        cache.save(self.devices)
+
+        self.assertFalse(self.path.exists())
+        self.assertListEqual(cache.load(), [])
+
+    def test_clear(self):
+        cache = scanner.DevicesCache(self.path, 60)
+        cache.save(self.devices)
+        cache.clear()
+
+        self.assertFalse(self.path.exists())
+        self.assertListEqual(cache.load(), [])
@@ -0,0 +1,198 @@
+import io
+import unittest
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from smth import imaging
+
+
+class FindPageBoxTestCase(unittest.TestCase):
+    """Tests on finding pages on preview scans."""
+
+    def test_page_on_dark_background(self):
+        image = Image.new('L', (108, 148), 30)
+        ImageDraw.Draw(image).rectangle((10, 20, 60, 90), fill=230)
+        self.assertTupleEqual(
+            imaging.find_page_box(image), (10, 20, 61, 91))
+
+    def test_page_on_light_background(self):
+        image = Image.new('RGB', (108, 148), (250, 250, 250))
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((10, 20, 60, 90), fill=(220, 220, 200), outline=120)
+        draw.line((20, 40, 50, 40), fill=0)
+        self.assertTupleEqual(
+            imaging.find_page_box(image), (10, 20, 61, 91))
+
+    def test_text_on_page_without_borders(self):
+        image = Image.new('L', (108, 148), 255)
+        draw = ImageDraw.Draw(image)
+        draw.line((20, 40, 50, 40), fill=0, width=2)
+        draw.line((20, 70, 40, 70), fill=0, width=2)
+        left, upper, right, lower = imaging.find_page_box(image)
+        self.assertLessEqual(left, 20)
+        self.assertLessEqual(upper, 40)
+        self.assertGreaterEqual(right, 50)
+        self.assertGreaterEqual(lower, 71)
+
+    def test_scanner_frame_ignored(self):
+        image = Image.new('L', (108, 148), 255)
+        ImageDraw.Draw(image).rectangle((0, 0, 107, 147), outline=0)
+        self.assertIsNone(imaging.find_page_box(image))
+
+    def test_empty_image(self):
+        self.assertIsNone(
+            imaging.find_page_box(Image.new('L', (108, 148), 255)))
+        self.assertIsNone(imaging.find_page_box(Image.new('L', (3, 3), 0)))
+
+
+class ReduceImageTestCase(unittest.TestCase):
+    """Test reducing images to fit a size."""
+
+    def test_reduce_jpeg(self):
+        data = io.BytesIO()
+        Image.new('L', (2400, 3200), 255).save(data, format='JPEG')
+
+        with Image.open(data) as image:
+            imaging.reduce_image(image, (600, 900))
+            self.assertTupleEqual(image.size, (600, 800))
+
+    def test_small_image_not_enlarged(self):
+        image = Image.new('L', (100, 200))
+        imaging.reduce_image(image, (600, 900))
+        self.assertTupleEqual(image.size, (100, 200))
+
+
+class BinarizeTestCase(unittest.TestCase):
+    """Test conversion of pages to black and white."""
+
+    def setUp(self):
+        # a page with text which is darker at the bottom
+        self.image = Image.new('L', (200, 300), 230)
+        draw = ImageDraw.Draw(self.image)
+        draw.rectangle((0, 200, 199, 299), fill=120)
+        draw.line((20, 50, 180, 50), fill=30, width=3)
+        draw.line((20, 250, 180, 250), fill=20, width=3)
+
+    def test_get_otsu_threshold(self):
+        gray = np.array([[20, 30, 40, 200, 210, 220]], dtype=np.uint8)
+        self.assertGreaterEqual(imaging.get_otsu_threshold(gray), 40)
+        self.assertLess(imaging.get_otsu_threshold(gray), 200)
+
+    def test_binarize_otsu(self):
+        image = imaging.binarize(self.image, 'otsu')
+
+        self.assertEqual(image.mode, '1')
+        self.assertEqual(image.size, self.image.size)
+        self.assertEqual(image.getpixel((100, 50)), 0)
+        self.assertEqual(image.getpixel((100, 100)), 255)
+
+    def test_binarize_sauvola(self):
+        image = imaging.binarize(self.image, 'sauvola')
+
+        self.assertEqual(image.mode, '1')
+        self.assertEqual(image.getpixel((100, 50)), 0)
+        self.assertEqual(image.getpixel((100, 100)), 255)
+        self.assertEqual(image.getpixel((100, 250)), 0)
+        self.assertEqual(image.getpixel((100, 280)), 255)
+
+    def test_binarize_sauvola_same_as_direct_computation(self):
+        gray = np.random.default_rng(1).integers(
+            0, 256, (40, 30), dtype=np.uint8)
+        image = imaging.binarize_sauvola(Image.fromarray(gray), window=7)
+
+        expected = np.empty(gray.shape, dtype=bool)
+
+        for y in range(gray.shape[0]):
+            for x in range(gray.shape[1]):
+                window = gray[max(0, y - 3):y + 4, max(0, x - 3):x + 4]
+                mean, deviation = window.mean(), window.std()
+                expected[y, x] = gray[y, x] > mean * (
+                    1 + imaging.SAUVOLA_K *
+                    (deviation / imaging.SAUVOLA_R - 1))
+
+        np.testing.assert_array_equal(np.asarray(image), expected)
+
+    def test_binarize_none(self):
+        self.assertIs(imaging.binarize(self.image, 'none'), self.image)
+
+
+class DeskewTestCase(unittest.TestCase):
+    """Test straightening and trimming of pages."""
+
+    def setUp(self):
+        self.page = Image.new('L', (620, 880), 235)
+        draw = ImageDraw.Draw(self.page)
+
+        for y in range(60, 820, 30):
+            for x in range(60, 560, 70):
+                draw.line((x, y, x + 50, y), fill=40, width=3)
+
+    def test_get_skew_angle(self):
+        for angle in (-3.0, -0.8, 1.5, 4.0):
+            skewed = self.page.rotate(angle, Image.BILINEAR, fillcolor=235)
+            self.assertAlmostEqual(
+                imaging.get_skew_angle(skewed), -angle, delta=0.1)
+
+    def test_get_skew_angle_blank_page(self):
+        self.assertEqual(
+            imaging.get_skew_angle(Image.new('L', (620, 880), 235)), 0.0)
+
+    def test_get_trim_box(self):
+        ImageDraw.Draw(self.page).rectangle((0, 0, 19, 879), fill=10)
+        ImageDraw.Draw(self.page).rectangle((0, 850, 619, 879), fill=10)
+
+        self.assertTupleEqual(
+            imaging.get_trim_box(self.page), (20, 0, 620, 850))
+
+    def test_deskew(self):
+        skewed = self.page.rotate(2, Image.BILINEAR, fillcolor=235)
+        ImageDraw.Draw(skewed).rectangle((0, 0, 619, 29), fill=10)
+
+        image = imaging.deskew(skewed)
+
+        self.assertTupleEqual(image.size, (620, 850))
+        self.assertAlmostEqual(imaging.get_skew_angle(image), 0, delta=0.1)
+
+    def test_deskew_straight_page(self):
+        self.assertIs(imaging.deskew(self.page), self.page)
+
+
+class IsBlankTestCase(unittest.TestCase):
+    """Test detection of blank pages."""
+
+    def setUp(self):
+        self.page = Image.new('L', (1240, 1754), 225)
+
+    def test_blank_page(self):
+        self.assertTrue(imaging.is_blank(self.page))
+
+    def test_noisy_page(self):
+        noise = np.random.default_rng(0).normal(0, 8, (1754, 1240))
+        pixels = np.clip(np.asarray(self.page) + noise, 0, 255)
+        page = Image.fromarray(pixels.astype(np.uint8))
+        ImageDraw.Draw(page).ellipse((600, 800, 603, 803), fill=30)
+
+        self.assertTrue(imaging.is_blank(page.convert('RGB')))
+
+    def test_shadows_at_edges(self):
+        draw = ImageDraw.Draw(self.page)
+        draw.rectangle((0, 0, 40, 1753), fill=60)
+        draw.rectangle((0, 1700, 1239, 1753), fill=60)
+
+        self.assertTrue(imaging.is_blank(self.page))
+
+    def test_page_with_a_few_words(self):
+        draw = ImageDraw.Draw(self.page)
+
+        for x in range(200, 500, 60):
+            draw.line((x, 300, x + 40, 300), fill=50, width=4)
+
+        self.assertFalse(imaging.is_blank(self.page))
+
+    def test_bilevel_page(self):
+        page = Image.new('1', (1240, 1754), 1)
+        self.assertTrue(imaging.is_blank(page))
+
+        ImageDraw.Draw(page).rectangle((300, 300, 400, 400), fill=0)
+        self.assertFalse(imaging.is_blank(page))
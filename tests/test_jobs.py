@@ -0,0 +1,239 @@
+import argparse
+import fcntl
+import logging
+import pathlib
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import PIL.Image as pillow
+
+from smth import commands, const, db, jobs, models, page_codecs, page_store
+
+
+class JobsTestCase(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+
+        paths_patcher = mock.patch.multiple(
+            'smth.const',
+            PAGES_ROOT_PATH=self.directory / 'pages',
+            BLOBS_ROOT_PATH=self.directory / 'blobs',
+            LAYOUTS_ROOT_PATH=self.directory / 'layouts',
+            LOCKS_ROOT_PATH=self.directory / 'locks',
+            JOBS_WORKER_LOCK_PATH=self.directory / 'locks' / 'worker.lock')
+        paths_patcher.start()
+        self.addCleanup(paths_patcher.stop)
+
+        self.db = db.DB(str(self.directory / 'smth.db'))
+
+        type_ = models.NotebookType('A6', 105, 148)
+        self.db.save_type(type_)
+
+        self.notebook = models.Notebook(
+            'notebook', type_, self.directory / 'notebook.pdf')
+        self.notebook.total_pages = 2
+
+        for page in (1, 2):
+            image = pillow.new('L', (105, 148), page * 100)
+            self.notebook.pages[page] = page_store.save(
+                image, page_codecs.get('jpeg'))
+
+        self.db.save_notebook(self.notebook)
+
+    def tearDown(self):
+        shutil.rmtree(str(self.directory))
+
+    def test_run_worker(self):
+        self.db.add_pdf_job(self.notebook.id)
+
+        jobs.run_worker(self.db)
+
+        job, = self.db.get_pdf_jobs()
+        self.assertEqual((job.status, job.done, job.total), ('done', 2, 2))
+        self.assertEqual(job.error, '')
+        self.assertTrue(self.notebook.path.exists())
+
+    def test_run_worker_with_profile(self):
+        self.db.add_pdf_job(self.notebook.id, 'screen')
+
+        jobs.run_worker(self.db)
+
+        self.assertTrue((self.directory / 'notebook-screen.pdf').exists())
+        self.assertFalse(self.notebook.path.exists())
+
+    def test_run_worker_missing_pages(self):
+        self.notebook.total_pages = 3
+        self.db.save_notebook(self.notebook)
+        self.db.add_pdf_job(self.notebook.id)
+
+        jobs.run_worker(self.db)
+
+        job, = self.db.get_pdf_jobs()
+        self.assertEqual(job.status, 'done')
+        self.assertIn('Pages missing', job.error)
+
+    def test_run_worker_deleted_notebook(self):
+        self.db.add_pdf_job(100)
+
+        jobs.run_worker(self.db)
+
+        job, = self.db.get_pdf_jobs()
+        self.assertEqual(job.status, 'failed')
+
+    def test_run_worker_failed_job(self):
+        self.db.add_pdf_job(self.notebook.id)
+
+        with mock.patch('smth.pdf.update', side_effect=OSError('error')):
+            jobs.run_worker(self.db)
+
+        job, = self.db.get_pdf_jobs()
+        self.assertEqual((job.status, job.error), ('failed', 'error'))
+
+    def test_run_worker_exits_if_another_one_runs(self):
+        self.db.add_pdf_job(self.notebook.id)
+        const.JOBS_WORKER_LOCK_PATH.parent.mkdir(parents=True)
+
+        with open(str(const.JOBS_WORKER_LOCK_PATH), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+            jobs.run_worker(self.db)
+
+        self.assertEqual(self.db.get_pdf_jobs()[0].status, 'queued')
+
+    def test_submit(self):
+        with mock.patch('subprocess.Popen') as popen:
+            jobs.submit(self.db, self.notebook.id)
+
+        self.assertEqual(self.db.get_pdf_jobs()[0].status, 'queued')
+        self.assertEqual(
+            popen.call_args[0][0],
+            [sys.executable, '-m', 'smth', 'jobs', '--run'])
+
+    def test_is_pdf_up_to_date(self):
+        self.assertFalse(jobs.is_pdf_up_to_date(self.notebook))
+
+        jobs.make_pdf(self.notebook)
+
+        self.assertTrue(jobs.is_pdf_up_to_date(self.notebook))
+        self.assertFalse(jobs.is_pdf_up_to_date(self.notebook, 'screen'))
+
+        self.notebook.pages[2] = self.notebook.pages[1]
+
+        self.assertFalse(jobs.is_pdf_up_to_date(self.notebook))
+
+    def test_is_pdf_up_to_date_file_changed(self):
+        jobs.make_pdf(self.notebook)
+
+        with open(str(self.notebook.path), 'ab') as file:
+            file.write(b'\n')
+
+        self.assertFalse(jobs.is_pdf_up_to_date(self.notebook))
+
+    def test_is_pdf_up_to_date_missing_pages(self):
+        self.notebook.total_pages = 3
+
+        jobs.make_pdf(self.notebook)
+
+        self.assertFalse(jobs.is_pdf_up_to_date(self.notebook))
+
+    def test_make_pdfs(self):
+        other = models.Notebook(
+            'other', self.notebook.type, self.directory / 'other.pdf')
+        other.total_pages = 3
+        other.pages = {1: self.notebook.pages[1]}
+        self.db.save_notebook(other)
+
+        results = list(jobs.make_pdfs([self.notebook, other], workers=1))
+
+        self.assertEqual(
+            sorted((result.notebook.title, result.path, len(result.failed),
+                    result.error) for result in results),
+            [('notebook', self.notebook.path, 0, None),
+             ('other', other.path, 2, None)])
+        self.assertTrue(jobs.is_pdf_up_to_date(self.notebook))
+
+    def test_make_pdfs_error(self):
+        self.notebook.path = self.directory / 'layouts'
+        self.notebook.path.mkdir()
+
+        result, = jobs.make_pdfs([self.notebook], workers=1)
+
+        self.assertIsNone(result.path)
+        self.assertTrue(result.error)
+
+    def test_make_pdfs_error_does_not_stop_others(self):
+        errors = {
+            'value': ValueError('value'),
+            'image': pillow.UnidentifiedImageError('image'),
+            'db': db.Error('db'),
+        }
+        notebooks = []
+
+        for title in (*errors, 'good'):
+            notebook = models.Notebook(
+                title, self.notebook.type, self.directory / f'{title}.pdf')
+            notebook.total_pages = 1
+            notebook.pages = {1: self.notebook.pages[1]}
+            self.db.save_notebook(notebook)
+            notebooks.append(notebook)
+
+        make_pdf = jobs.make_pdf
+
+        def make_pdf_or_raise(notebook, *args, **kwargs):
+            if notebook.title in errors:
+                raise errors[notebook.title]
+            return make_pdf(notebook, *args, **kwargs)
+
+        with mock.patch('smth.jobs.make_pdf', make_pdf_or_raise):
+            results = list(jobs.make_pdfs(notebooks, workers=1))
+
+        self.assertEqual(
+            sorted((result.notebook.title, result.path, result.error)
+                   for result in results),
+            [('db', None, 'db'), ('good', notebooks[-1].path, None),
+             ('image', None, 'image'), ('value', None, 'value')])
+
+    def test_lock_notebook(self):
+        with jobs.lock_notebook(self.notebook.id):
+            path = const.LOCKS_ROOT_PATH / f'{self.notebook.id}.lock'
+
+            with open(str(path), 'w') as lock_file:
+                self.assertRaises(
+                    BlockingIOError, fcntl.flock, lock_file,
+                    fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+class JobsCommandTestCase(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+
+        self.db = mock.MagicMock()
+        self.view = mock.MagicMock()
+
+    def test_execute(self):
+        self.db.get_pdf_jobs.return_value = ['job']
+
+        commands.JobsCommand(self.db, self.view).execute(
+            argparse.Namespace(run=False))
+
+        self.view.show_pdf_jobs.assert_called_once_with(['job'])
+
+    def test_execute_run(self):
+        with mock.patch('smth.jobs.run_worker') as run_worker:
+            commands.JobsCommand(self.db, self.view).execute(
+                argparse.Namespace(run=True))
+
+        run_worker.assert_called_once_with(self.db)
+
+    def test_execute_db_error(self):
+        self.db.get_pdf_jobs.side_effect = db.Error
+
+        command = commands.JobsCommand(self.db, self.view)
+
+        self.assertRaises(
+            SystemExit, command.execute, argparse.Namespace(run=False))
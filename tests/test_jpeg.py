@@ -0,0 +1,98 @@
+import logging
+import pathlib
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest import mock
+
+import PIL.Image as pillow
+
+from smth import jpeg, models
+
+
+class JPEGTestCase(unittest.TestCase):
+    """Test lossless transformation of JPEG files."""
+
+    def setUp(self):
+        logging.disable()
+
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+        self.path = self.directory / '1.jpg'
+
+    def tearDown(self):
+        shutil.rmtree(str(self.directory))
+
+    def test_get_imcu_size_gray(self):
+        pillow.new('L', (100, 100)).save(str(self.path))
+        self.assertEqual(jpeg.get_imcu_size(self.path), (8, 8))
+
+    def test_get_imcu_size_subsampled(self):
+        pillow.new('RGB', (100, 100)).save(str(self.path), subsampling=2)
+        self.assertEqual(jpeg.get_imcu_size(self.path), (16, 16))
+
+        pillow.new('RGB', (100, 100)).save(str(self.path), subsampling=1)
+        self.assertEqual(jpeg.get_imcu_size(self.path), (16, 8))
+
+    def test_get_imcu_size_not_jpeg(self):
+        pillow.new('L', (100, 100)).save(str(self.path), format='PNG')
+        self.assertIsNone(jpeg.get_imcu_size(self.path))
+
+    def test_can_transform(self):
+        pillow.new('RGB', (100, 100)).save(str(self.path), subsampling=1)
+
+        self.assertTrue(jpeg.can_transform(self.path, 0, (16, 8, 50, 50)))
+        self.assertFalse(jpeg.can_transform(self.path, 0, (8, 8, 50, 50)))
+        self.assertTrue(jpeg.can_transform(self.path, 90, (8, 16, 50, 50)))
+        self.assertFalse(jpeg.can_transform(self.path, 90, (16, 8, 50, 50)))
+        self.assertFalse(jpeg.can_transform(self.path, 45, (0, 0, 50, 50)))
+
+    @mock.patch('shutil.which', return_value=None)
+    def test_transform_no_jpegtran(self, which):  # pylint: disable=unused-argument  # noqa: E501
+        pillow.new('L', (100, 100)).save(str(self.path))
+        self.assertFalse(
+            jpeg.transform(self.path, self.path, 0, (0, 0, 50, 50)))
+
+    @mock.patch('subprocess.run')
+    @mock.patch('shutil.which', return_value='/usr/bin/jpegtran')
+    def test_transform(self, which, run):  # pylint: disable=unused-argument  # noqa: E501
+        pillow.new('L', (100, 100)).save(str(self.path))
+        destination = self.directory / 'cropped.jpg'
+
+        def run_jpegtran(args, **kwargs):  # pylint: disable=unused-argument  # noqa: E501
+            pathlib.Path(args[args.index('-outfile') + 1]).write_bytes(b'')
+
+        run.side_effect = run_jpegtran
+
+        self.assertTrue(
+            jpeg.transform(self.path, destination, -90, (8, 16, 58, 46)))
+
+        args = run.call_args[0][0]
+        self.assertEqual(args[:4], ['jpegtran', '-copy', 'all', '-perfect'])
+        self.assertEqual(args[4:8], ['-rotate', '90', '-crop', '50x30+8+16'])
+        self.assertEqual(args[-1], str(self.path))
+        self.assertTrue(destination.exists())
+
+    @mock.patch('subprocess.run')
+    @mock.patch('shutil.which', return_value='/usr/bin/jpegtran')
+    def test_transform_failed(self, which, run):  # pylint: disable=unused-argument  # noqa: E501
+        pillow.new('L', (100, 100)).save(str(self.path))
+        run.side_effect = subprocess.CalledProcessError(1, 'jpegtran')
+
+        self.assertFalse(
+            jpeg.transform(self.path, self.path, 0, (0, 0, 50, 50)))
+        self.assertListEqual(list(self.directory.iterdir()), [self.path])
+
+    @mock.patch('shutil.which', return_value=None)
+    def test_crop_image_file_fallback(self, which):  # pylint: disable=unused-argument  # noqa: E501
+        notebook = models.Notebook(
+            'Notebook', models.NotebookType('A5', 148, 210), self.directory)
+        image = pillow.new('L', (int(215.9 / 25.4 * 50),
+                                 int(297.1 / 25.4 * 50)))
+        image.save(str(self.path))
+
+        notebook.crop_image_file(1, self.path, self.path, 50)
+
+        with pillow.open(str(self.path)) as cropped:
+            expected = notebook.crop_image(1, image, 50)
+            self.assertEqual(cropped.size, expected.size)
@@ -1,8 +1,9 @@
 import pathlib
+import tempfile
 import unittest
 from unittest import mock
 
-from smth import models
+from smth import const, models
 
 
 class TestNotebook(unittest.TestCase):
@@ -63,6 +64,60 @@ class TestNotebook(unittest.TestCase):
         actual = self.notebook.get_page_path(1)
         self.assertEqual(actual, expected)
 
+    def test_get_page_path_in_other_format(self):
+        type_ = models.NotebookType('Type', 100, 200)
+        type_.codec = 'tiff-g4'
+        notebook = models.Notebook('title', type_, 'path')
+
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch('smth.const.PAGES_ROOT_PATH',
+                            pathlib.Path(directory)):
+                pages_dir = pathlib.Path(directory) / 'title'
+
+                self.assertEqual(
+                    notebook.get_page_path(1), pages_dir / '1.tif')
+
+                pages_dir.mkdir()
+                (pages_dir / '1.png').touch()
+
+                self.assertEqual(
+                    notebook.get_page_path(1), pages_dir / '1.png')
+
+    def test_get_page_path_from_manifest(self):
+        self.notebook.pages = {1: 'abcdef.png'}
+
+        self.assertEqual(
+            self.notebook.get_page_path(1),
+            const.BLOBS_ROOT_PATH / 'ab' / 'abcdef.png')
+
+    def test_copy_pages_to_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.multiple(
+                    'smth.const',
+                    PAGES_ROOT_PATH=pathlib.Path(directory) / 'pages',
+                    BLOBS_ROOT_PATH=pathlib.Path(directory) / 'blobs'):
+                pages_dir = self.notebook.get_pages_dir()
+                pages_dir.mkdir(parents=True)
+
+                for name in ('1.jpg', '2.png', '3.jpg'):
+                    (pages_dir / name).write_bytes(name.encode())
+
+                self.notebook.pages = {3: 'rescanned.jpg'}
+                paths = self.notebook.copy_pages_to_store()
+
+                self.assertEqual(
+                    [path.name for path in paths], ['1.jpg', '2.png', '3.jpg'])
+                self.assertTrue(all(path.exists() for path in paths))
+                self.assertEqual(self.notebook.pages[3], 'rescanned.jpg')
+                self.assertEqual(
+                    self.notebook.get_page_path(1).read_bytes(), b'1.jpg')
+                self.assertEqual(
+                    self.notebook.get_page_path(2).read_bytes(), b'2.png')
+
+                self.notebook.remove_page_files(paths)
+
+                self.assertFalse(pages_dir.exists())
+
     def test__repr__(self):
         type_ = mock.MagicMock()
         type_.title = 'Test Type'
@@ -110,6 +165,51 @@ class TestNotebookType(unittest.TestCase):
         self.type_.pages_paired = 'not a bool value'
         self.assertEqual(self.type_.pages_paired, False)
 
+    def test_codec(self):
+        self.assertEqual(self.type_.codec, 'jpeg')
+
+        self.type_.codec = 'tiff-g4'
+        self.assertEqual(self.type_.codec, 'tiff-g4')
+
+        self.type_.codec = 'unknown'
+        self.assertEqual(self.type_.codec, 'jpeg')
+
+    def test_binarization(self):
+        self.assertEqual(self.type_.binarization, 'none')
+
+        self.type_.binarization = 'sauvola'
+        self.assertEqual(self.type_.binarization, 'sauvola')
+
+        self.type_.binarization = 'unknown'
+        self.assertEqual(self.type_.binarization, 'none')
+
+    def test_deskew(self):
+        self.assertFalse(self.type_.deskew)
+
+        self.type_.deskew = True
+        self.assertTrue(self.type_.deskew)
+
+    def test_blank_pages(self):
+        self.assertEqual(self.type_.blank_pages, 'keep')
+
+        self.type_.blank_pages = 'drop'
+        self.assertEqual(self.type_.blank_pages, 'drop')
+
+        self.type_.blank_pages = 'unknown'
+        self.assertEqual(self.type_.blank_pages, 'keep')
+
+    def test_pdf_resolution(self):
+        self.assertEqual(self.type_.pdf_resolution, 150)
+
+        self.type_.pdf_resolution = 300
+        self.assertEqual(self.type_.pdf_resolution, 300)
+
+        self.type_.pdf_resolution = -1
+        self.assertEqual(self.type_.pdf_resolution, 0)
+
+        self.type_.pdf_resolution = None
+        self.assertEqual(self.type_.pdf_resolution, 0)
+
     def test__repr__(self):
         expected = "<NotebookType 'Test' of size 100x200mm>"
         self.assertEqual(self.type_.__repr__(), expected)
@@ -0,0 +1,62 @@
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+import PIL.Image as pillow
+
+from smth import page_codecs
+
+
+class PageCodecsTestCase(unittest.TestCase):
+    """Test storing pages in different formats."""
+
+    def setUp(self):
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+
+        self.image = pillow.new('L', (200, 300), 250)
+        self.image.paste(20, (50, 50, 150, 60))
+
+    def tearDown(self):
+        shutil.rmtree(str(self.directory))
+
+    def test_save(self):
+        formats = {
+            'jpeg': 'JPEG',
+            'jpeg-optimized': 'JPEG',
+            'jpeg-progressive': 'JPEG',
+            'png': 'PNG',
+            'webp': 'WEBP',
+            'tiff-g4': 'TIFF',
+        }
+
+        for name, format_ in formats.items():
+            codec = page_codecs.get(name)
+            path = self.directory / f'{name}{codec.extension}'
+
+            codec.save(self.image, path)
+
+            with pillow.open(str(path)) as image:
+                self.assertEqual(image.format, format_)
+                self.assertEqual(image.size, self.image.size)
+
+    def test_tiff_g4_is_bilevel(self):
+        path = self.directory / '1.tif'
+        page_codecs.get('tiff-g4').save(self.image.convert('RGB'), path)
+
+        with pillow.open(str(path)) as image:
+            self.assertEqual(image.mode, '1')
+            self.assertEqual(image.info['compression'], 'group4')
+            self.assertEqual(image.getpixel((100, 55)), 0)
+            self.assertEqual(image.getpixel((10, 10)), 255)
+
+    def test_get_unknown_codec(self):
+        self.assertIs(page_codecs.get('unknown'), page_codecs.get('jpeg'))
+
+    def test_is_pdf_compatible(self):
+        self.assertTrue(page_codecs.is_pdf_compatible(pathlib.Path('1.jpg')))
+        self.assertTrue(page_codecs.is_pdf_compatible(pathlib.Path('1.png')))
+        self.assertFalse(
+            page_codecs.is_pdf_compatible(pathlib.Path('1.tif')))
+        self.assertFalse(
+            page_codecs.is_pdf_compatible(pathlib.Path('1.webp')))
@@ -0,0 +1,100 @@
+import hashlib
+import pathlib
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import PIL.Image as pillow
+
+from smth import page_codecs, page_store
+
+
+class PageStoreTestCase(unittest.TestCase):
+    """Test the content-addressed store of pages."""
+
+    def setUp(self):
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+
+        blobs_root_patcher = mock.patch(
+            'smth.const.BLOBS_ROOT_PATH', self.directory / 'blobs')
+        blobs_root_patcher.start()
+        self.addCleanup(blobs_root_patcher.stop)
+
+    def tearDown(self):
+        shutil.rmtree(str(self.directory))
+
+    def test_get_path(self):
+        self.assertEqual(
+            page_store.get_path('abcdef.jpg'),
+            self.directory / 'blobs' / 'ab' / 'abcdef.jpg')
+
+    def test_put(self):
+        path = self.directory / '1.JPG'
+        path.write_bytes(b'page')
+
+        blob = page_store.put(path)
+
+        self.assertEqual(blob, f"{hashlib.sha256(b'page').hexdigest()}.jpg")
+        self.assertFalse(path.exists())
+        self.assertEqual(page_store.get_path(blob).read_bytes(), b'page')
+
+    def test_put_keep(self):
+        path = self.directory / '1.jpg'
+        path.write_bytes(b'page')
+
+        blob = page_store.put(path, keep=True)
+
+        self.assertEqual(path.read_bytes(), b'page')
+        self.assertEqual(page_store.get_path(blob).read_bytes(), b'page')
+        self.assertEqual(page_store.put(path, keep=True), blob)
+        self.assertTrue(path.exists())
+
+    def test_put_identical_files(self):
+        paths = [self.directory / '1.jpg', self.directory / '2.jpg']
+
+        for path in paths:
+            path.write_bytes(b'page')
+
+        blobs = [page_store.put(path) for path in paths]
+
+        self.assertEqual(blobs[0], blobs[1])
+        self.assertFalse(paths[1].exists())
+
+    def test_save(self):
+        image = pillow.new('L', (200, 300), 250)
+        blob = page_store.save(image, page_codecs.get('png'))
+
+        self.assertTrue(blob.endswith('.png'))
+
+        with pillow.open(str(page_store.get_path(blob))) as saved_image:
+            self.assertEqual(saved_image.format, 'PNG')
+            self.assertEqual(saved_image.size, (200, 300))
+
+        # only the blob is left, no temporary files
+        self.assertEqual(
+            list((self.directory / 'blobs').glob('*.png')), [])
+
+    def test_save_blank(self):
+        blob = page_store.save_blank()
+
+        self.assertEqual(blob, page_store.save_blank())
+        self.assertTrue(page_codecs.is_blank_page(page_store.get_path(blob)))
+        self.assertEqual(page_store.get_path(blob).stat().st_size, 0)
+
+    def test_save_error(self):
+        codec = mock.MagicMock(extension='.jpg')
+        codec.save.side_effect = OSError
+
+        with self.assertRaises(OSError):
+            page_store.save(pillow.new('L', (10, 10)), codec)
+
+        self.assertEqual(
+            list((self.directory / 'blobs').glob('*.jpg')), [])
+
+    def test_remove(self):
+        blob = page_store.save_blank()
+
+        page_store.remove([blob, 'missing.jpg'])
+
+        self.assertFalse(page_store.get_path(blob).exists())
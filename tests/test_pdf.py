@@ -0,0 +1,303 @@
+import errno
+import logging
+import pathlib
+import re
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import PIL.Image as pillow
+
+from smth import page_codecs, pdf
+
+
+def read_pdf(path):
+    """Return offsets of objects and the page tree of the last revision."""
+    data = path.read_bytes()
+    xref = int(re.findall(rb'startxref\n(\d+)', data)[-1])
+    offsets = {}
+
+    while xref is not None:
+        lines = iter(data[xref:].split(b'\n'))
+        assert next(lines) == b'xref'
+
+        for line in lines:
+            if line == b'trailer':
+                break
+
+            start, count = map(int, line.split())
+
+            for number in range(start, start + count):
+                entry = next(lines)
+
+                if entry.endswith(b' n '):
+                    offsets.setdefault(number, int(entry[:10]))
+
+        trailer = next(lines)
+        prev = re.search(rb'/Prev (\d+)', trailer)
+        xref = int(prev.group(1)) if prev else None
+
+    for number, offset in offsets.items():
+        assert data[offset:].startswith(f'{number} 0 obj\n'.encode())
+
+    pages = data[offsets[pdf.PAGES_OBJECT]:]
+    kids = re.search(rb'/Kids \[([^\]]*)\]', pages).group(1)
+
+    return offsets, [int(kid) for kid in kids.split()[::3]]
+
+
+class PrepareImageTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(str(self.directory))
+
+    def test_jpeg(self):
+        path = self.directory / 'page.jpg'
+        pillow.new('L', (900, 1100), 255).save(str(path))
+
+        image = pdf.prepare_image(path, (944, 1181))
+
+        self.assertEqual(image.filter, 'DCTDecode')
+        # the file is copied when PDF is written
+        self.assertEqual(image.data, path)
+        self.assertEqual((image.width, image.height), (900, 1100))
+
+    def test_jpeg_reduced(self):
+        path = self.directory / 'page.jpg'
+        pillow.new('RGB', (1890, 2362), 'white').save(str(path))
+
+        image = pdf.prepare_image(path, (944, 1181))
+
+        self.assertEqual(image.filter, 'DCTDecode')
+        self.assertEqual((image.width, image.height), (944, 1180))
+        self.assertEqual(image.mode, 'RGB')
+
+    def test_bilevel_reduced(self):
+        path = self.directory / 'page.tif'
+        page_codecs.get('tiff-g4').save(
+            pillow.new('L', (1890, 2362), 255), path)
+
+        image = pdf.prepare_image(path, (944, 1181))
+
+        self.assertEqual(image.filter, 'FlateDecode')
+        self.assertEqual(image.mode, '1')
+        self.assertEqual((image.width, image.height), (944, 1180))
+
+    def test_jpeg_converted_to_grayscale(self):
+        path = self.directory / 'page.jpg'
+        pillow.new('RGB', (900, 1100), 'white').save(str(path))
+
+        image = pdf.prepare_image(path, (944, 1181), 'L', 60)
+
+        self.assertEqual(image.filter, 'DCTDecode')
+        self.assertEqual(image.mode, 'L')
+        self.assertIsInstance(image.data, bytes)
+
+    def test_encoded_with_quality(self):
+        path = self.directory / 'page.png'
+        pillow.effect_noise((900, 1100), 64).save(str(path))
+
+        low = pdf.prepare_image(path, quality=30)
+        high = pdf.prepare_image(path, quality=90)
+
+        self.assertEqual(low.filter, 'DCTDecode')
+        self.assertLess(len(low.data), len(high.data))
+
+    def test_bilevel_not_converted(self):
+        path = self.directory / 'page.tif'
+        page_codecs.get('tiff-g4').save(
+            pillow.new('L', (900, 1100), 255), path)
+
+        image = pdf.prepare_image(path, (944, 1181), 'L', 60)
+
+        self.assertEqual(image.filter, 'FlateDecode')
+        self.assertEqual(image.mode, '1')
+
+    def test_not_reduced(self):
+        path = self.directory / 'page.png'
+        pillow.new('RGBA', (1890, 2362)).save(str(path))
+
+        image = pdf.prepare_image(path)
+
+        self.assertEqual(image.mode, 'RGB')
+        self.assertEqual((image.width, image.height), (1890, 2362))
+
+
+class UpdateTestCase(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+        self.path = self.directory / 'notebook.pdf'
+        self.layout_path = self.directory / 'layout.json'
+
+        self.slots = []
+
+        for page in range(5):
+            path = self.directory / f'{page}.jpg'
+            pillow.new('L', (100, 200), page * 50).save(str(path))
+            self.slots.append(pdf.Slot(path.name, path))
+
+    def tearDown(self):
+        shutil.rmtree(str(self.directory))
+
+    def _update(self, sheets):
+        return pdf.update(self.path, self.layout_path, (100, 200), sheets)
+
+    def test_write(self):
+        sheets = [[slot] for slot in self.slots[:3]] + [[None]]
+
+        self.assertEqual(self._update(sheets), [])
+
+        _, kids = read_pdf(self.path)
+        self.assertEqual(len(kids), 4)
+        self.assertEqual(self.path.read_bytes().count(b'/Subtype /Image'), 3)
+
+    def test_write_copies_jpeg_files(self):
+        self._update([[slot] for slot in self.slots[:2]])
+
+        data = self.path.read_bytes()
+
+        for slot in self.slots[:2]:
+            jpeg = slot.path.read_bytes()
+            self.assertIn(
+                f'/Length {len(jpeg)}>>\nstream\n'.encode() + jpeg +
+                b'\nendstream', data)
+
+        read_pdf(self.path)
+
+    def test_write_without_sendfile(self):
+        with mock.patch('os.sendfile', side_effect=OSError(errno.EINVAL, '')):
+            self._update([[slot] for slot in self.slots[:2]])
+
+        jpeg = self.slots[1].path.read_bytes()
+        self.assertIn(jpeg + b'\nendstream', self.path.read_bytes())
+        read_pdf(self.path)
+
+    def test_write_without_pages(self):
+        self._update([])
+
+        _, kids = read_pdf(self.path)
+        self.assertEqual(len(kids), 1)
+
+    def test_append(self):
+        self._update([[slot] for slot in self.slots[:3]])
+        data = self.path.read_bytes()
+        _, old_kids = read_pdf(self.path)
+
+        self._update([[slot] for slot in self.slots[:4]])
+
+        new_data = self.path.read_bytes()
+        _, kids = read_pdf(self.path)
+
+        self.assertTrue(new_data.startswith(data))
+        self.assertEqual(new_data[len(data):].count(b'/Subtype /Image'), 1)
+        self.assertEqual(kids[:3], old_kids)
+        self.assertEqual(len(kids), 4)
+
+    def test_not_changed(self):
+        sheets = [[slot] for slot in self.slots[:3]]
+        self._update(sheets)
+        data = self.path.read_bytes()
+
+        self._update(sheets)
+
+        self.assertEqual(self.path.read_bytes(), data)
+
+    def test_replace(self):
+        sheets = [[slot] for slot in self.slots]
+        self._update(sheets)
+        data = self.path.read_bytes()
+
+        sheets[1] = [self.slots[0]]
+        self._update(sheets)
+
+        new_data = self.path.read_bytes()
+        self.assertTrue(new_data.startswith(data))
+        # the image of the first page is reused
+        self.assertNotIn(b'/Subtype /Image', new_data[len(data):])
+        self.assertEqual(len(read_pdf(self.path)[1]), 5)
+
+    def test_rewritten_when_mostly_garbage(self):
+        self._update([[slot] for slot in self.slots])
+        data = self.path.read_bytes()
+
+        self._update([[self.slots[0]]])
+        self._update([[self.slots[0]]] * 2)
+
+        self.assertFalse(self.path.read_bytes().startswith(data))
+        self.assertEqual(
+            self.path.read_bytes().count(b'/Subtype /Image'), 1)
+
+    def test_rewritten_when_changed(self):
+        self._update([[slot] for slot in self.slots[:3]])
+
+        with open(str(self.path), 'ab') as file:
+            file.write(b'\n')
+
+        self._update([[slot] for slot in self.slots[:4]])
+
+        self.assertEqual(
+            self.path.read_bytes().count(b'/Subtype /Image'), 4)
+        self.assertEqual(len(read_pdf(self.path)[1]), 4)
+
+    def test_rewritten_when_settings_changed(self):
+        sheets = [[slot] for slot in self.slots[:3]]
+        self._update(sheets)
+
+        pdf.update(self.path, self.layout_path, (200, 200), sheets)
+
+        self.assertEqual(
+            self.path.read_bytes().count(b'/Subtype /Image'), 3)
+
+    def test_rewritten_when_profile_changed(self):
+        sheets = [[slot] for slot in self.slots[:2]]
+        self._update(sheets)
+
+        pdf.update(self.path, self.layout_path, (100, 200), sheets,
+                   mode='L', quality=60)
+
+        self.assertEqual(len(read_pdf(self.path)[0]), 8)
+        self.assertNotIn(b'/Prev', self.path.read_bytes())
+
+    def test_paired_pages(self):
+        self._update([self.slots[:2], [self.slots[2], None]])
+
+        data = self.path.read_bytes()
+        self.assertIn(b'q 50.00 0 0 200.00 50.00 0 cm', data)
+        self.assertEqual(len(read_pdf(self.path)[1]), 2)
+
+    def test_missing_page_retried(self):
+        missing = pdf.Slot('missing', self.directory / 'missing.jpg')
+
+        self.assertEqual(self._update([[missing]]), [missing])
+
+        pillow.new('L', (100, 200)).save(str(missing.path))
+
+        self.assertEqual(self._update([[missing]]), [])
+        self.assertEqual(
+            self.path.read_bytes().count(b'/Subtype /Image'), 1)
+
+    def test_same_file_with_any_number_of_workers(self):
+        sheets = [[slot] for slot in self.slots] + [[self.slots[0]]]
+
+        pdf.update(self.path, self.layout_path, (100, 200), sheets, workers=1)
+        data = self.path.read_bytes()
+        self.path.unlink()
+
+        pdf.update(self.path, self.layout_path, (100, 200), sheets, workers=4)
+
+        self.assertEqual(self.path.read_bytes(), data)
+        self.assertEqual(data.count(b'/Subtype /Image'), 5)
+
+    def test_missing_page_shown_twice(self):
+        missing = pdf.Slot('missing', self.directory / 'missing.jpg')
+        sheets = [[missing], [self.slots[0]], [missing], [self.slots[1]]]
+
+        self.assertEqual(self._update(sheets), [missing, missing])
+        self.assertEqual(
+            self.path.read_bytes().count(b'/Subtype /Image'), 2)
+        self.assertEqual(len(read_pdf(self.path)[1]), 4)
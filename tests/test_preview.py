@@ -0,0 +1,94 @@
+import logging
+import pathlib
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import PIL.Image as pillow
+
+from smth import commands, const, db, models, page_codecs, page_store
+
+
+class PreviewCommandTestCase(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+
+        paths_patcher = mock.patch.multiple(
+            'smth.const',
+            PAGES_ROOT_PATH=self.directory / 'pages',
+            BLOBS_ROOT_PATH=self.directory / 'blobs',
+            PREVIEWS_ROOT_PATH=self.directory / 'previews')
+        paths_patcher.start()
+        self.addCleanup(paths_patcher.stop)
+
+        popen_patcher = mock.patch('subprocess.Popen')
+        self.popen = popen_patcher.start()
+        self.addCleanup(popen_patcher.stop)
+
+        type_ = models.NotebookType('A5', 148, 210)
+        self.notebook = models.Notebook(
+            'notebook', type_, self.directory / 'notebook.pdf')
+        self.notebook.total_pages = 10
+
+        image = pillow.new('L', (874, 1240), 250)
+        codec = page_codecs.get('jpeg')
+
+        for page in range(1, 10):
+            self.notebook.pages[page] = page_store.save(image, codec)
+
+        self.notebook.pages[5] = page_store.save_blank()
+
+        self.db = mock.MagicMock(**{
+            'get_notebook_titles.return_value': [self.notebook.title],
+            'get_notebook_by_title.return_value': self.notebook,
+        })
+        self.view = mock.MagicMock(**{
+            'ask_for_notebook.return_value': self.notebook.title,
+        })
+
+    def tearDown(self):
+        shutil.rmtree(str(self.directory))
+
+    def test_execute_contact_sheet(self):
+        args = mock.MagicMock(pdf=False)
+        commands.PreviewCommand(self.db, self.view).execute(args)
+
+        path = const.PREVIEWS_ROOT_PATH / 'notebook.jpg'
+        self.popen.assert_called_once_with(['xdg-open', str(path)])
+
+        with pillow.open(str(path)) as sheet:
+            # 10 pages in 2 rows of 8 thumbnails
+            self.assertEqual(sheet.size, (8 * 210 + 10, 2 * 226 + 10))
+
+    def test_execute_pdf(self):
+        args = mock.MagicMock(pdf=True)
+
+        with mock.patch('fpdf.FPDF') as pdf_class:
+            pdf = pdf_class.return_value
+            commands.PreviewCommand(self.db, self.view).execute(args)
+
+        self.assertEqual(pdf.add_page.call_count, 10)
+        # blank and missing pages are left empty
+        self.assertEqual(pdf.image.call_count, 8)
+        pdf.output.assert_called_once_with(
+            str(const.PREVIEWS_ROOT_PATH / 'notebook.pdf'))
+
+    def test_execute_no_notebook_chosen(self):
+        self.view.ask_for_notebook.return_value = None
+
+        commands.PreviewCommand(self.db, self.view).execute(
+            mock.MagicMock(pdf=False))
+
+        self.popen.assert_not_called()
+
+    def test_execute_db_error(self):
+        self.db.get_notebook_by_title.side_effect = db.Error('Failed')
+
+        with self.assertRaises(SystemExit):
+            commands.PreviewCommand(self.db, self.view).execute(
+                mock.MagicMock(pdf=False))
+
+        self.popen.assert_not_called()
@@ -0,0 +1,92 @@
+import pathlib
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import PIL.Image as pillow
+
+from smth import page_codecs, page_store, previews
+
+
+class PreviewsTestCase(unittest.TestCase):
+    """Test the cache of reduced copies of pages."""
+
+    def setUp(self):
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+
+        paths_patcher = mock.patch.multiple(
+            'smth.const',
+            BLOBS_ROOT_PATH=self.directory / 'blobs',
+            PREVIEWS_ROOT_PATH=self.directory / 'previews')
+        paths_patcher.start()
+        self.addCleanup(paths_patcher.stop)
+
+        self.image = pillow.new('RGB', (2480, 3508), (250, 250, 250))
+        self.image.paste((20, 20, 200), (200, 200, 2200, 260))
+
+    def tearDown(self):
+        shutil.rmtree(str(self.directory))
+
+    def test_save(self):
+        previews.save(self.image, 'abcdef.png')
+
+        with pillow.open(str(previews.get_path('abcdef.png', 'preview'))) \
+                as preview:
+            self.assertEqual(preview.format, 'JPEG')
+            self.assertEqual(preview.size, (707, 1000))
+
+        with pillow.open(str(previews.get_path('abcdef.png', 'thumbnail'))) \
+                as thumbnail:
+            self.assertEqual(thumbnail.size, (142, 200))
+
+    def test_save_bilevel(self):
+        image = pillow.new('1', (1000, 1000), 1)
+        image.paste(0, (0, 0, 1000, 2))
+
+        previews.save(image, 'abcdef.tif')
+
+        with pillow.open(str(previews.get_path('abcdef.tif', 'thumbnail'))) \
+                as thumbnail:
+            self.assertEqual(thumbnail.mode, 'L')
+            # a thin line is gray but not lost
+            self.assertLess(thumbnail.getpixel((100, 0)), 250)
+
+    def test_open_image(self):
+        blob = page_store.save(self.image, page_codecs.get('jpeg'))
+        path = page_store.get_path(blob)
+
+        thumbnail = previews.open_image(path, 'thumbnail', blob)
+
+        self.assertEqual(thumbnail.size, (142, 200))
+        self.assertTrue(previews.get_path(blob, 'thumbnail').exists())
+        self.assertTrue(previews.get_path(blob, 'preview').exists())
+
+        with mock.patch('PIL.Image.open', wraps=pillow.open) as open_:
+            previews.open_image(path, 'thumbnail', blob)
+            open_.assert_called_once_with(
+                str(previews.get_path(blob, 'thumbnail')))
+
+    def test_open_image_not_in_store(self):
+        path = self.directory / '1.jpg'
+        self.image.save(str(path))
+
+        preview = previews.open_image(path, 'preview')
+
+        self.assertEqual(preview.size, (707, 1000))
+        self.assertFalse((self.directory / 'previews').exists())
+
+    def test_open_image_blank(self):
+        blob = page_store.save_blank()
+
+        self.assertIsNone(previews.open_image(
+            page_store.get_path(blob), 'thumbnail', blob))
+
+    def test_removed_with_blob(self):
+        blob = page_store.save(self.image, page_codecs.get('png'))
+        previews.save(self.image, blob)
+
+        page_store.remove([blob])
+
+        for size in previews.SIZES:
+            self.assertFalse(previews.get_path(blob, size).exists())
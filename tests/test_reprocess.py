@@ -0,0 +1,228 @@
+import argparse
+import logging
+import pathlib
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import PIL.Image as pillow
+
+from smth import batch, commands, const, models, page_codecs, page_store
+
+
+class ReprocessCommandTestCase(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+
+        paths_patcher = mock.patch.multiple(
+            'smth.const',
+            PAGES_ROOT_PATH=self.directory / 'pages',
+            BLOBS_ROOT_PATH=self.directory / 'blobs',
+            PREVIEWS_ROOT_PATH=self.directory / 'previews',
+            REPROCESS_JOURNAL_PATH=self.directory / 'reprocess.jsonl')
+        paths_patcher.start()
+        self.addCleanup(paths_patcher.stop)
+
+        # pages of 150x250 mm were scanned at 25.4 dpi
+        type_ = models.NotebookType('Type', 150, 250)
+        self.notebook = models.Notebook('notebook', type_, 'path')
+        self.notebook.total_pages = 3
+
+        codec = page_codecs.get('jpeg')
+
+        for page in (1, 2):
+            image = pillow.new('L', (150, 250), 250)
+            image.putpixel((page, page), 0)
+            self.notebook.pages[page] = page_store.save(image, codec)
+
+        self.notebook.pages[3] = page_store.save_blank()
+        self.old_blobs = dict(self.notebook.pages)
+
+        # now the type is smaller and pages are stored as PNG
+        type_.page_width, type_.page_height = 100, 200
+        type_.codec = 'png'
+
+        self.db = mock.MagicMock(**{
+            'get_notebook_titles.return_value': [self.notebook.title],
+            'get_notebook_by_title.return_value': self.notebook,
+            'get_notebooks.return_value': [self.notebook],
+        })
+        self.db.get_blobs.side_effect = lambda: set(
+            self.notebook.pages.values())
+
+        self.view = mock.MagicMock(**{
+            'ask_for_notebook.return_value': self.notebook.title,
+        })
+
+        self.args = argparse.Namespace(all=False, resolution=25.4, workers=1)
+
+    def tearDown(self):
+        shutil.rmtree(str(self.directory))
+
+    def test_execute(self):
+        commands.ReprocessCommand(self.db, self.view).execute(self.args)
+
+        self.db.save_notebook.assert_called_once_with(self.notebook)
+
+        for page in (1, 2):
+            blob = self.notebook.pages[page]
+            self.assertTrue(blob.endswith('.png'))
+            self.assertFalse(
+                page_store.get_path(self.old_blobs[page]).exists())
+
+            with pillow.open(str(page_store.get_path(blob))) as image:
+                self.assertEqual(image.size, (100, 200))
+
+        self.assertEqual(self.notebook.pages[3], self.old_blobs[3])
+
+    def test_execute_all(self):
+        self.args.all = True
+        commands.ReprocessCommand(self.db, self.view).execute(self.args)
+
+        self.view.ask_for_notebook.assert_not_called()
+        self.assertTrue(self.notebook.pages[1].endswith('.png'))
+
+    def test_execute_skips_up_to_date_pages(self):
+        commands.ReprocessCommand(self.db, self.view).execute(self.args)
+        blobs = dict(self.notebook.pages)
+
+        with mock.patch('smth.batch.process_page') as process_page:
+            commands.ReprocessCommand(self.db, self.view).execute(self.args)
+
+        process_page.assert_not_called()
+        self.assertEqual(self.notebook.pages, blobs)
+
+    def test_execute_skips_scanned_pages(self):
+        # pages were scanned with the current settings
+        for page in (1, 2):
+            task = batch.Task(self.notebook, page, None, 25.4)
+            batch.Journal.append(
+                const.REPROCESS_JOURNAL_PATH, self.old_blobs[page],
+                batch.get_settings(task), self.old_blobs[page],
+                batch.get_encoding(self.notebook.type))
+
+        with mock.patch('smth.batch.process_page') as process_page:
+            commands.ReprocessCommand(self.db, self.view).execute(self.args)
+
+        process_page.assert_not_called()
+        self.assertEqual(self.notebook.pages, self.old_blobs)
+
+    def test_execute_crops_only_if_page_size_changed(self):
+        encoding = batch.get_encoding(self.notebook.type)
+        batch.Journal.append(
+            const.REPROCESS_JOURNAL_PATH, 'scan.jpg', 'settings',
+            self.old_blobs[1], encoding)
+        batch.Journal.append(
+            const.REPROCESS_JOURNAL_PATH, 'scan.jpg', 'settings',
+            self.old_blobs[2], 'other encoding')
+
+        with mock.patch('smth.batch.BatchProcessor.run', return_value=[]) \
+                as run:
+            commands.ReprocessCommand(self.db, self.view).execute(self.args)
+
+        tasks = list(run.call_args[0][0])
+        self.assertEqual(
+            [(task.page, task.crop_only) for task in tasks],
+            [(1, True), (2, False)])
+
+    def test_execute_resumes(self):
+        # the command was interrupted after page 1 was processed
+        commands.ReprocessCommand(self.db, self.view).execute(self.args)
+        processed_blob = self.notebook.pages[1]
+
+        self.notebook.pages[1] = self.old_blobs[1]
+        page_store.get_path(self.old_blobs[1]).parent.mkdir(exist_ok=True)
+        shutil.copy(str(page_store.get_path(processed_blob)),
+                    str(page_store.get_path(self.old_blobs[1])))
+
+        with mock.patch('smth.batch.process_page') as process_page:
+            commands.ReprocessCommand(self.db, self.view).execute(self.args)
+
+        process_page.assert_not_called()
+        self.assertEqual(self.notebook.pages[1], processed_blob)
+
+    def test_execute_resolution_from_config(self):
+        self.args.resolution = None
+
+        with mock.patch('smth.config.Config') as config_class:
+            config_class.return_value.scanner_resolution = 25.4
+            commands.ReprocessCommand(self.db, self.view).execute(self.args)
+
+        with pillow.open(str(
+                page_store.get_path(self.notebook.pages[1]))) as image:
+            self.assertEqual(image.size, (100, 200))
+
+    def test_execute_no_notebook_chosen(self):
+        self.view.ask_for_notebook.return_value = ''
+        commands.ReprocessCommand(self.db, self.view).execute(self.args)
+
+        self.db.save_notebook.assert_not_called()
+
+    def test_execute_batch_error(self):
+        page_store.get_path(self.old_blobs[1]).unlink()
+        command = commands.ReprocessCommand(self.db, self.view)
+
+        self.assertRaises(SystemExit, command.execute, self.args)
+        self.db.save_notebook.assert_not_called()
+        self.view.show_error.assert_called()
+
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self):
+        logging.disable()
+        self.directory = pathlib.Path(tempfile.mkdtemp())
+        self.path = self.directory / 'journal.jsonl'
+
+    def tearDown(self):
+        shutil.rmtree(str(self.directory))
+
+    def test_add(self):
+        batch.Journal(self.path).add('source.jpg', 'settings', 'blob.png')
+
+        journal = batch.Journal(self.path)
+
+        self.assertEqual(journal.get('source.jpg', 'settings'), 'blob.png')
+        self.assertIsNone(journal.get('source.jpg', 'other'))
+        self.assertTrue(journal.is_up_to_date('blob.png', 'settings'))
+        self.assertFalse(journal.is_up_to_date('source.jpg', 'settings'))
+
+    def test_add_with_encoding(self):
+        batch.Journal(self.path).add(
+            'source.jpg', 'settings', 'blob.png', 'encoding')
+
+        journal = batch.Journal(self.path)
+
+        self.assertEqual(journal.get_encoding('blob.png'), 'encoding')
+        self.assertIsNone(journal.get_encoding('source.jpg'))
+
+    def test_partial_entry(self):
+        batch.Journal(self.path).add('source.jpg', 'settings', 'blob.png')
+
+        with open(str(self.path), 'a') as journal_file:
+            journal_file.write('{"source": "other.jpg", "sett')
+
+        journal = batch.Journal(self.path)
+
+        self.assertEqual(journal.get('source.jpg', 'settings'), 'blob.png')
+
+    def test_get_settings(self):
+        type_ = models.NotebookType('Type', 100, 200)
+        notebook = models.Notebook('notebook', type_, 'path')
+        task = batch.Task(notebook, 1, 'source', 300)
+        settings = batch.get_settings(task)
+
+        self.assertEqual(batch.get_settings(task._replace(page=2)), settings)
+        self.assertNotEqual(
+            batch.get_settings(task._replace(resolution=150)), settings)
+
+        type_.codec = 'png'
+        self.assertNotEqual(batch.get_settings(task), settings)
+
+        type_.codec = 'jpeg'
+        type_.pages_paired = True
+        self.assertNotEqual(
+            batch.get_settings(task), batch.get_settings(
+                task._replace(page=2)))
@@ -1,11 +1,12 @@
 import logging
+import pathlib
 import unittest
 from unittest import mock
 
 import _sane
 import sane
 
-from smth import commands, db, models
+from smth import commands, db, jobs, models
 
 
 class ScanCommandTestCase(unittest.TestCase):  # pylint: disable=too-many-instance-attributes  # noqa: E501
@@ -36,22 +37,26 @@ class ScanCommandTestCase(unittest.TestCase):  # pylint: disable=too-many-instan
         self.args = mock.MagicMock(**{
             'pdf_only': False,
             'set_device': False,
+            'profile': None,
+            'all': False,
+            'type': None,
+            'workers': None,
         })
 
         self.conf = mock.MagicMock(**{
             'scanner_device': None,
             'scanner_delay': 0,
+            'scanner_feeder': False,
+            'scanner_source': '',
+            'scanner_devices_cache_ttl': 0,
+            'scanner_preview': False,
+            'scanner_low_memory': False,
         })
 
         config_patcher = mock.patch('smth.config.Config')
         config_patcher.start().return_value = self.conf
         self.addCleanup(config_patcher.stop)
 
-        self.pdf = mock.MagicMock()
-        fpdf_patcher = mock.patch('fpdf.FPDF')
-        fpdf_patcher.start().return_value = self.pdf
-        self.addCleanup(fpdf_patcher.stop)
-
         self.image = mock.MagicMock(size=(100, 200))
         self.scanner = mock.MagicMock(**{'scan.return_value': self.image})
 
@@ -179,6 +184,41 @@ class ScanCommandTestCase(unittest.TestCase):  # pylint: disable=too-many-instan
         scanner_.scan.assert_not_called()
         callback.on_finish.assert_called_once()
 
+    def test_execute_with_pdf_only_and_all_options(self):
+        self.args.pdf_only = True
+        self.args.all = True
+        self.args.type = 'A4'
+
+        type_a4 = models.NotebookType('A4', 210, 297)
+        type_a5 = models.NotebookType('A5', 148, 210)
+        notebooks = [
+            models.Notebook('1', type_a4, pathlib.Path('/1.pdf')),
+            models.Notebook('2', type_a4, pathlib.Path('/2.pdf')),
+            models.Notebook('3', type_a5, pathlib.Path('/3.pdf')),
+        ]
+        notebooks[0].total_pages = 5
+        self.db.get_notebooks.return_value = notebooks
+
+        with mock.patch('smth.jobs.is_pdf_up_to_date',
+                        side_effect=lambda notebook, _: notebook.title == '2'):
+            with mock.patch('smth.jobs.make_pdfs') as make_pdfs:
+                make_pdfs.return_value = [jobs.Result(
+                    notebooks[0], pathlib.Path('/1.pdf'), [], None)]
+
+                commands.ScanCommand(self.db, self.view).execute(self.args)
+
+        make_pdfs.assert_called_once_with([notebooks[0]], None, None)
+        self.view.show_info.assert_any_call(
+            'Making PDF files of 1 notebooks, 1 are up to date...')
+        self.assertIn('5 pages', self.view.show_info.call_args[0][0])
+
+    def test_execute_with_all_option_only(self):
+        self.args.all = True
+
+        command = commands.ScanCommand(self.db, self.view)
+
+        self.assertRaises(SystemExit, command.execute, self.args)
+
     def test_execute_no_notebook_chosen(self):
         self.view.ask_for_notebook.return_value = ''
         with mock.patch('smth.scanner.Scanner', return_value=mock.MagicMock()):
@@ -1,11 +1,16 @@
 import collections
 import logging
 import math
+import pathlib
+import tempfile
+import threading
+import time
 import unittest
 from unittest import mock
 
+import _sane
 import sane
-from PIL import Image
+from PIL import Image, ImageDraw
 
 from smth import models, scanner
 
@@ -19,6 +24,11 @@ class ScannerTestCase(unittest.TestCase):
         self.conf = mock.MagicMock(**{
             'scanner_device': 'device',
             'scanner_delay': 0,
+            'scanner_feeder': False,
+            'scanner_source': '',
+            'scanner_devices_cache_ttl': 0,
+            'scanner_preview': False,
+            'scanner_low_memory': False,
             'scanner_mode': 'Gray',
             'scanner_resolution': 150,
         })
@@ -70,7 +80,8 @@ class ScannerTestCase(unittest.TestCase):
         scanner_ = scanner.Scanner(self.conf, self.callback)
         scanner_.scan(notebook, pages_queue)
 
-        self.callback.on_start.assert_called_once_with('device', [1, 2, 3])
+        self.callback.on_start.assert_called_once_with(
+            'device', [1, 2, 3], False)
         self.callback.on_start_scan_page.assert_has_calls([
             mock.call(1),
             mock.call(2),
@@ -101,7 +112,8 @@ class ScannerTestCase(unittest.TestCase):
         scanner_ = scanner.Scanner(self.conf, self.callback)
         scanner_.scan(notebook, pages_queue)
 
-        self.callback.on_start.assert_called_once_with('device', [1, 2, 3])
+        self.callback.on_start.assert_called_once_with(
+            'device', [1, 2, 3], False)
         self.callback.on_start_scan_page.assert_has_calls([
             mock.call(1),
             mock.call(2),
@@ -132,7 +144,8 @@ class ScannerTestCase(unittest.TestCase):
         scanner_ = scanner.Scanner(self.conf, self.callback)
         scanner_.scan(notebook, pages_queue)
 
-        self.callback.on_start.assert_called_once_with('device', [1, 2, 3])
+        self.callback.on_start.assert_called_once_with(
+            'device', [1, 2, 3], False)
 
         self.callback.on_start_scan_page.assert_has_calls([
             mock.call(1),
@@ -153,6 +166,26 @@ class ScannerTestCase(unittest.TestCase):
 
         self.assertEqual(notebook.total_pages, 4)
 
+    def test_scan_two_pages_at_once_split_once(self):
+        type_ = models.NotebookType('', 100, 200)
+        type_.pages_paired = True
+        notebook = models.Notebook('', type_, '')
+
+        pages_queue = collections.deque([1, 2])
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+
+        with mock.patch.object(
+                notebook, 'split_image',
+                wraps=notebook.split_image) as split_image:
+            with mock.patch.object(notebook, 'crop_image') as crop_image:
+                scanner_.scan(notebook, pages_queue)
+
+        split_image.assert_called_once()
+        crop_image.assert_not_called()
+        self.assertEqual(self.callback.on_finish_scan_page.call_count, 2)
+        self.assertEqual(notebook.total_pages, 2)
+
     def test_scan_nothing_to_scan(self):
         scanner_ = scanner.Scanner(self.conf, self.callback)
         notebook = models.Notebook('', models.NotebookType('', 0, 0), '')
@@ -161,3 +194,575 @@ class ScannerTestCase(unittest.TestCase):
 
         sane.scan.assert_not_called()
         self.callback.on_error.assert_called_once()
+
+    def test_scan_area(self):
+        self.device.get_options.return_value.extend([
+            (3, 'tl-x', None, None, None, 3, None, None, (0, 216, 0)),
+            (4, 'tl-y', None, None, None, 3, None, None, (0, 297, 0)),
+            (5, 'br-x', None, None, None, 3, None, None, (0, 216, 0)),
+            (6, 'br-y', None, None, None, 3, None, None, (0, 297, 0)),
+        ])
+
+        type_ = models.NotebookType('', 100, 150)
+        notebook = models.Notebook('', type_, '')
+
+        pages_queue = collections.deque([1])
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, pages_queue)
+
+        self.assertEqual(self.device.tl_x, 0)
+        self.assertEqual(self.device.tl_y, 0)
+        self.assertAlmostEqual(self.device.br_x, 102, delta=1)
+        self.assertAlmostEqual(self.device.br_y, 152, delta=1)
+
+    def test_scan_area_cannot_be_set(self):
+        self.device.get_options.return_value.extend([
+            (3, 'tl-x', None, None, None, 3, None, None, (0, 216, 0)),
+            (4, 'tl-y', None, None, None, 3, None, None, (0, 297, 0)),
+            (5, 'br-x', None, None, None, 3, None, None, (0, 216, 0)),
+            (6, 'br-y', None, None, None, 3, None, None, (0, 297, 0)),
+        ])
+        type(self.device).tl_x = mock.PropertyMock(
+            side_effect=_sane.error('Invalid argument'))
+        type(self.device).br_x = mock.PropertyMock(
+            side_effect=_sane.error('Invalid argument'))
+
+        type_ = models.NotebookType('', 100, 150)
+        notebook = models.Notebook('', type_, '')
+
+        pages_queue = collections.deque([1])
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, pages_queue)
+
+        self.device.scan.assert_called_once()
+        self.callback.on_error.assert_not_called()
+        self.callback.on_finish.assert_called_once()
+
+    def test_scan_area_not_supported(self):
+        type_ = models.NotebookType('', 100, 150)
+        notebook = models.Notebook('', type_, '')
+
+        pages_queue = collections.deque([1])
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, pages_queue)
+
+        self.assertIsInstance(self.device.tl_x, mock.MagicMock)
+        self.callback.on_error.assert_not_called()
+
+    def _load_feeder(self, sheets):
+        """Makes the device's feeder hold the number of sheets."""
+        self.device.start.side_effect = [None] * sheets + [
+            _sane.error(scanner.FEEDER_EMPTY_MESSAGE)]
+        self.device.snap.return_value = self.image
+        self.device.multi_scan.return_value = _SaneIterator(self.device)
+
+    def test_scan_from_feeder(self):
+        self.conf.scanner_feeder = True
+        self.conf.scanner_delay = 10
+        self._load_feeder(2)
+
+        type_ = models.NotebookType('', 210, 297)
+        notebook = models.Notebook('', type_, '')
+
+        pages_queue = collections.deque([1, 2, 3])
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+
+        with mock.patch('time.sleep') as sleep:
+            scanner_.scan(notebook, pages_queue)
+            sleep.assert_not_called()
+
+        self.device.scan.assert_not_called()
+        self.device.snap.assert_called_with(True)
+        self.device.cancel.assert_called_once()
+        self.callback.on_error.assert_not_called()
+        self.assertEqual(self.callback.on_finish_scan_page.call_count, 2)
+        self.callback.on_feeder_empty.assert_called_once_with([3])
+        self.callback.on_finish.assert_called_once_with(notebook)
+        self.assertEqual(notebook.total_pages, 2)
+
+    def test_scan_from_feeder_until_empty(self):
+        self.conf.scanner_feeder = True
+        self._load_feeder(3)
+
+        type_ = models.NotebookType('', 210, 297)
+        notebook = models.Notebook('', type_, '')
+        notebook.total_pages = 4
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, collections.deque([2, 5]))
+
+        self.callback.on_start.assert_called_once_with('device', [2, 5], True)
+        self.assertEqual(
+            [call[0][0] for call in
+             self.callback.on_start_scan_page.call_args_list], [2, 5, 6])
+        self.callback.on_feeder_empty.assert_not_called()
+        self.assertEqual(notebook.total_pages, 6)
+
+    def test_scan_from_feeder_replaced_pages_only(self):
+        self.conf.scanner_feeder = True
+        self._load_feeder(3)
+
+        type_ = models.NotebookType('', 210, 297)
+        notebook = models.Notebook('', type_, '')
+        notebook.total_pages = 4
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, collections.deque([2]))
+
+        self.callback.on_start.assert_called_once_with('device', [2], False)
+        self.assertEqual(
+            [call[0][0] for call in
+             self.callback.on_start_scan_page.call_args_list], [2])
+        self.assertEqual(self.device.start.call_count, 1)
+        self.device.cancel.assert_called_once()
+        self.assertEqual(notebook.total_pages, 4)
+
+    def test_scan_from_feeder_nothing_asked(self):
+        self.conf.scanner_feeder = True
+        self._load_feeder(2)
+
+        notebook = models.Notebook('', models.NotebookType('', 210, 297), '')
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, collections.deque())
+
+        self.callback.on_start.assert_called_once_with('device', [], True)
+        self.callback.on_error.assert_not_called()
+        self.assertEqual(notebook.total_pages, 2)
+
+    def test_scan_from_feeder_low_memory(self):
+        self.conf.scanner_feeder = True
+        self.conf.scanner_low_memory = True
+        self._load_feeder(1)
+        self.device.dev.snap.return_value = (
+            bytearray(1280 * 1760), 1280, 1760, 1, 1)
+
+        notebook = models.Notebook('', models.NotebookType('', 210, 297), '')
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, collections.deque([1]))
+
+        self.device.dev.snap.assert_called_once_with(True)
+        self.assertEqual(notebook.total_pages, 1)
+
+    def test_scan_from_feeder_error(self):
+        self.conf.scanner_feeder = True
+        self.device.start.side_effect = _sane.error('Document feeder jammed')
+
+        notebook = models.Notebook('', models.NotebookType('', 210, 297), '')
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, collections.deque([1]))
+
+        self.callback.on_error.assert_called_once_with(
+            'Document feeder jammed')
+        self.device.cancel.assert_called_once()
+
+    def test_scan_with_cached_devices(self):
+        self.conf.scanner_device = ''
+        self.conf.scanner_devices_cache_ttl = 60
+        self.conf.scanner_devices_refresh = True
+
+        found_devices = [('device', 'vendor', 'model', 'type')]
+        sane.get_devices.return_value = found_devices
+        self.callback.on_set_device.return_value = 'device'
+
+        notebook = models.Notebook('', models.NotebookType('', 210, 297), '')
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = pathlib.Path(cache_dir) / 'devices.json'
+            scanner.DevicesCache(path, 60).save([
+                scanner.Device('cached', 'vendor', 'model', 'type'),
+            ])
+
+            with mock.patch('smth.const.DEVICES_CACHE_PATH', path):
+                scanner_ = scanner.Scanner(self.conf, self.callback)
+                scanner_.scan(notebook, collections.deque([1]))
+
+            cached_devices = scanner.DevicesCache(path, 60).load()
+
+        self.callback.on_searching_for_devices.assert_not_called()
+        self.callback.on_set_device.assert_called_once_with([
+            scanner.Device('cached', 'vendor', 'model', 'type'),
+        ])
+        self.assertListEqual(
+            cached_devices, [scanner.Device(*found_devices[0])])
+        self.callback.on_error.assert_not_called()
+
+    def test_scan_opens_cached_device_while_refreshing(self):
+        self.conf.scanner_device = ''
+        self.conf.scanner_devices_cache_ttl = 60
+        self.conf.scanner_devices_refresh = True
+
+        opened = threading.Event()
+        refreshed = []
+        exited = []
+
+        def get_devices():
+            refreshed.append(opened.wait(5))
+            return [('cached', 'vendor', 'model', 'type')]
+
+        def open_device(name):
+            opened.set()
+            return self.device
+
+        sane.get_devices.side_effect = get_devices
+        sane.open.side_effect = open_device
+        sane.exit.side_effect = lambda: exited.append(bool(refreshed))
+        self.callback.on_set_device.return_value = 'cached'
+
+        notebook = models.Notebook('', models.NotebookType('', 210, 297), '')
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = pathlib.Path(cache_dir) / 'devices.json'
+            scanner.DevicesCache(path, 60).save([
+                scanner.Device('cached', 'vendor', 'model', 'type'),
+            ])
+
+            with mock.patch('smth.const.DEVICES_CACHE_PATH', path):
+                scanner_ = scanner.Scanner(self.conf, self.callback)
+                scanner_.scan(notebook, collections.deque([1]))
+
+        self.assertEqual(refreshed, [True])
+        self.assertEqual(exited, [True])
+        sane.init.assert_called_once()
+        self.callback.on_finish.assert_called_once()
+        self.callback.on_error.assert_not_called()
+
+    def test_scan_with_stale_cached_device(self):
+        self.conf.scanner_device = ''
+        self.conf.scanner_devices_cache_ttl = 60
+        self.conf.scanner_devices_refresh = False
+
+        sane.get_devices.return_value = [
+            ('device', 'vendor', 'model', 'type'),
+        ]
+
+        def open_device(name):
+            if name != 'device':
+                raise _sane.error('Invalid argument')
+            return self.device
+
+        sane.open.side_effect = open_device
+        self.callback.on_set_device.side_effect = ['stale', 'device']
+
+        notebook = models.Notebook('', models.NotebookType('', 210, 297), '')
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = pathlib.Path(cache_dir) / 'devices.json'
+            scanner.DevicesCache(path, 60).save([
+                scanner.Device('stale', 'vendor', 'model', 'type'),
+            ])
+
+            with mock.patch('smth.const.DEVICES_CACHE_PATH', path):
+                scanner_ = scanner.Scanner(self.conf, self.callback)
+                scanner_.scan(notebook, collections.deque([1]))
+
+        self.callback.on_searching_for_devices.assert_called_once()
+        self.assertEqual(self.callback.on_set_device.call_count, 2)
+        self.assertEqual(self.conf.scanner_device, 'device')
+        self.callback.on_finish.assert_called_once()
+        self.callback.on_error.assert_not_called()
+
+    def test_scan_with_preview(self):
+        self.conf.scanner_preview = True
+
+        self.device.get_options.return_value.extend([
+            (3, 'tl-x', None, None, None, 3, None, None, (0, 216, 0)),
+            (4, 'tl-y', None, None, None, 3, None, None, (0, 297, 0)),
+            (5, 'br-x', None, None, None, 3, None, None, (0, 216, 0)),
+            (6, 'br-y', None, None, None, 3, None, None, (0, 297, 0)),
+        ])
+
+        preview = Image.new('L', (425, 585), 30)
+        ImageDraw.Draw(preview).rectangle((100, 200, 299, 399), fill=230)
+
+        areas = []
+
+        def scan():
+            areas.append((
+                self.device.tl_x, self.device.tl_y,
+                self.device.br_x, self.device.br_y,
+                self.device.resolution))
+
+            if self.device.resolution == 75:
+                return preview
+
+            return self.image
+
+        self.device.scan.side_effect = scan
+
+        notebook = models.Notebook('', models.NotebookType('', 66, 66), '')
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, collections.deque([1, 2]))
+
+        self.assertEqual(len(areas), 4)
+        self.assertTupleEqual(areas[0], (0, 0, 216, 297, 75))
+        self.assertEqual(areas[1][4], 150)
+
+        # the page's size from the found top left corner
+        for expected, coordinate in zip((32, 66, 102, 136), areas[1]):
+            self.assertAlmostEqual(coordinate, expected, delta=1)
+
+        self.assertEqual(self.callback.on_finish_scan_page.call_count, 2)
+
+    def test_scan_with_preview_white_page_on_white_lid(self):
+        self.conf.scanner_preview = True
+
+        self.device.get_options.return_value.extend([
+            (3, 'tl-x', None, None, None, 3, None, None, (0, 216, 0)),
+            (4, 'tl-y', None, None, None, 3, None, None, (0, 297, 0)),
+            (5, 'br-x', None, None, None, 3, None, None, (0, 216, 0)),
+            (6, 'br-y', None, None, None, 3, None, None, (0, 297, 0)),
+        ])
+
+        # only the text of an A5 page at (10, 10) mm is seen
+        preview = Image.new('L', (638, 877), 255)
+        draw = ImageDraw.Draw(preview)
+
+        for row in range(150, 300, 20):
+            draw.line((120, row, 300, row), fill=0, width=2)
+
+        areas = []
+
+        def scan():
+            areas.append((
+                self.device.tl_x, self.device.tl_y,
+                self.device.br_x, self.device.br_y))
+
+            if self.device.resolution == 75:
+                return preview
+
+            return self.image
+
+        self.device.scan.side_effect = scan
+
+        notebook = models.Notebook('', models.NotebookType('', 148, 210), '')
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, collections.deque([1]))
+
+        self.assertEqual(len(areas), 2)
+        width, height = areas[1][2] - areas[1][0], areas[1][3] - areas[1][1]
+        self.assertGreaterEqual(width, 148)
+        self.assertGreaterEqual(height, 210)
+
+    def test_scan_low_memory(self):
+        self.conf.scanner_low_memory = True
+
+        data = bytearray(self.image.convert('L').tobytes())
+        self.device.dev.snap.return_value = (data, 1280, 1760, 1, 1)
+
+        type_ = models.NotebookType('', 210, 297)
+        notebook = models.Notebook('', type_, '')
+
+        pages_queue = collections.deque([1, 2])
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, pages_queue)
+
+        self.device.scan.assert_not_called()
+        self.assertEqual(self.device.start.call_count, 2)
+
+        page_width_pt = math.ceil(type_.page_width * 150 / 25.4)
+        page_height_pt = math.ceil(type_.page_height * 150 / 25.4)
+
+        image = self.image.convert('L').crop(
+            (0, 0, page_width_pt, page_height_pt))
+
+        self.callback.on_finish_scan_page.assert_has_calls([
+            mock.call(notebook, 1, image),
+            mock.call(notebook, 2, image),
+        ])
+
+        self.assertEqual(notebook.total_pages, 2)
+
+    def test_scan_low_memory_no_data(self):
+        self.conf.scanner_low_memory = True
+        self.device.dev.snap.return_value = (bytearray(), 0, 0, 1, 1)
+
+        notebook = models.Notebook('', models.NotebookType('', 210, 297), '')
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, collections.deque([1]))
+
+        self.callback.on_error.assert_called_once()
+        self.callback.on_finish_scan_page.assert_not_called()
+
+    def test_scan_page_processing_error(self):
+        self.callback.on_finish_scan_page.side_effect = OSError('disk full')
+
+        type_ = models.NotebookType('', 210, 297)
+        notebook = models.Notebook('', type_, '')
+
+        pages_queue = collections.deque()
+        pages_queue.extend([1, 2, 3])
+
+        scanner_ = scanner.Scanner(self.conf, self.callback)
+        scanner_.scan(notebook, pages_queue)
+
+        self.callback.on_error.assert_called_once()
+        self.assertIn('disk full', self.callback.on_error.call_args[0][0])
+        self.callback.on_finish.assert_not_called()
+        sane.exit.assert_called()
+
+
+class PagePipelineTestCase(unittest.TestCase):
+    """Test background processing of scanned pages."""
+
+    def setUp(self):
+        self.callback = mock.MagicMock()
+        self.notebook = mock.MagicMock(**{
+            'crop_image.side_effect': lambda page, image, resolution: image,
+            'type.deskew': False,
+            'type.binarization': 'none',
+            'type.blank_pages': 'keep',
+        })
+
+    def test_pages_processed_in_order(self):
+        def crop_image(page, image, resolution):
+            time.sleep(0.01 * (5 - page))
+            return image
+
+        self.notebook.crop_image.side_effect = crop_image
+
+        pipeline = scanner._PagePipeline(self.callback, 4, 4)
+
+        for page in range(1, 6):
+            pipeline.submit(self.notebook, page, f'image {page}', 150)
+
+        pipeline.join()
+        pipeline.close()
+
+        self.callback.on_finish_scan_page.assert_has_calls([
+            mock.call(self.notebook, page, f'image {page}')
+            for page in range(1, 6)
+        ])
+
+    def test_submit_blocks_when_too_many_pages_in_flight(self):
+        event = threading.Event()
+
+        def crop_image(page, image, resolution):
+            event.wait(1)
+            return image
+
+        self.notebook.crop_image.side_effect = crop_image
+
+        pipeline = scanner._PagePipeline(self.callback, 1, 2)
+
+        pipeline.submit(self.notebook, 1, 'image', 150)
+        pipeline.submit(self.notebook, 2, 'image', 150)
+
+        thread = threading.Thread(
+            target=pipeline.submit, args=(self.notebook, 3, 'image', 150))
+        thread.start()
+        thread.join(0.1)
+
+        self.assertTrue(thread.is_alive())
+
+        event.set()
+        thread.join()
+        pipeline.join()
+        pipeline.close()
+
+        self.assertEqual(self.callback.on_finish_scan_page.call_count, 3)
+
+    def test_error_raised_on_join(self):
+        self.callback.on_finish_scan_page.side_effect = OSError
+
+        pipeline = scanner._PagePipeline(self.callback, 2, 2)
+        pipeline.submit(self.notebook, 1, 'image', 150)
+
+        self.assertRaises(scanner.Error, pipeline.join)
+        pipeline.close()
+
+    def test_submit_cropped(self):
+        pipeline = scanner._PagePipeline(self.callback, 2, 2)
+
+        pipeline.submit(self.notebook, 1, 'image 1', 150)
+        pipeline.submit_cropped(
+            self.notebook, [(2, 'image 2'), (3, 'image 3')])
+
+        pipeline.join()
+        pipeline.close()
+
+        self.notebook.crop_image.assert_called_once()
+        self.callback.on_finish_scan_page.assert_has_calls([
+            mock.call(self.notebook, page, f'image {page}')
+            for page in range(1, 4)
+        ])
+
+    def test_pages_binarized(self):
+        self.notebook.type.binarization = 'otsu'
+        image = Image.new('L', (20, 30), 200)
+
+        pipeline = scanner._PagePipeline(self.callback, 2, 2)
+        pipeline.submit(self.notebook, 1, image, 150)
+        pipeline.join()
+        pipeline.close()
+
+        saved_image = self.callback.on_finish_scan_page.call_args[0][2]
+        self.assertEqual(saved_image.mode, '1')
+
+    def test_pages_deskewed(self):
+        self.notebook.type.deskew = True
+        image = Image.new('L', (200, 300), 255)
+        ImageDraw.Draw(image).rectangle((0, 0, 199, 9), fill=0)
+
+        pipeline = scanner._PagePipeline(self.callback, 2, 2)
+        pipeline.submit(self.notebook, 1, image, 150)
+        pipeline.join()
+        pipeline.close()
+
+        saved_image = self.callback.on_finish_scan_page.call_args[0][2]
+        self.assertEqual(saved_image.size, (200, 290))
+
+    def test_blank_pages_detected(self):
+        self.notebook.type.blank_pages = 'drop'
+        self.notebook.type.binarization = 'otsu'
+        blank = Image.new('L', (200, 300), 240)
+        page = Image.new('L', (200, 300), 240)
+        ImageDraw.Draw(page).rectangle((50, 50, 150, 100), fill=20)
+
+        pipeline = scanner._PagePipeline(self.callback, 2, 2)
+        pipeline.submit(self.notebook, 1, blank, 150)
+        pipeline.submit(self.notebook, 2, page, 150)
+        pipeline.join()
+        pipeline.close()
+
+        self.callback.on_finish_scan_page.assert_has_calls([
+            mock.call(self.notebook, 1, None),
+            mock.call(self.notebook, 2, mock.ANY),
+        ])
+
+
+class _SaneIterator:  # pylint: disable=too-few-public-methods
+    """Behaves like `sane._SaneIterator` of python-sane 2.8.
+
+    It has only the `next()` method of Python 2 iterators, so `next()`
+    builtin fails with it.
+    """
+
+    def __init__(self, device):
+        self.device = device
+
+    def __iter__(self):
+        return self
+
+    def next(self):
+        """Returns the next image from the feeder."""
+        try:
+            self.device.start()
+
+        except _sane.error as exception:
+            if str(exception) == scanner.FEEDER_EMPTY_MESSAGE:
+                raise StopIteration from exception
+
+            raise
+
+        return self.device.snap(True)
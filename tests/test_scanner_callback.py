@@ -1,10 +1,13 @@
+import contextlib
+import hashlib
 import logging
 import pathlib
 from unittest import mock
 
 from pyfakefs import fake_filesystem_unittest
 
-from smth import commands, models
+from smth import batch, commands, const, models, page_store, pdf
+from tests import testutils
 
 
 class ScannerCallbackTestCase(fake_filesystem_unittest.TestCase):
@@ -13,33 +16,118 @@ class ScannerCallbackTestCase(fake_filesystem_unittest.TestCase):
 
         self.setUpPyfakefs()
 
+        testutils.use_fake_data_paths(self)
+
+        previews_patcher = mock.patch('smth.previews.save')
+        self.save_previews = previews_patcher.start()
+        self.addCleanup(previews_patcher.stop)
+
         self.command = mock.MagicMock()
         self.db = mock.MagicMock()
         self.view = mock.MagicMock()
-        self.conf = mock.MagicMock()
+        self.conf = mock.MagicMock(scanner_resolution=300)
 
         self.callback = commands.ScanCommand.ScannerCallback(
             self.command, self.db, self.view, self.conf)
 
-        self.pdf = mock.MagicMock()
-        self.pdf.output = self.fs.create_file
-        fpdf_patcher = mock.patch('fpdf.FPDF')
-        fpdf_patcher.start().return_value = self.pdf
-        self.addCleanup(fpdf_patcher.stop)
+        pdf_patcher = mock.patch('smth.pdf.update', return_value=[])
+        self.update_pdf = pdf_patcher.start()
+        self.addCleanup(pdf_patcher.stop)
 
-    def test_on_finish_scan_page(self):
-        notebook = mock.MagicMock(**{
-            'get_page_path.return_value': pathlib.Path('/test/path.pdf'),
-        })
+        # flock() does not work with files of the fake file system
+        lock_patcher = mock.patch(
+            'smth.jobs.lock_notebook', return_value=contextlib.nullcontext())
+        lock_patcher.start()
+        self.addCleanup(lock_patcher.stop)
+
+    def _get_sheets(self):
+        return self.update_pdf.call_args[0][3]
+
+    def _count_images(self):
+        return sum(slot is not None
+                   for sheet in self._get_sheets() for slot in sheet)
+
+    def _make_image(self, contents=b'page'):
+        image = mock.MagicMock(mode='L')
+        image.save.side_effect = (
+            lambda path, **options: pathlib.Path(path).write_bytes(contents))
+        return image
+
+    def test_on_start_append_from_feeder(self):
+        self.callback.on_start('device', [2], append_from_feeder=True)
 
-        image = mock.MagicMock()
+        self.view.show_info.assert_has_calls([
+            mock.call('The following pages will be scanned: 2.'),
+            mock.call('Sheets left in the document feeder will be appended '
+                      'to the notebook.'),
+        ])
+        self.view.confirm.assert_called_once()
 
-        self.callback.on_finish_scan_page(notebook, 1, image)
+    def test_on_finish_scan_page(self):
+        type_ = models.NotebookType('', 160, 200)
+        notebook = models.Notebook('test', type_, pathlib.Path('/path.pdf'))
+
+        self.callback.on_finish_scan_page(notebook, 1, self._make_image())
 
-        notebook.get_page_path.assert_called_once_with(1)
-        image.save.assert_called_once_with('/test/path.pdf')
+        blob = f"{hashlib.sha256(b'page').hexdigest()}.jpg"
+        self.assertDictEqual(notebook.pages, {1: blob})
+        self.save_previews.assert_called_once_with(mock.ANY, blob)
+        self.assertEqual(
+            notebook.get_page_path(1).read_bytes(), b'page')
         self.view.show_info.assert_called_once()
 
+    def test_on_finish_scan_page_recorded_in_journal(self):
+        type_ = models.NotebookType('', 160, 200)
+        notebook = models.Notebook('test', type_, pathlib.Path('/path.pdf'))
+
+        self.callback.on_finish_scan_page(notebook, 1, self._make_image())
+        self.callback.on_finish_scan_page(notebook, 2, None)
+
+        journal = batch.Journal(const.REPROCESS_JOURNAL_PATH)
+        settings = batch.get_settings(batch.Task(notebook, 1, None, 300))
+        self.assertTrue(journal.is_up_to_date(notebook.pages[1], settings))
+        self.assertEqual(
+            journal.get_encoding(notebook.pages[1]),
+            batch.get_encoding(type_))
+        self.assertIsNone(journal.get_encoding(notebook.pages[2]))
+
+    def test_on_finish_scan_page_identical_pages(self):
+        type_ = models.NotebookType('', 160, 200)
+        notebook = models.Notebook('test', type_, pathlib.Path('/path.pdf'))
+
+        self.callback.on_finish_scan_page(notebook, 1, self._make_image())
+        self.callback.on_finish_scan_page(notebook, 2, self._make_image())
+
+        self.assertEqual(notebook.pages[1], notebook.pages[2])
+        self.assertEqual(
+            len(list(page_store.get_path(notebook.pages[1]).parent.iterdir())),
+            1)
+
+    def test_on_finish_scan_page_replaces_page(self):
+        type_ = models.NotebookType('', 160, 200)
+        type_.codec = 'png'
+        notebook = models.Notebook('test', type_, pathlib.Path('/path.pdf'))
+        notebook.pages = {1: 'old.jpg', 2: 'shared.jpg'}
+
+        for blob in notebook.pages.values():
+            self.fs.create_file(str(page_store.get_path(blob)))
+
+        self.db.get_blobs.return_value = {'shared.jpg'}
+
+        self.callback.on_finish_scan_page(notebook, 1, self._make_image(b'1'))
+        self.callback.on_finish_scan_page(notebook, 2, self._make_image(b'2'))
+
+        self.assertEqual(notebook.get_page_path(1).suffix, '.png')
+        self.assertTrue(page_store.get_path('old.jpg').exists())
+
+        with mock.patch('importlib.util.find_spec') as find_spec:
+            find_spec.return_value = None
+
+            self.callback.on_finish(notebook)
+
+        self.assertFalse(page_store.get_path('old.jpg').exists())
+        self.assertTrue(page_store.get_path('shared.jpg').exists())
+
     def test_on_finish(self):
         type_ = models.NotebookType('', 160, 200)
 
@@ -52,12 +140,73 @@ class ScannerCallbackTestCase(fake_filesystem_unittest.TestCase):
             self.callback.on_finish(notebook)
 
         self.db.save_notebook.assert_called_once()
-        self.assertEqual(self.pdf.add_page.call_count, 3)
-        self.assertTrue(notebook.path.exists())
+        self.update_pdf.assert_called_once_with(
+            notebook.path, pdf.get_layout_path(notebook.id), (944, 1181),
+            mock.ANY, (944, 1181), None, mode=None, quality=None,
+            progress=None, digest=mock.ANY)
+        self.assertEqual(len(self._get_sheets()), 3)
+
+    def test_on_finish_with_profile(self):
+        callback = commands.ScanCommand.ScannerCallback(
+            self.command, self.db, self.view, self.conf, 'screen')
+
+        type_ = models.NotebookType('', 160, 200)
+
+        notebook = models.Notebook('', type_, pathlib.Path('/test/path.pdf'))
+        notebook.total_pages = 3
+
+        with mock.patch('importlib.util.find_spec') as find_spec:
+            find_spec.return_value = None
+
+            callback.on_finish(notebook)
+
+        self.update_pdf.assert_called_once_with(
+            pathlib.Path('/test/path-screen.pdf'),
+            pdf.get_layout_path(notebook.id, 'screen'), (944, 1181),
+            mock.ANY, (604, 755), None, mode='L', quality=60, progress=None,
+            digest=mock.ANY)
+
+    def test_on_finish_in_background(self):
+        callback = commands.ScanCommand.ScannerCallback(
+            self.command, self.db, self.view, self.conf, background=True)
+
+        type_ = models.NotebookType('', 160, 200)
+
+        notebook = models.Notebook('', type_, pathlib.Path('/test/path.pdf'))
+        notebook.total_pages = 3
+
+        with mock.patch('importlib.util.find_spec') as find_spec:
+            find_spec.return_value = None
+
+            with mock.patch('smth.jobs.submit') as submit:
+                callback.on_finish(notebook)
+
+        self.db.save_notebook.assert_called_once()
+        submit.assert_called_once_with(self.db, notebook.id, None)
+        self.update_pdf.assert_not_called()
+
+    def test_on_finish_in_foreground_if_background_fails(self):
+        callback = commands.ScanCommand.ScannerCallback(
+            self.command, self.db, self.view, self.conf, background=True)
+
+        type_ = models.NotebookType('', 160, 200)
+
+        notebook = models.Notebook('', type_, pathlib.Path('/test/path.pdf'))
+        notebook.total_pages = 3
+
+        with mock.patch('importlib.util.find_spec') as find_spec:
+            find_spec.return_value = None
+
+            with mock.patch('smth.jobs.submit', side_effect=OSError):
+                callback.on_finish(notebook)
+
+        self.view.show_error.assert_called_once()
+        self.update_pdf.assert_called_once()
 
     def test_on_finish_missing_images(self):
         """Should create PDF but show errors."""
-        self.pdf.image.side_effect = RuntimeError
+        self.update_pdf.side_effect = lambda *args, **kwargs: [
+            slot for sheet in args[3] for slot in sheet]
 
         type_ = models.NotebookType('', 160, 200)
 
@@ -70,9 +219,8 @@ class ScannerCallbackTestCase(fake_filesystem_unittest.TestCase):
             self.callback.on_finish(notebook)
 
         self.db.save_notebook.assert_called_once()
-        self.assertEqual(self.pdf.add_page.call_count, 3)
+        self.assertEqual(len(self._get_sheets()), 3)
         self.assertEqual(self.view.show_error.call_count, 3)
-        self.assertTrue(notebook.path.exists())
 
     def test_on_finish_paired_pages(self):
         type_ = models.NotebookType('', 160, 200)
@@ -87,12 +235,17 @@ class ScannerCallbackTestCase(fake_filesystem_unittest.TestCase):
             self.callback.on_finish(notebook)
 
         self.db.save_notebook.assert_called_once()
-        self.assertEqual(self.pdf.add_page.call_count, 2)
-        self.assertTrue(notebook.path.exists())
+        self.assertEqual(self.update_pdf.call_args[0][2], (1888, 1181))
+        self.assertEqual(len(self._get_sheets()), 2)
+        self.assertEqual(
+            [[slot.path.name for slot in sheet]
+             for sheet in self._get_sheets()],
+            [['1.jpg', '2.jpg'], ['3.jpg', '4.jpg']])
 
     def test_on_finish_paired_pages_missing_images(self):
         """Should create PDF but show errors."""
-        self.pdf.image.side_effect = RuntimeError
+        self.update_pdf.side_effect = lambda *args, **kwargs: [
+            slot for sheet in args[3] for slot in sheet]
 
         type_ = models.NotebookType('', 160, 200)
         type_.pages_paired = True
@@ -106,9 +259,73 @@ class ScannerCallbackTestCase(fake_filesystem_unittest.TestCase):
             self.callback.on_finish(notebook)
 
         self.db.save_notebook.assert_called_once()
-        self.assertEqual(self.pdf.add_page.call_count, 2)
+        self.assertEqual(len(self._get_sheets()), 2)
         self.assertEqual(self.view.show_error.call_count, 4)
-        self.assertTrue(notebook.path.exists())
+
+    def test_on_finish_scan_page_blank(self):
+        type_ = models.NotebookType('', 160, 200)
+        notebook = models.Notebook('test', type_, pathlib.Path('/path.pdf'))
+
+        self.callback.on_finish_scan_page(notebook, 1, None)
+        self.callback.on_finish_scan_page(notebook, 2, None)
+
+        self.assertEqual(notebook.pages[1], notebook.pages[2])
+        self.assertEqual(notebook.get_page_path(1).suffix, '.blank')
+        self.assertEqual(notebook.get_page_path(1).stat().st_size, 0)
+
+    def _create_blank_pages(self, notebook, pages):
+        for page in pages:
+            notebook.pages[page] = page_store.save_blank()
+
+    def test_on_finish_blank_pages_empty(self):
+        type_ = models.NotebookType('', 160, 200)
+        type_.blank_pages = 'empty'
+
+        notebook = models.Notebook('', type_, pathlib.Path('/test/path.pdf'))
+        notebook.total_pages = 3
+        self._create_blank_pages(notebook, [2])
+
+        with mock.patch('importlib.util.find_spec') as find_spec:
+            find_spec.return_value = None
+
+            self.callback.on_finish(notebook)
+
+        self.assertEqual(len(self._get_sheets()), 3)
+        self.assertEqual(self._count_images(), 2)
+
+    def test_on_finish_blank_pages_dropped(self):
+        type_ = models.NotebookType('', 160, 200)
+        type_.blank_pages = 'drop'
+
+        notebook = models.Notebook('', type_, pathlib.Path('/test/path.pdf'))
+        notebook.total_pages = 3
+        self._create_blank_pages(notebook, [2])
+
+        with mock.patch('importlib.util.find_spec') as find_spec:
+            find_spec.return_value = None
+
+            self.callback.on_finish(notebook)
+
+        self.assertEqual(len(self._get_sheets()), 2)
+        self.assertEqual(self._count_images(), 2)
+
+    def test_on_finish_paired_blank_pages_dropped(self):
+        """Spreads are dropped only if both pages are blank."""
+        type_ = models.NotebookType('', 160, 200)
+        type_.pages_paired = True
+        type_.blank_pages = 'drop'
+
+        notebook = models.Notebook('', type_, pathlib.Path('/test/path.pdf'))
+        notebook.total_pages = 5
+        self._create_blank_pages(notebook, [2, 3, 4])
+
+        with mock.patch('importlib.util.find_spec') as find_spec:
+            find_spec.return_value = None
+
+            self.callback.on_finish(notebook)
+
+        self.assertEqual(len(self._get_sheets()), 2)
+        self.assertEqual(self._count_images(), 2)
 
     def test_on_error(self):
         self.assertTrue(hasattr(self.callback, 'on_error'))
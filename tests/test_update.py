@@ -4,12 +4,14 @@ from unittest import mock
 
 from pyfakefs import fake_filesystem_unittest
 
-from smth import commands, models
+from smth import commands, db, models
+from tests import testutils
 
 
 class UpdateCommandTestCase(fake_filesystem_unittest.TestCase):
     def setUp(self):
         self.setUpPyfakefs()
+        testutils.use_fake_data_paths(self)
         logging.disable()
 
         type_ = models.NotebookType('A4', 210, 297)
@@ -19,7 +21,9 @@ class UpdateCommandTestCase(fake_filesystem_unittest.TestCase):
         self.fs.create_file(str(self.notebook.path))
 
         self.pages_dir = pathlib.Path('~/.local/share/smth/pages').expanduser()
-        self.fs.create_dir(str(self.pages_dir / self.notebook.title))
+        self.fs.create_file(
+            str(self.pages_dir / self.notebook.title / '1.jpg'),
+            contents='page')
 
         untitled_notebook = models.Notebook('Untitled', None, None)
 
@@ -57,7 +61,24 @@ class UpdateCommandTestCase(fake_filesystem_unittest.TestCase):
         self.assertTrue((new_path / 'new.pdf').exists())
 
         self.assertFalse((self.pages_dir / old_title).exists())
-        self.assertTrue((self.pages_dir / answers['title']).exists())
+        self.assertFalse((self.pages_dir / answers['title']).exists())
+        self.assertTrue(self.notebook.get_page_path(1).exists())
+
+    def test_execute_rename_db_error(self):
+        self.db.save_notebook.side_effect = db.Error
+        old_page = self.pages_dir / self.notebook.title / '1.jpg'
+
+        answers = {
+            'title': 'new',
+            'path': str(self.notebook.path),
+        }
+
+        self.view.ask_for_updated_notebook_properties.return_value = answers
+
+        with self.assertRaises(SystemExit):
+            commands.UpdateCommand(self.db, self.view).execute(self.args)
+
+        self.assertEqual(old_page.read_text(), 'page')
 
     def test_execute_new_path_already_exists(self):
         new_path = pathlib.Path('/test/path/notebook.pdf')
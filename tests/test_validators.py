@@ -180,6 +180,18 @@ class TypeValidatorTestCase(unittest.TestCase):
         self.assertRaises(
             ValidationError, self.validator.validate_page_size, '10000')
 
+    def test_validate_resolution(self):
+        self.assertTrue(self.validator.validate_resolution('0'))
+        self.assertTrue(self.validator.validate_resolution(' 300 '))
+        self.assertTrue(self.validator.validate_resolution('1200'))
+
+        self.assertRaises(
+            ValidationError, self.validator.validate_resolution, 'dpi')
+        self.assertRaises(
+            ValidationError, self.validator.validate_resolution, '-1')
+        self.assertRaises(
+            ValidationError, self.validator.validate_resolution, '2400')
+
 
 class PagesToScanValidatorTestCase(unittest.TestCase):
     """Test user input validation when choosing scan preferences."""
@@ -216,6 +228,16 @@ class PagesToScanValidatorTestCase(unittest.TestCase):
             ValidationError,
             self.validator.validate_number_of_pages_to_append, 'test')
 
+    def test_validate_number_of_pages_to_append_from_feeder(self):
+        validator = validators.PagesToScanValidator(self.notebook, 10000)
+
+        self.assertTrue(validator.validate_number_of_pages_to_append('5000'))
+        self.assertTrue(validator.validate_number_of_pages_to_append('10000'))
+
+        self.assertRaises(
+            ValidationError,
+            validator.validate_number_of_pages_to_append, '10001')
+
     def test_validate_pages_to_replace(self):
         self.assertTrue(
             self.validator.validate_pages_to_replace('1 2 3-5 4-7')
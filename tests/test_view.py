@@ -1,7 +1,7 @@
 import unittest
 from unittest import mock
 
-from smth import scanner, view
+from smth import models, scanner, view
 from tests import testutils
 
 
@@ -48,6 +48,11 @@ class ViewTestCase(unittest.TestCase):  # pylint: disable=too-many-public-method
             'page_width': '100',
             'page_height': '200',
             'pages_paired': False,
+            'pdf_resolution': '300',
+            'codec': 'png',
+            'binarization': 'otsu',
+            'deskew': False,
+            'blank_pages': 'empty',
         }
 
         with mock.patch('PyInquirer.prompt', return_value=answers):
@@ -63,6 +68,11 @@ class ViewTestCase(unittest.TestCase):  # pylint: disable=too-many-public-method
                 'page_width': 100,
                 'page_height': 200,
                 'pages_paired': False,
+                'pdf_resolution': 300,
+                'codec': 'png',
+                'binarization': 'otsu',
+                'deskew': False,
+                'blank_pages': 'empty',
             })
 
     def test_ask_for_new_type_info_no_answer(self):
@@ -246,6 +256,22 @@ class ViewTestCase(unittest.TestCase):  # pylint: disable=too-many-public-method
         output = testutils.capture_stdout(self.view.show_types, [])
         self.assertIn('No types found', output)
 
+    def test_show_pdf_jobs(self):
+        jobs = [
+            models.PDFJob(2, 1, 'Test', 'screen', 'running', 3, 10, '', 'now'),
+            models.PDFJob(1, 5, None, None, 'failed', 0, 0, 'Error', 'then'),
+        ]
+
+        output = testutils.capture_stdout(self.view.show_pdf_jobs, jobs)
+
+        self.assertIn('Test (screen)  running 3/10 pages  now', output)
+        self.assertIn('deleted notebook 5', output)
+        self.assertIn('Error', output)
+
+        # No jobs
+        output = testutils.capture_stdout(self.view.show_pdf_jobs, [])
+        self.assertIn('No PDF jobs found', output)
+
     def test_confirm(self):
         with mock.patch('PyInquirer.prompt', return_value={'answer': True}):
             answer = self.view.confirm('question')
@@ -1,5 +1,9 @@
 import contextlib
 import io
+import pathlib
+from unittest import mock
+
+from smth import const
 
 
 def capture_stderr(function, *args, **kwargs):
@@ -18,3 +22,18 @@ def capture_stdout(function, *args, **kwargs):
     output = stream.getvalue()
     stream.close()
     return output
+
+
+def use_fake_data_paths(test_case):
+    """Make paths to data files of notebooks refer to the fake filesystem.
+
+    Paths in `smth.const` are created before pyfakefs is set up, so they
+    refer to the real filesystem.
+    """
+    for name in ('PAGES_ROOT_PATH', 'BLOBS_ROOT_PATH', 'PREVIEWS_ROOT_PATH',
+                 'LAYOUTS_ROOT_PATH', 'LOCKS_ROOT_PATH',
+                 'JOBS_WORKER_LOCK_PATH', 'REPROCESS_JOURNAL_PATH'):
+        patcher = mock.patch(
+            f'smth.const.{name}', pathlib.Path(str(getattr(const, name))))
+        patcher.start()
+        test_case.addCleanup(patcher.stop)